@@ -5,16 +5,68 @@ from pathlib import Path
 import duckdb
 import polars as pl
 
-from pheval.analyse.benchmark_db_manager import write_table
+from pheval.analyse.benchmark_db_manager import load_table_lazy, write_table
 from pheval.analyse.benchmark_output_type import BenchmarkOutputType, BenchmarkOutputTypeEnum, _get_unique_subset
 from pheval.analyse.binary_classification_curves import compute_curves
 from pheval.analyse.binary_classification_stats import compute_confusion_matrix
 from pheval.analyse.generate_plots import generate_plots
 from pheval.analyse.generate_rank_comparisons import calculate_rank_changes
-from pheval.analyse.rank_stats import compute_rank_stats
-from pheval.analyse.run_data_parser import Config, RunConfig, parse_run_config
+from pheval.analyse.rank_stats import (
+    DEFAULT_K_VALUES,
+    compute_rank_histogram,
+    compute_rank_stats,
+    compute_rank_stats_from_ranks,
+)
+from pheval.analyse.run_data_parser import Config, CurveConfig, RunConfig, parse_run_config
+from pheval.post_processing.phenopacket_truth_set import get_phenopacket_truth_set, variant_key
+from pheval.post_processing.post_processing import (
+    DATASET_PART_PREFIX,
+    ResultType,
+    get_result_cases,
+    scan_dataset_parts,
+)
+from pheval.runners.timings import get_run_wall_time
 from pheval.utils.logger import get_logger
 
+logger = get_logger()
+
+
+def _scan_results(results_dir: Path, benchmark_type: BenchmarkOutputType) -> pl.LazyFrame:
+    """
+    Scan the results in a results directory, written either as one file per phenopacket or as dataset part files.
+    Results read from dataset part files are given the `file_path` of the equivalent per-phenopacket file,
+    and only the results of the most recently written part are kept for each phenopacket.
+    Args:
+        results_dir (Path): The results directory.
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+    Returns:
+        pl.LazyFrame: LazyFrame object containing all the results in the directory.
+    """
+    dataset_parts, result_files = [], []
+    for result_file in sorted(results_dir.glob("*.parquet")):
+        if result_file.name.startswith(DATASET_PART_PREFIX) and not result_file.name.endswith(
+            f"-{benchmark_type.prioritisation_type_string}_result.parquet"
+        ):
+            dataset_parts.append(result_file)
+        else:
+            result_files.append(result_file)
+    if not dataset_parts:
+        return pl.scan_parquet(results_dir, include_file_paths="file_path")
+    results = [
+        scan_dataset_parts(dataset_parts).with_columns(
+            pl.concat_str(
+                [
+                    pl.lit(f"{results_dir}/"),
+                    pl.col("case_id"),
+                    pl.lit(f"-{benchmark_type.prioritisation_type_string}_result.parquet"),
+                ]
+            ).alias("file_path")
+        )
+    ]
+    if result_files:
+        results.append(pl.scan_parquet(result_files, include_file_paths="file_path"))
+    return pl.concat(results, how="diagonal_relaxed").drop(["case_id", "dataset_part"])
+
 
 def scan_directory(run: RunConfig, benchmark_type: BenchmarkOutputType) -> pl.LazyFrame:
     """
@@ -28,10 +80,7 @@ def scan_directory(run: RunConfig, benchmark_type: BenchmarkOutputType) -> pl.La
     logger = get_logger()
     logger.info(f"Analysing results in {run.results_dir.joinpath(benchmark_type.result_directory)}")
 
-    lf = pl.scan_parquet(
-        run.results_dir.joinpath(benchmark_type.result_directory),
-        include_file_paths="file_path",
-    ).with_columns(
+    lf = _scan_results(run.results_dir.joinpath(benchmark_type.result_directory), benchmark_type).with_columns(
         pl.col("rank").cast(pl.Int64),
         pl.col("file_path").str.extract(r"([^/\\]+)$").alias("result_file"),
         pl.col("true_positive").fill_null(False),
@@ -47,6 +96,8 @@ def scan_directory(run: RunConfig, benchmark_type: BenchmarkOutputType) -> pl.La
         )
 
     lf = lf.filter(pl.col("true_positive") | passes_threshold)
+    if benchmark_type.prioritisation_type_string == "variant":
+        lf = lf.with_columns(variant_key())
 
     return (
         lf.filter(pl.col("true_positive") | passes_threshold)
@@ -58,69 +109,264 @@ def scan_directory(run: RunConfig, benchmark_type: BenchmarkOutputType) -> pl.La
     )
 
 
-def process_stats(
-    runs: list[RunConfig], benchmark_type: BenchmarkOutputType, no_curves: bool
-) -> tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+def check_corpus_coverage(run: RunConfig, benchmark_type: BenchmarkOutputType) -> None:
     """
-    Processes stats outputs for specified runs to compare.
+    Warn about phenopackets without a result, using the compiled truth set table for the corpus if present.
+
+    Notes:
+        The truth set table is loaded once per corpus and shared with post-processing,
+        see `get_phenopacket_truth_set`.
+
+    Args:
+        run (RunConfig): RunConfig object.
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+    """
+    truth_set = get_phenopacket_truth_set(run.phenopacket_dir).truth_set_table
+    if truth_set is None:
+        return
+    results_dir = run.results_dir.joinpath(benchmark_type.result_directory)
+    result_cases = get_result_cases(results_dir, ResultType(benchmark_type.prioritisation_type_string))
+    missing_cases = set(truth_set["case_id"].unique()) - result_cases
+    if missing_cases:
+        get_logger().warning(
+            f"{len(missing_cases)} phenopackets in {run.phenopacket_dir} have no result in {results_dir}, "
+            f"e.g. {sorted(missing_cases)[0]}."
+        )
+
+
+def _get_true_positive_columns(benchmark_type: BenchmarkOutputType) -> list[str]:
+    """
+    Get the columns identifying a true positive entity and the result file it was found in.
+    Args:
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+    Returns:
+        List[str]: The result file, entity key and descriptive columns.
+    """
+    return list(dict.fromkeys(["result_file", *_get_join_keys(benchmark_type), *benchmark_type.columns]))
+
+
+def _get_join_keys(benchmark_type: BenchmarkOutputType) -> list[str]:
+    """
+    Get the columns identifying a true positive entity within a result file, shared across runs.
+    Args:
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+    Returns:
+        List[str]: The join keys.
+    """
+    return ["result_file" if col == "file_path" else col for col in _get_unique_subset(benchmark_type)]
+
+
+def _join_true_positive_cases(
+    true_positive_cases: list[pl.LazyFrame], join_keys: list[str], benchmark_type: BenchmarkOutputType
+) -> pl.LazyFrame:
+    """
+    Join the ranks of the true positive results of each run on the result file and the entity identity.
+    Args:
+        true_positive_cases (List[pl.LazyFrame]): The true positive results for each run.
+        join_keys (List[str]): The columns identifying a true positive entity within a result file.
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+    Returns:
+        pl.LazyFrame: The true positive results with the rank for each run, 0 where a run has no result.
+    """
+    descriptive_columns = [col for col in benchmark_type.columns if col not in join_keys]
+    joined_cases = true_positive_cases[0]
+    for cases in true_positive_cases[1:]:
+        joined_cases = (
+            joined_cases.join(cases, on=join_keys, how="full", coalesce=True)
+            .with_columns(pl.coalesce(col, f"{col}_right").alias(col) for col in descriptive_columns)
+            .drop([f"{col}_right" for col in descriptive_columns])
+        )
+    run_identifiers = [
+        col for col in joined_cases.collect_schema().names() if col not in [*join_keys, *descriptive_columns]
+    ]
+    return (
+        joined_cases.with_columns(pl.col(run_identifiers).fill_null(0))
+        .select(["result_file", *benchmark_type.columns, *run_identifiers])
+        .sort(["result_file", *benchmark_type.columns])
+    )
+
+
+def _build_stats_queries(
+    runs: list[RunConfig],
+    benchmark_type: BenchmarkOutputType,
+    no_curves: bool,
+    k_values: list[int],
+    curve_config: CurveConfig,
+) -> list[pl.LazyFrame]:
+    """
+    Build the queries computing the stats outputs for specified runs to compare.
     Args:
         runs (List[RunConfig]): List of runs to benchmark.
         benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
         no_curves (bool): Whether to skip generating binary classification curves.
+        k_values (List[int]): The upper rank limits to compute the top-k statistics for.
+        curve_config (CurveConfig): Configuration for the binary classification curves.
     Returns:
-        Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame, pl.DataFrame]: The stats for all runs.
+        List[pl.LazyFrame]: The queries for the stats, the true positive ranks and,
+            unless skipped, the binary classification curves of all runs.
     """
-    stats, curve_results, true_positive_cases = [], [], []
+    stats, curve_results, true_positive_ranks = [], [], []
     for run in runs:
+        check_corpus_coverage(run, benchmark_type)
         result_scan = scan_directory(run, benchmark_type)
+        run_wall_time = get_run_wall_time(run.results_dir)
         stats.append(
-            compute_rank_stats(run.run_identifier, result_scan).join(
-                compute_confusion_matrix(run.run_identifier, result_scan), on="run_identifier"
+            compute_rank_stats(run.run_identifier, result_scan, k_values)
+            .join(compute_confusion_matrix(run.run_identifier, result_scan), on="run_identifier")
+            .with_columns(
+                (pl.col("number_of_samples") * 3600 / pl.lit(run_wall_time, pl.Float64)).alias("cases_per_hour")
             )
         )
         if not no_curves:
-            curve_results.append(compute_curves(run.run_identifier, result_scan))
-        true_positive_cases.append(
+            curve_results.append(
+                compute_curves(
+                    run.run_identifier, result_scan, curve_config.mode, curve_config.max_points, curve_config.bins
+                )
+            )
+        true_positive_ranks.append(
             result_scan.filter(pl.col("true_positive"))
-            .select(["result_file", *benchmark_type.columns, pl.col("rank").alias(run.run_identifier)])
-            .sort(["result_file", *benchmark_type.columns])
+            .select(
+                [
+                    pl.lit(run.run_identifier).alias("run_identifier"),
+                    *_get_true_positive_columns(benchmark_type),
+                    pl.col("rank"),
+                ]
+            )
+            .sort(_get_true_positive_columns(benchmark_type))
         )
-    return (
-        pl.concat(stats, how="vertical").collect(),
-        pl.concat(curve_results, how="vertical").collect() if not no_curves else None,
-        pl.concat(
-            [true_positive_cases[0]]
-            + [
-                df.select(
-                    [col for col in df.collect_schema().keys() if col not in ["result_file", *benchmark_type.columns]]
-                )
-                for df in true_positive_cases[1:]
-            ],
-            how="horizontal",
-        ).collect(),
+    queries = [pl.concat(stats, how="vertical"), pl.concat(true_positive_ranks, how="vertical")]
+    if not no_curves:
+        queries.append(pl.concat(curve_results, how="vertical"))
+    return queries
+
+
+def _pivot_true_positive_ranks(
+    true_positive_ranks: pl.DataFrame, run_identifiers: list[str], benchmark_type: BenchmarkOutputType
+) -> pl.DataFrame:
+    """
+    Pivot the true positive ranks of all runs to one rank column per run.
+    Args:
+        true_positive_ranks (pl.DataFrame): The rank of each true positive result for each run.
+        run_identifiers (List[str]): The identifiers of the runs.
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+    Returns:
+        pl.DataFrame: The true positive results with the rank for each run, 0 where a run has no result.
+    """
+    return _join_true_positive_cases(
+        [
+            true_positive_ranks.lazy()
+            .filter(pl.col("run_identifier") == run_identifier)
+            .select([*_get_true_positive_columns(benchmark_type), pl.col("rank").alias(run_identifier)])
+            for run_identifier in run_identifiers
+        ],
+        _get_join_keys(benchmark_type),
+        benchmark_type,
+    ).collect()
+
+
+def _compute_rank_histograms(true_positive_ranks: pl.DataFrame, run_identifiers: list[str]) -> pl.DataFrame:
+    """
+    Compute the histogram of the true positive ranks of each run.
+    Args:
+        true_positive_ranks (pl.DataFrame): The rank of each true positive result for each run.
+        run_identifiers (List[str]): The identifiers of the runs.
+    Returns:
+        pl.DataFrame: The `count` and `cumulative_count` of true positives at each `rank` for each run.
+    """
+    return pl.concat(
+        [
+            compute_rank_histogram(true_positive_ranks.lazy().filter(pl.col("run_identifier") == run_identifier))
+            .select([pl.lit(run_identifier).alias("run_identifier"), pl.all()])
+            .collect()
+            for run_identifier in run_identifiers
+        ],
+        how="vertical",
     )
 
 
-def benchmark(config: Config, benchmark_type: BenchmarkOutputType, output_dir: Path, no_curves: bool) -> None:
+def _unpack_stats(
+    results: list[pl.DataFrame], no_curves: bool
+) -> tuple[pl.DataFrame, pl.DataFrame | None, pl.DataFrame]:
     """
-    Benchmark results for specified runs for a specified prioritisation type for comparison.
+    Unpack the collected results of the queries built by `_build_stats_queries`.
     Args:
+        results (List[pl.DataFrame]): The collected results of the queries.
+        no_curves (bool): Whether binary classification curves were skipped.
+    Returns:
+        Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]: The stats, curves (None if skipped) and true positive ranks.
+    """
+    return results[0], None if no_curves else results[2], results[1]
+
+
+def process_stats(
+    runs: list[RunConfig],
+    benchmark_type: BenchmarkOutputType,
+    no_curves: bool,
+    k_values: list[int] = DEFAULT_K_VALUES,
+    curve_config: CurveConfig | None = None,
+) -> tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+    """
+    Processes stats outputs for specified runs to compare.
+
+    Notes:
+        The stats, curves and true positive cases of all runs are evaluated together with `pl.collect_all`,
+        so the results of each run are scanned once and the runs are processed in parallel.
+
+    Args:
+        runs (List[RunConfig]): List of runs to benchmark.
+        benchmark_type (BenchmarkOutputTypeEnum): Benchmark output type.
+        no_curves (bool): Whether to skip generating binary classification curves.
+        k_values (List[int]): The upper rank limits to compute the top-k statistics for.
+        curve_config (CurveConfig, optional): Configuration for the binary classification curves.
+            Defaults to exact curves.
+    Returns:
+        Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]: The stats, curves and true positive ranks for all runs.
+    """
+    queries = _build_stats_queries(runs, benchmark_type, no_curves, k_values, curve_config or CurveConfig())
+    return _unpack_stats(pl.collect_all(queries), no_curves)
+
+
+def _store_benchmark(
+    conn: duckdb.DuckDBPyConnection,
+    config: Config,
+    benchmark_type: BenchmarkOutputType,
+    output_dir: Path,
+    no_curves: bool,
+    stats: pl.DataFrame,
+    curve_results: pl.DataFrame | None,
+    true_positive_ranks: pl.DataFrame,
+) -> None:
+    """
+    Write the benchmarking results for a prioritisation type to the database and plot them.
+
+    Notes:
+        Besides the summary, the rank of every true positive and the histogram of the ranks of each run
+        are stored, so the ranking statistics can be recomputed with `recompute_rank_stats`
+        without scanning the results again.
+
+    Args:
+        conn (duckdb.DuckDBPyConnection): Connection to the benchmarking database.
         config (Config): Configuration for benchmarking.
         benchmark_type (BenchmarkOutputType): Benchmark output type.
         output_dir (Path): Output directory for benchmarking results.
         no_curves (bool): Whether to skip generating binary classification curves.
+        stats (pl.DataFrame): The stats for all runs.
+        curve_results (pl.DataFrame, optional): The binary classification curves for all runs.
+        true_positive_ranks (pl.DataFrame): The rank of each true positive result for each run.
     """
-    conn = duckdb.connect(output_dir.joinpath(f"{config.benchmark_name}.duckdb"))
-    stats, curve_results, true_positive_cases = process_stats(config.runs, benchmark_type, no_curves)
-    write_table(conn, stats, f"{config.benchmark_name}_{benchmark_type.prioritisation_type_string}_summary")
-    if not no_curves:
-        write_table(
-            conn,
-            curve_results,
-            f"{config.benchmark_name}_{benchmark_type.prioritisation_type_string}_binary_classification_curves",
-        )
+    table_prefix = f"{config.benchmark_name}_{benchmark_type.prioritisation_type_string}"
     run_identifiers = [run.run_identifier for run in config.runs]
-    calculate_rank_changes(conn, run_identifiers, true_positive_cases, benchmark_type)
+    write_table(conn, stats, f"{table_prefix}_summary")
+    if not no_curves:
+        write_table(conn, curve_results, f"{table_prefix}_binary_classification_curves")
+    write_table(conn, true_positive_ranks, f"{table_prefix}_true_positive_ranks")
+    write_table(conn, _compute_rank_histograms(true_positive_ranks, run_identifiers), f"{table_prefix}_rank_histogram")
+    calculate_rank_changes(
+        conn,
+        run_identifiers,
+        _pivot_true_positive_ranks(true_positive_ranks, run_identifiers, benchmark_type),
+        benchmark_type,
+    )
     generate_plots(
         benchmark_name=config.benchmark_name,
         benchmarking_results_df=stats,
@@ -132,65 +378,156 @@ def benchmark(config: Config, benchmark_type: BenchmarkOutputType, output_dir: P
         conn=conn,
         run_identifiers=run_identifiers,
     )
+
+
+def recompute_rank_stats(
+    conn: duckdb.DuckDBPyConnection,
+    benchmark_name: str,
+    benchmark_type: BenchmarkOutputType,
+    k_values: list[int] = DEFAULT_K_VALUES,
+) -> pl.DataFrame:
+    """
+    Recompute the ranking statistics of the runs of a benchmark from its database.
+    Args:
+        conn (duckdb.DuckDBPyConnection): Connection to the benchmarking database.
+        benchmark_name (str): The name of the benchmark.
+        benchmark_type (BenchmarkOutputType): Benchmark output type.
+        k_values (List[int]): The upper rank limits to compute the statistics for, which may differ
+            from those the benchmark was run with.
+    Returns:
+        pl.DataFrame: The ranking statistics of each run, in the order the runs were benchmarked.
+    """
+    table_prefix = f"{benchmark_name}_{benchmark_type.prioritisation_type_string}"
+    true_positive_ranks = load_table_lazy(f"{table_prefix}_true_positive_ranks", conn).collect()
+    rank_histogram = load_table_lazy(f"{table_prefix}_rank_histogram", conn).collect()
+    return pl.concat(
+        pl.collect_all(
+            [
+                compute_rank_stats_from_ranks(
+                    run_identifier,
+                    true_positive_ranks.lazy()
+                    .filter(pl.col("run_identifier") == run_identifier)
+                    .select([pl.col("result_file").alias("file_path"), pl.col("rank")]),
+                    rank_histogram.lazy().filter(pl.col("run_identifier") == run_identifier),
+                    k_values,
+                )
+                for run_identifier in true_positive_ranks["run_identifier"].unique(maintain_order=True)
+            ]
+        ),
+        how="vertical",
+    )
+
+
+def benchmark(config: Config, benchmark_type: BenchmarkOutputType, output_dir: Path, no_curves: bool) -> None:
+    """
+    Benchmark results for specified runs for a specified prioritisation type for comparison.
+    Args:
+        config (Config): Configuration for benchmarking.
+        benchmark_type (BenchmarkOutputType): Benchmark output type.
+        output_dir (Path): Output directory for benchmarking results.
+        no_curves (bool): Whether to skip generating binary classification curves.
+    """
+    conn = duckdb.connect(output_dir.joinpath(f"{config.benchmark_name}.duckdb"))
+    _store_benchmark(
+        conn,
+        config,
+        benchmark_type,
+        output_dir,
+        no_curves,
+        *process_stats(config.runs, benchmark_type, no_curves, config.k_values, config.curves),
+    )
     conn.close()
 
 
-def benchmark_runs(benchmark_config_file: Path, output_dir: Path, no_curves: bool) -> None:
+def _get_benchmark_configs(config: Config) -> list[tuple[Config, BenchmarkOutputType]]:
+    """
+    Split a benchmarking configuration into the runs to benchmark for each prioritisation type.
+    Args:
+        config (Config): Configuration for benchmarking.
+    Returns:
+        List[Tuple[Config, BenchmarkOutputType]]: The configuration and output type of each prioritisation type
+            analysed by at least one run.
+    """
+    benchmark_configs = []
+    for benchmark_type, analysis in [
+        (BenchmarkOutputTypeEnum.GENE.value, "gene_analysis"),
+        (BenchmarkOutputTypeEnum.VARIANT.value, "variant_analysis"),
+        (BenchmarkOutputTypeEnum.DISEASE.value, "disease_analysis"),
+    ]:
+        runs = [run for run in config.runs if getattr(run, analysis)]
+        if runs:
+            benchmark_configs.append(
+                (
+                    Config(
+                        benchmark_name=config.benchmark_name,
+                        runs=runs,
+                        plot_customisation=config.plot_customisation,
+                        k_values=config.k_values,
+                        curves=config.curves,
+                    ),
+                    benchmark_type,
+                )
+            )
+    return benchmark_configs
+
+
+def benchmark_concurrently(config: Config, output_dir: Path, no_curves: bool) -> None:
+    """
+    Benchmark results for every prioritisation type at once.
+
+    Notes:
+        The queries for all runs and prioritisation types are evaluated together with `pl.collect_all`,
+        so benchmarking scales with the available cores rather than with the number of runs, at the cost
+        of holding the results of every prioritisation type in memory at once.
+        The results are then written to the database and plotted one prioritisation type at a time
+        over a single connection.
+
+    Args:
+        config (Config): Configuration for benchmarking.
+        output_dir (Path): Output directory for benchmarking results.
+        no_curves (bool): Whether to skip generating binary classification curves.
+    """
+    benchmark_configs = _get_benchmark_configs(config)
+    queries = [
+        _build_stats_queries(type_config.runs, benchmark_type, no_curves, type_config.k_values, type_config.curves)
+        for type_config, benchmark_type in benchmark_configs
+    ]
+    logger.info(f"Evaluating {sum(len(type_queries) for type_queries in queries)} benchmarking queries concurrently.")
+    results = iter(pl.collect_all([query for type_queries in queries for query in type_queries]))
+    conn = duckdb.connect(output_dir.joinpath(f"{config.benchmark_name}.duckdb"))
+    try:
+        for (type_config, benchmark_type), type_queries in zip(benchmark_configs, queries, strict=True):
+            type_results = [next(results) for _ in type_queries]
+            _store_benchmark(
+                conn, type_config, benchmark_type, output_dir, no_curves, *_unpack_stats(type_results, no_curves)
+            )
+            logger.info(f"Finished benchmarking for {benchmark_type.prioritisation_type_string} results.")
+    finally:
+        conn.close()
+
+
+def benchmark_runs(benchmark_config_file: Path, output_dir: Path, no_curves: bool, concurrent: bool = False) -> None:
     """
     Benchmark results for specified runs for comparison.
     Args:
         benchmark_config_file (Path): Path to benchmark config file.
         output_dir (Path): Output directory for benchmarking results.
         no_curves (bool): Whether to skip generating binary classification curves.
+        concurrent (bool): Whether to benchmark every prioritisation type at once. Defaults to benchmarking
+            one prioritisation type at a time.
     """
     output_dir.mkdir(parents=True, exist_ok=True)
-    logger = get_logger()
     start_time = time.perf_counter()
     logger.info("Initiated benchmarking process.")
     config = parse_run_config(benchmark_config_file)
     if Path(output_dir).joinpath(f"{config.benchmark_name}.duckdb").exists():
         logger.error(f"{config.benchmark_name}.duckdb already exists! Exiting.")
         sys.exit(1)
-    gene_analysis_runs = [run for run in config.runs if run.gene_analysis]
-    variant_analysis_runs = [run for run in config.runs if run.variant_analysis]
-    disease_analysis_runs = [run for run in config.runs if run.disease_analysis]
-    if gene_analysis_runs:
-        logger.info("Initiating benchmarking for gene results.")
-        benchmark(
-            Config(
-                benchmark_name=config.benchmark_name,
-                runs=gene_analysis_runs,
-                plot_customisation=config.plot_customisation,
-            ),
-            BenchmarkOutputTypeEnum.GENE.value,
-            output_dir,
-            no_curves,
-        )
-        logger.info("Finished benchmarking for gene results.")
-    if variant_analysis_runs:
-        logger.info("Initiating benchmarking for variant results")
-        benchmark(
-            Config(
-                benchmark_name=config.benchmark_name,
-                runs=variant_analysis_runs,
-                plot_customisation=config.plot_customisation,
-            ),
-            BenchmarkOutputTypeEnum.VARIANT.value,
-            output_dir,
-            no_curves,
-        )
-        logger.info("Finished benchmarking for variant results.")
-    if disease_analysis_runs:
-        logger.info("Initiating benchmarking for disease results")
-        benchmark(
-            Config(
-                benchmark_name=config.benchmark_name,
-                runs=disease_analysis_runs,
-                plot_customisation=config.plot_customisation,
-            ),
-            BenchmarkOutputTypeEnum.DISEASE.value,
-            output_dir,
-            no_curves,
-        )
-        logger.info("Finished benchmarking for disease results.")
+    if concurrent:
+        benchmark_concurrently(config, output_dir, no_curves)
+    else:
+        for type_config, benchmark_type in _get_benchmark_configs(config):
+            logger.info(f"Initiating benchmarking for {benchmark_type.prioritisation_type_string} results.")
+            benchmark(type_config, benchmark_type, output_dir, no_curves)
+            logger.info(f"Finished benchmarking for {benchmark_type.prioritisation_type_string} results.")
     logger.info(f"Finished benchmarking! Total time: {time.perf_counter() - start_time:.2f} seconds.")
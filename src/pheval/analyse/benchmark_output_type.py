@@ -50,4 +50,6 @@ def _get_unique_subset(benchmark_type: BenchmarkOutputType) -> list[str]:
     """
     if benchmark_type.prioritisation_type_string == "disease":
         return ["file_path", "mondo_identifier"]
+    if benchmark_type.prioritisation_type_string == "variant":
+        return ["file_path", "variant_key"]
     return ["file_path", *benchmark_type.columns]
@@ -1,126 +1,202 @@
-import numpy as np
+from enum import Enum
+
 import polars as pl
-from sklearn.metrics import precision_recall_curve, roc_curve
 
 from pheval.utils.logger import get_logger
 
+DEFAULT_MAX_POINTS = 1000
+DEFAULT_BINS = 10000
 
-class BinaryClassificationCurves:
-    """Class for computing and storing ROC & Precision-Recall curves in Polars."""
 
-    @staticmethod
-    def _compute_finite_bounds(result_scan: pl.LazyFrame) -> tuple[float, float]:
-        """
-        Compute min and max finite values in the 'score' column to handle NaN and Inf values.
-        Args:
-            result_scan (pl.LazyFrame): The LazyFrame containing the results for the directory.
+class CurveMode(Enum):
+    """Enumeration of the ways ROC & Precision-Recall curves are computed."""
+
+    EXACT = "exact"
+    """One point for each distinct score."""
+    APPROXIMATE = "approximate"
+    """One point for each of a fixed number of equal width score bins."""
 
-        Returns:
-            Tuple[float, float]: The (max_finite, min_finite) values for normalising scores.
-        """
-        return (
-            result_scan.select(
-                [
-                    pl.col("score").filter(pl.col("score").is_finite()).max().alias("max_finite"),
-                    pl.col("score").filter(pl.col("score").is_finite()).min().alias("min_finite"),
-                ]
-            )
-            .collect()
-            .row(0)
-        )
+
+class BinaryClassificationCurves:
+    """Class for computing ROC & Precision-Recall curves in Polars."""
 
     @staticmethod
-    def _clean_and_extract_data(result_scan: pl.LazyFrame, max_finite: float, min_finite: float) -> pl.LazyFrame:
+    def _clean_and_extract_data(result_scan: pl.LazyFrame) -> pl.LazyFrame:
         """
         Normalise the 'score' column (handling NaNs and Inf values) and extract 'true_positive' labels.
 
+        Notes:
+            NaN scores are replaced with 0, and infinite scores with the maximum or minimum finite score.
+            Results without a score are dropped, as they have no threshold to be predicted positive at.
+
         Args:
             result_scan (pl.LazyFrame): The LazyFrame containing the results for the directory.
-            max_finite (float): The maximum finite score value.
-            min_finite (float): The minimum finite score value.
 
         Returns:
             pl.LazyFrame: A LazyFrame with cleaned 'score' and binary 'true_positive' columns.
         """
-        return result_scan.with_columns(
+        finite_scores = pl.col("score").filter(pl.col("score").is_finite())
+        return result_scan.drop_nulls("score").select(
             [
                 pl.when(pl.col("score").is_nan())
                 .then(0.0)
                 .when(pl.col("score").is_infinite() & (pl.col("score") > 0))
-                .then(max_finite)
+                .then(finite_scores.max())
                 .when(pl.col("score").is_infinite() & (pl.col("score") < 0))
-                .then(min_finite)
+                .then(finite_scores.min())
                 .otherwise(pl.col("score"))
+                .cast(pl.Float64)
                 .alias("score"),
-                pl.when(pl.col("true_positive").is_null())
-                .then(0)
-                .otherwise(pl.col("true_positive").cast(pl.Int8))
-                .alias("true_positive"),
+                pl.col("true_positive").fill_null(False).cast(pl.Int64).alias("true_positive"),
             ]
         )
 
     @staticmethod
-    def _compute_roc_pr_curves(run_identifier: str, labels: np.ndarray, scores: np.ndarray) -> pl.LazyFrame:
+    def _bin_scores(cleaned_data: pl.LazyFrame, bins: int) -> pl.LazyFrame:
+        """
+        Replace each score with the lower edge of its bin, out of equal width bins spanning the scores.
+        Args:
+            cleaned_data (pl.LazyFrame): The cleaned scores and labels.
+            bins (int): The number of bins.
+        Returns:
+            pl.LazyFrame: The binned scores and labels.
+        """
+        min_score, max_score = pl.col("score").min(), pl.col("score").max()
+        bin_width = (max_score - min_score) / bins
+        bin_index = ((pl.col("score") - min_score) / bin_width).floor().fill_nan(0).clip(0, bins - 1)
+        return cleaned_data.with_columns((min_score + bin_index * bin_width).fill_nan(min_score).alias("score"))
+
+    @staticmethod
+    def _count_at_thresholds(cleaned_data: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Count the true and false positives scoring at or above each distinct score, in descending score order.
+
+        Notes:
+            The curves start from an infinite threshold, at which nothing is predicted positive.
+
+        Args:
+            cleaned_data (pl.LazyFrame): The cleaned scores and labels.
+        Returns:
+            pl.LazyFrame: The cumulative `true_positives` and `false_positives` at each `threshold`.
         """
-        Compute ROC and Precision-Recall curves.
+        counts = (
+            cleaned_data.group_by("score")
+            .agg(
+                [
+                    pl.col("true_positive").sum().alias("true_positives"),
+                    (1 - pl.col("true_positive")).sum().alias("false_positives"),
+                ]
+            )
+            .sort("score", descending=True)
+            .select(
+                [
+                    pl.col("score").alias("threshold"),
+                    pl.col("true_positives").cum_sum(),
+                    pl.col("false_positives").cum_sum(),
+                ]
+            )
+        )
+        origin = pl.LazyFrame(
+            {"threshold": [float("inf")], "true_positives": [0], "false_positives": [0]},
+            schema={"threshold": pl.Float64, "true_positives": pl.Int64, "false_positives": pl.Int64},
+        )
+        return pl.concat([origin, counts], how="vertical")
 
+    @staticmethod
+    def _compute_rates(counts: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Compute the ROC & Precision-Recall curve coordinates from the cumulative counts at each threshold.
         Args:
-            labels (np.ndarray): Binary ground truth labels (0 or 1).
-            scores (np.ndarray): Prediction scores.
+            counts (pl.LazyFrame): The cumulative counts at each threshold.
+        Returns:
+            pl.LazyFrame: The counts with their FPR, TPR, precision and recall.
+        """
+        positives, negatives = pl.col("true_positives").last(), pl.col("false_positives").last()
+        return counts.with_columns(
+            [
+                (pl.col("false_positives") / negatives).alias("fpr"),
+                (pl.col("true_positives") / positives).alias("tpr"),
+                (pl.col("true_positives") / (pl.col("true_positives") + pl.col("false_positives")))
+                .fill_nan(1.0)
+                .alias("precision"),
+                (pl.col("true_positives") / positives).alias("recall"),
+            ]
+        )
+
+    @staticmethod
+    def _downsample(curve: pl.LazyFrame, max_points: int) -> pl.LazyFrame:
+        """
+        Reduce a curve to at most `max_points` points spread evenly along it.
+
+        Notes:
+            A point is kept each time the average of its TPR and FPR, which rises from 0 to 1 along the curve,
+            enters the next of `max_points - 1` equal steps. The last point is always kept.
 
+        Args:
+            curve (pl.LazyFrame): The curve, in descending threshold order.
+            max_points (int): The maximum number of points.
         Returns:
-            pl.LazyFrame: A LazyFrame containing the computed FPR, TPR, Precision, Recall, and Thresholds.
+            pl.LazyFrame: The downsampled curve.
         """
-        fpr, tpr, roc_thresholds = roc_curve(labels, scores, pos_label=1)
-        precision, recall, pr_thresholds = precision_recall_curve(labels, scores, pos_label=1)
-
-        return pl.LazyFrame(
-            {
-                "run_identifier": [run_identifier],
-                "fpr": [fpr.tolist()],
-                "tpr": [tpr.tolist()],
-                "threshold_roc": [roc_thresholds.tolist()],
-                "precision": [precision.tolist()],
-                "recall": [recall.tolist()],
-                "threshold_pr": [pr_thresholds.tolist()],
-            }
+        progress = ((pl.col("tpr").fill_nan(0) + pl.col("fpr").fill_nan(0)) / 2 * (max_points - 2)).floor()
+        return curve.filter(
+            (pl.len() <= max_points) | progress.is_first_distinct() | (pl.int_range(pl.len()) == pl.len() - 1)
         )
 
     @classmethod
-    def process(cls, result_scan: pl.LazyFrame, run_identifier: str) -> pl.LazyFrame:
+    def process(
+        cls,
+        result_scan: pl.LazyFrame,
+        run_identifier: str,
+        mode: CurveMode = CurveMode.EXACT,
+        max_points: int = DEFAULT_MAX_POINTS,
+        bins: int = DEFAULT_BINS,
+    ) -> pl.LazyFrame:
         """
-        Process scores, extract true labels, compute ROC and Precision-Recall curves,
-        and store results in a Polars LazyFrame with NumPy arrays.
+        Compute ROC & Precision-Recall curves, with one row per point of the curves.
+
+        Notes:
+            Scores are grouped and sorted once, and the true and false positives at each threshold
+            are cumulative sums over the sorted scores, so only the distinct scores are held in memory.
+            In approximate mode scores are first rounded down to their bin, bounding the number of
+            distinct scores regardless of the number of results.
 
         Args:
             result_scan (pl.LazyFrame): The LazyFrame containing the results for the directory.
             run_identifier (str): Identifier for this run.
+            mode (CurveMode): Whether to compute the curves exactly or from binned scores.
+            max_points (int): The maximum number of points kept for each run, at least 2.
+            bins (int): The number of score bins in approximate mode.
 
         Returns:
-            pl.LazyFrame: A LazyFrame containing ROC & PR curve data with NumPy arrays.
+            pl.LazyFrame: The `threshold`, cumulative `true_positives` and `false_positives`, `fpr`, `tpr`,
+                `precision` and `recall` of each point, in descending threshold order.
         """
-        max_finite, min_finite = cls._compute_finite_bounds(result_scan)
-        cleaned_data = (
-            cls._clean_and_extract_data(result_scan, max_finite, min_finite)
-            .select(["true_positive", "score"])
-            .collect()
-        )
-        return cls._compute_roc_pr_curves(
-            run_identifier,
-            cleaned_data["true_positive"].to_numpy().flatten(),
-            cleaned_data["score"].to_numpy().flatten(),
-        )
-
-
-def compute_curves(run_identifier: str, result_scan: pl.LazyFrame) -> pl.LazyFrame:
+        cleaned_data = cls._clean_and_extract_data(result_scan)
+        if mode == CurveMode.APPROXIMATE:
+            cleaned_data = cls._bin_scores(cleaned_data, bins)
+        curve = cls._compute_rates(cls._count_at_thresholds(cleaned_data))
+        return cls._downsample(curve, max_points).select([pl.lit(run_identifier).alias("run_identifier"), pl.all()])
+
+
+def compute_curves(
+    run_identifier: str,
+    result_scan: pl.LazyFrame,
+    mode: CurveMode = CurveMode.EXACT,
+    max_points: int = DEFAULT_MAX_POINTS,
+    bins: int = DEFAULT_BINS,
+) -> pl.LazyFrame:
     """
     Compute ROC and Precision-Recall curves.
     Args:
         result_scan (pl.LazyFrame): The LazyFrame containing the results for the directory.
         run_identifier (str): Identifier for this run.
+        mode (CurveMode): Whether to compute the curves exactly or from binned scores.
+        max_points (int): The maximum number of points kept for each run.
+        bins (int): The number of score bins in approximate mode.
     Returns:
-        pl.LazyFrame: LazyFrame containing the ROC & Precision-Recall curve data with NumPy arrays.
+        pl.LazyFrame: LazyFrame containing the points of the ROC & Precision-Recall curves.
     """
     logger = get_logger()
     logger.info("Calculating ROC and Precision-Recall metrics")
-    return BinaryClassificationCurves.process(result_scan, run_identifier)
+    return BinaryClassificationCurves.process(result_scan, run_identifier, mode, max_points, bins)
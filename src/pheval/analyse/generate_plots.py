@@ -480,11 +480,12 @@ class PlotGenerator:
         Args:
         """
         plt.clf()
-        palette = self.get_palette(len(curves))
-        for i, row in enumerate(curves.iter_rows(named=True)):
-            run_identifier = row["run_identifier"]
-            fpr = row["fpr"]
-            tpr = row["tpr"]
+        run_identifiers = curves["run_identifier"].unique(maintain_order=True)
+        palette = self.get_palette(len(run_identifiers))
+        for i, run_identifier in enumerate(run_identifiers):
+            run_curves = curves.filter(pl.col("run_identifier") == run_identifier).drop_nulls(["fpr", "tpr"])
+            fpr = run_curves["fpr"].to_numpy()
+            tpr = run_curves["tpr"].to_numpy()
             roc_auc = auc(fpr, tpr)
             plt.plot(
                 fpr,
@@ -516,12 +517,13 @@ class PlotGenerator:
         """
         plt.clf()
         plt.figure()
-        palette = self.get_palette(len(curves))
-        for i, row in enumerate(curves.iter_rows(named=True)):
-            run_identifier = row["run_identifier"]
-            precision = row["precision"]
-            recall = row["recall"]
-            pr_auc = auc(recall[::-1], precision[::-1])
+        run_identifiers = curves["run_identifier"].unique(maintain_order=True)
+        palette = self.get_palette(len(run_identifiers))
+        for i, run_identifier in enumerate(run_identifiers):
+            run_curves = curves.filter(pl.col("run_identifier") == run_identifier).drop_nulls(["precision", "recall"])
+            precision = run_curves["precision"].to_numpy()
+            recall = run_curves["recall"].to_numpy()
+            pr_auc = auc(recall, precision)
             plt.plot(
                 recall,
                 precision,
@@ -592,6 +594,33 @@ def generate_plots(
             plot_generator.generate_rank_change_plot(rank_changes_df, run1, run2, benchmark_output_type)
 
 
+def load_curves(curve_table: str, conn: DuckDBPyConnection) -> pl.DataFrame:
+    """
+    Load the binary classification curves from a database, with one row per point of each curve.
+
+    Notes:
+        Databases written by earlier versions of PhEval store the curves of each run as list columns
+        in a single row. Their ROC and precision-recall points are exploded into separate rows,
+        with the columns of the other curve left null.
+
+    Args:
+        curve_table (str): Name of the binary classification curves table.
+        conn (DuckDBPyConnection): Connection to the database.
+    Returns:
+        pl.DataFrame: The curves, with the `fpr` and `tpr` or `precision` and `recall` of each point.
+    """
+    curves = load_table_lazy(curve_table, conn).collect()
+    if not isinstance(curves.schema["fpr"], pl.List):
+        return curves
+    return pl.concat(
+        [
+            curves.select(["run_identifier", "fpr", "tpr"]).explode(["fpr", "tpr"]),
+            curves.select(["run_identifier", "precision", "recall"]).explode(["precision", "recall"]),
+        ],
+        how="diagonal",
+    )
+
+
 def generate_plots_from_db(db_path: Path, config: Path, output_dir: Path) -> None:
     """
     Generate plots from database file.
@@ -625,7 +654,7 @@ def generate_plots_from_db(db_path: Path, config: Path, output_dir: Path) -> Non
                 f"Generating plots for {benchmark_output_type.value.prioritisation_type_string} prioritisation."
             )
             benchmarking_results_df = load_table_lazy(summary_table, conn).collect()
-            curves_df = load_table_lazy(curve_table, conn).collect()
+            curves_df = load_curves(curve_table, conn)
             generate_plots(
                 benchmark_name=benchmark_config_file.benchmark_name,
                 benchmarking_results_df=benchmarking_results_df,
@@ -633,6 +662,7 @@ def generate_plots_from_db(db_path: Path, config: Path, output_dir: Path) -> Non
                 benchmark_output_type=benchmark_output_type.value,
                 plot_customisation=benchmark_config_file.plot_customisation,
                 output_dir=output_dir,
+                no_curves=False,
                 conn=conn,
                 run_identifiers=[run.run_identifier for run in benchmark_config_file.runs],
             )
@@ -1,11 +1,13 @@
+import math
 from dataclasses import dataclass
+from itertools import accumulate
 
-import numpy as np
 import polars as pl
-from sklearn.metrics import ndcg_score
 
 from pheval.utils.logger import get_logger
 
+DEFAULT_K_VALUES = [1, 3, 5, 10]
+
 
 @dataclass(frozen=True)
 class Ranks:
@@ -13,31 +15,6 @@ class Ranks:
     Class for calculating ranking statistics.
     """
 
-    TOP_1 = pl.col("rank").eq(1).sum().alias("top1")
-    TOP_3 = pl.col("rank").is_between(1, 3, closed="both").sum().alias("top3")
-    TOP_5 = pl.col("rank").is_between(1, 5, closed="both").sum().alias("top5")
-    TOP_10 = pl.col("rank").is_between(1, 10, closed="both").sum().alias("top10")
-    FOUND = pl.col("rank").gt(0).sum().alias("found")
-    TOTAL = pl.len().alias("total")
-    NUMBER_OF_SAMPLES = pl.col("file_path").n_unique().alias("number_of_samples")
-    MRR = ((1 / pl.col("rank").filter(pl.col("rank") > 0)).sum() / pl.len()).alias("mrr")
-
-    @classmethod
-    def _filter_results(cls, df: pl.LazyFrame, k: int) -> pl.LazyFrame:
-        """
-        Filter for ranks within k.
-        Args:
-            df (pl.LazyFrame): The dataframe to filter.
-            k (int): The number upper rank limit.
-
-        Returns:
-            pl.LazyFrame: The filtered dataframe.
-        """
-        df = df.filter(pl.col("rank").is_between(1, k, closed="both"))
-        return df.group_by("file_path").agg(
-            pl.col("rank").sort().alias("ranks"),
-        )
-
     @classmethod
     def percentage_at_k(cls, k: int) -> pl.Expr:
         """
@@ -83,132 +60,170 @@ class Ranks:
         return ((2 * precision_expr * recall_expr) / (precision_expr + recall_expr)).fill_nan(0).alias(f"f_beta@{k}")
 
     @classmethod
-    def _average_precision_at_k(cls, df: pl.LazyFrame, k: int) -> pl.LazyFrame:
+    def average_precision_at_k(cls, k: int) -> pl.Expr:
         """
-        Compute Average Precision at K (AP@K) for each query.
-
-        AP@K = (1 / min(k, R)) * sum(P(i) * rel(i)) for i ≤ k
-
+        Compute AP@K for each query from its sorted list of found true positive ranks.
         Args:
-            df (pl.LazyFrame): The dataframe calculate AP@K for each query.
             k (int): The upper rank limit.
         Returns:
-            pl.LazyFrame: The dataframe with AP@K for each query.
+            pl.Expr: The expression for calculating AP@K from the `ranks` list column, 0 for queries
+                without a true positive within k.
         """
-        filtered_df = cls._filter_results(df, k)
-        df_grouped = filtered_df.with_columns(
-            pl.struct("ranks")
-            .map_elements(lambda row: cls._compute_ap_k(np.array(row["ranks"])), return_dtype=pl.Float64)
+        relevant_ranks = pl.col("ranks").list.eval(pl.element().filter(pl.element() <= k))
+        return (
+            (pl.int_ranges(1, relevant_ranks.list.len() + 1) / relevant_ranks)
+            .list.mean()
+            .fill_null(0.0)
             .alias(f"ap@{k}")
         )
-        return df_grouped.select(["file_path", f"ap@{k}"])
 
-    @staticmethod
-    def _compute_ap_k(ranks: np.array) -> np.floating:
-        """
-        Helper function to compute AP@K for a single query.
-        Args:
-            ranks (np.array): The ranks to compute AP@K.
-        Returns:
-            float: The AP@K.
+    @classmethod
+    def normalised_discounted_cumulative_gain_at_k(cls, k: int) -> pl.Expr:
         """
-        num_relevant = np.arange(1, len(ranks) + 1)
-        precision_at_k = num_relevant / ranks
-        return np.mean(precision_at_k)
+        Compute NDCG@K for each query from its sorted list of found true positive ranks.
 
-    @classmethod
-    def mean_average_precision_at_k(cls, df: pl.LazyFrame, k: int) -> float:
-        ap_at_k_df = cls._average_precision_at_k(df, k)
-        ap_sum = ap_at_k_df.select(pl.col(f"ap@{k}").sum()).collect().item()
-        num_samples = df.select(Ranks.NUMBER_OF_SAMPLES).collect().item()
-        return ap_sum / num_samples
+        Notes:
+            Scores the ideal ranking against the true positive positions, as `sklearn.metrics.ndcg_score` does,
+            averaging the gain over tied scores. With m distinct true positive ranks within k, of which a are
+            within the top m, and D(i..j) the sum of 1 / log2(p + 1) for positions p from i to j,
+            this is ((a / m) * D(1..m) + ((m - a) / (k - m)) * D(m+1..k)) / D(1..m).
 
-    @classmethod
-    def _calculate_ndcg_at_k(cls, ranks: list[int], k: int) -> float:
-        """
-        Compute NDCG@K for a single query.
         Args:
-            ranks (List[int]): The ranks to compute NDCG@K.
             k (int): The upper rank limit.
         Returns:
-            float: The NDCG@K.
-        """
-        result_ranks = np.zeros(k, dtype=int)
-        indices = np.array(ranks) - 1
-        valid_indices = indices[(indices >= 0) & (indices < k)]
-        result_ranks[valid_indices] = 3
-        ideal_ranking = np.sort(result_ranks)[::-1]
-        return (
-            ndcg_score(result_ranks.reshape(1, -1), ideal_ranking.reshape(1, -1)) if np.sum(result_ranks) > 0 else 0.0
-        )
+            pl.Expr: The expression for calculating NDCG@K from the `ranks` list column.
+        """
+        discounts = (1 / math.log2(position + 1) for position in range(1, k + 1))
+        cumulative_discounts = list(accumulate(discounts, initial=0.0))
+        relevant_ranks = pl.col("ranks").list.eval(pl.element().filter(pl.element() <= k).unique())
+        num_relevant = relevant_ranks.list.len()
+        num_relevant_in_top = (relevant_ranks - num_relevant).list.eval(pl.element() <= 0).list.sum()
+        top_discount = num_relevant.replace_strict(list(range(k + 1)), cumulative_discounts, return_dtype=pl.Float64)
+        ndcg = (
+            num_relevant_in_top / num_relevant * top_discount
+            + (num_relevant - num_relevant_in_top) / (k - num_relevant) * (cumulative_discounts[k] - top_discount)
+        ) / top_discount
+        return pl.when(num_relevant == 0).then(0.0).when(num_relevant == k).then(1.0).otherwise(ndcg).alias(f"NDCG@{k}")
+
+
+def _group_ranks_by_case(true_positive_scan: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Group the true positive results by query.
+    Args:
+        true_positive_scan (pl.LazyFrame): The true positive results.
+    Returns:
+        pl.LazyFrame: One row per query, with the sorted list of found true positive `ranks`
+            and the `total` number of true positives.
+    """
+    return true_positive_scan.group_by("file_path").agg(
+        pl.col("rank").filter(pl.col("rank") > 0).sort().alias("ranks"),
+        pl.len().alias("total"),
+    )
 
-    @classmethod
-    def mean_normalised_discounted_cumulative_gain(cls, df: pl.LazyFrame, k: int) -> float:
-        filtered_df = cls._filter_results(df, k)
-        ndcg_df = filtered_df.with_columns(
-            pl.struct("ranks")
-            .map_elements(lambda row: cls._calculate_ndcg_at_k(row["ranks"], k), return_dtype=pl.Float64)
-            .alias(f"NDCG@{k}")
-        )
-        ndcg_sum = ndcg_df.select(pl.col(f"NDCG@{k}").sum()).collect().item()
-        num_samples = df.select(Ranks.NUMBER_OF_SAMPLES).collect().item()
-        return ndcg_sum / num_samples
+
+def compute_rank_histogram(true_positive_scan: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Count the found true positives at each rank.
+    Args:
+        true_positive_scan (pl.LazyFrame): The true positive results.
+    Returns:
+        pl.LazyFrame: The `count` of true positives at each `rank`, in rank order, with the `cumulative_count`
+            of true positives at or above it.
+    """
+    return (
+        true_positive_scan.filter(pl.col("rank") > 0)
+        .group_by("rank")
+        .agg(pl.len().alias("count"))
+        .sort("rank")
+        .with_columns(pl.col("count").cum_sum().alias("cumulative_count"))
+    )
 
 
-def compute_rank_stats(run_identifier: str, result_scan: pl.LazyFrame) -> pl.LazyFrame:
+def compute_rank_stats(
+    run_identifier: str, result_scan: pl.LazyFrame, k_values: list[int] = DEFAULT_K_VALUES
+) -> pl.LazyFrame:
     """
     Computes ranking statistics for a given benchmarking run.
     Args:
         run_identifier (str): The identifier of the benchmarking run.
         result_scan (pl.LazyFrame): The scan of the directory to compute ranking statistics for.
+        k_values (List[int]): The upper rank limits to compute the statistics for.
+    Returns:
+        pl.LazyFrame: The ranking statistics, see `compute_rank_stats_from_ranks`.
     """
     logger = get_logger()
     logger.info(f"Generating ranking statistics for {run_identifier}...")
     true_positive_scan = result_scan.filter(pl.col("true_positive"))
-    rankings = true_positive_scan.select(
+    return compute_rank_stats_from_ranks(
+        run_identifier, true_positive_scan, compute_rank_histogram(true_positive_scan), k_values
+    )
+
+
+def compute_rank_stats_from_ranks(
+    run_identifier: str,
+    true_positive_ranks: pl.LazyFrame,
+    rank_histogram: pl.LazyFrame,
+    k_values: list[int] = DEFAULT_K_VALUES,
+) -> pl.LazyFrame:
+    """
+    Computes ranking statistics from the true positive ranks of a benchmarking run.
+
+    Notes:
+        Top-k counts, percentages, precision, F-beta and MRR are derived from the rank histogram,
+        so each k only adds a lookup of its cumulative count. MAP@k and NDCG@k depend on the ranks
+        within each query and are aggregated from the true positive ranks grouped by query.
+        The true positive ranks are read once however many k values are requested.
+
+    Args:
+        run_identifier (str): The identifier of the benchmarking run.
+        true_positive_ranks (pl.LazyFrame): The `rank` of each true positive, 0 if not found, and the `file_path`
+            of the query it belongs to.
+        rank_histogram (pl.LazyFrame): The histogram of the true positive ranks, as returned by
+            `compute_rank_histogram`.
+        k_values (List[int]): The upper rank limits to compute the statistics for.
+            NDCG is not computed for k = 1, where it equals the proportion of queries ranked top.
+    Returns:
+        pl.LazyFrame: A single row with the ranking statistics of the run.
+    """
+    k_values = sorted(set(k_values))
+    ndcg_k_values = [k for k in k_values if k > 1]
+    case_ranks = _group_ranks_by_case(true_positive_ranks)
+    rank_counts = rank_histogram.select(
         [
-            pl.lit(run_identifier).alias("run_identifier"),
-            Ranks.TOP_1.alias("top1"),
-            Ranks.TOP_3.alias("top3"),
-            Ranks.TOP_5.alias("top5"),
-            Ranks.TOP_10.alias("top10"),
-            Ranks.FOUND.alias("found"),
-            Ranks.TOTAL.alias("total"),
-            Ranks.NUMBER_OF_SAMPLES.alias("number_of_samples"),
-            Ranks.MRR.alias("mrr"),
+            *[
+                pl.col("cumulative_count")
+                .filter(pl.col("rank") <= k)
+                .last()
+                .fill_null(0)
+                .cast(pl.UInt32)
+                .alias(f"top{k}")
+                for k in k_values
+            ],
+            pl.col("count").sum().cast(pl.UInt32).alias("found"),
+            (pl.col("count") / pl.col("rank")).sum().alias("reciprocal_rank_sum"),
         ]
     )
-
-    return rankings.select(
+    case_stats = case_ranks.select(
+        [
+            pl.col("total").sum().alias("total"),
+            pl.len().alias("number_of_samples"),
+            *[Ranks.average_precision_at_k(k).mean().alias(f"MAP@{k}") for k in k_values],
+            *[Ranks.normalised_discounted_cumulative_gain_at_k(k).mean().alias(f"NDCG@{k}") for k in ndcg_k_values],
+        ]
+    )
+    return rank_counts.join(case_stats, how="cross").select(
         [
-            pl.col("run_identifier"),
-            pl.col("top1"),
-            pl.col("top3"),
-            pl.col("top5"),
-            pl.col("top10"),
+            pl.lit(run_identifier).alias("run_identifier"),
+            *[pl.col(f"top{k}") for k in k_values],
             pl.col("found"),
             pl.col("total"),
             pl.col("number_of_samples"),
-            pl.col("mrr"),
-            Ranks.percentage_at_k(1),
-            Ranks.percentage_at_k(3),
-            Ranks.percentage_at_k(5),
-            Ranks.percentage_at_k(10),
+            (pl.col("reciprocal_rank_sum") / pl.col("total")).alias("mrr"),
+            *[Ranks.percentage_at_k(k) for k in k_values],
             Ranks.percentage_found(),
-            Ranks.precision_at_k(1),
-            Ranks.precision_at_k(3),
-            Ranks.precision_at_k(5),
-            Ranks.precision_at_k(10),
-            Ranks.f_beta_score_at_k(1),
-            Ranks.f_beta_score_at_k(3),
-            Ranks.f_beta_score_at_k(5),
-            Ranks.f_beta_score_at_k(10),
-            pl.lit(Ranks.mean_average_precision_at_k(true_positive_scan, 1)).alias("MAP@1"),
-            pl.lit(Ranks.mean_average_precision_at_k(true_positive_scan, 3)).alias("MAP@3"),
-            pl.lit(Ranks.mean_average_precision_at_k(true_positive_scan, 5)).alias("MAP@5"),
-            pl.lit(Ranks.mean_average_precision_at_k(true_positive_scan, 10)).alias("MAP@10"),
-            pl.lit(Ranks.mean_normalised_discounted_cumulative_gain(true_positive_scan, 3)).alias("NDCG@3"),
-            pl.lit(Ranks.mean_normalised_discounted_cumulative_gain(true_positive_scan, 5)).alias("NDCG@5"),
-            pl.lit(Ranks.mean_normalised_discounted_cumulative_gain(true_positive_scan, 10)).alias("NDCG@10"),
+            *[Ranks.precision_at_k(k) for k in k_values],
+            *[Ranks.f_beta_score_at_k(k) for k in k_values],
+            *[pl.col(f"MAP@{k}") for k in k_values],
+            *[pl.col(f"NDCG@{k}") for k in ndcg_k_values],
         ]
     )
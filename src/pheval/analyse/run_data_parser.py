@@ -1,8 +1,10 @@
 from pathlib import Path
 
 import yaml
-from pydantic import BaseModel, StrictBool, field_validator
+from pydantic import BaseModel, Field, StrictBool, field_validator
 
+from pheval.analyse.binary_classification_curves import DEFAULT_BINS, DEFAULT_MAX_POINTS, CurveMode
+from pheval.analyse.rank_stats import DEFAULT_K_VALUES
 from pheval.utils.logger import get_logger
 
 
@@ -84,16 +86,42 @@ class PlotCustomisation(BaseModel):
     variant_plots: SinglePlotCustomisation
 
 
+class CurveConfig(BaseModel):
+    """
+    Store configurations for the ROC & Precision-Recall curves.
+    Attributes:
+        mode (CurveMode): Whether to compute the curves exactly or from binned scores.
+        max_points (int): The maximum number of points stored and plotted for each run.
+        bins (int): The number of score bins in approximate mode.
+    """
+
+    mode: CurveMode = CurveMode.EXACT
+    max_points: int = Field(default=DEFAULT_MAX_POINTS, ge=2)
+    bins: int = Field(default=DEFAULT_BINS, ge=1)
+
+
 class Config(BaseModel):
     """
     Store configurations for a runs.
     Attributes:
         runs (List[RunConfig]): The list of run configurations.
+        k_values (List[int]): The upper rank limits to compute the top-k statistics for.
+            The limits plotted in the rank summary, 1, 3, 5 and 10, are always included.
+        curves (CurveConfig): Configuration for the ROC & Precision-Recall curves.
     """
 
     benchmark_name: str
     runs: list[RunConfig]
     plot_customisation: PlotCustomisation
+    k_values: list[int] = DEFAULT_K_VALUES
+    curves: CurveConfig = CurveConfig()
+
+    @field_validator("k_values", mode="after")
+    @classmethod
+    def check_k_values(cls, k_values: list[int]):
+        if any(k < 1 for k in k_values):
+            raise ValueError(f"The k values must be positive integers: {k_values}")
+        return sorted(set(k_values) | set(DEFAULT_K_VALUES))
 
 
 def parse_run_config(run_config: Path) -> Config:
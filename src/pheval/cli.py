@@ -9,8 +9,10 @@ from pheval.utils.logger import get_logger, initialise_context
 from .cli_pheval import run, update
 from .cli_pheval_utils import (
     benchmark,
+    compile_truth_set_command,
     create_spiked_vcfs_command,
     generate_plots,
+    merge_shards_command,
     prepare_corpus_command,
     scramble_phenopackets_command,
     semsim_scramble_command,
@@ -64,6 +66,8 @@ pheval_utils.add_command(benchmark)
 pheval_utils.add_command(semsim_to_exomiserdb_command)
 pheval_utils.add_command(prepare_corpus_command)
 pheval_utils.add_command(generate_plots)
+pheval_utils.add_command(compile_truth_set_command)
+pheval_utils.add_command(merge_shards_command)
 
 if __name__ == "__main__":
     main()
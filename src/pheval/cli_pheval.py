@@ -8,6 +8,8 @@ from pathlib import Path
 import click
 
 from pheval.implementations import get_implementation_resolver
+from pheval.post_processing.post_processing import defer_empty_pheval_results, finalise_pheval_results
+from pheval.runners.shards import CaseShard, read_case_ids
 from pheval.utils.file_utils import write_metadata
 from pheval.utils.logger import get_logger
 from pheval.utils.utils import download_hgnc_data, download_mondo_mapping
@@ -70,6 +72,31 @@ logger = get_logger()
     help="Version of the tool implementation.",
     type=str,
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Skip phenopackets completed by a previous run into the output directory with unchanged inputs.",
+)
+@click.option(
+    "--shard-index",
+    required=False,
+    help="Index of the shard of the corpus to run, from 0 to --shard-count - 1.",
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "--shard-count",
+    required=False,
+    help="Number of shards to split the corpus into, each run separately with --shard-index.",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--cases-from",
+    required=False,
+    metavar="PATH",
+    help="File listing the phenopackets to run, one file name or stem per line.",
+    type=Path,
+)
 def run(
     input_dir: Path,
     testdata_dir: Path,
@@ -78,6 +105,10 @@ def run(
     output_dir: Path,
     config: Path,
     version: str,
+    resume: bool,
+    shard_index: int,
+    shard_count: int,
+    cases_from: Path,
 ) -> None:
     """PhEval Runner Command Line Interface
     Args:
@@ -88,18 +119,49 @@ def run(
         output_dir (Path): The path of the output directory
         config (Path): The path of the configuration file (optional e.g., config.yaml)
         version (str): The version of the tool implementation
+        resume (bool): Whether to skip phenopackets completed by a previous run
+        shard_index (int): The index of the shard of the corpus to run (optional)
+        shard_count (int): The number of shards to split the corpus into (optional)
+        cases_from (Path): The path of a file listing the phenopackets to run (optional)
     """
+    shard = None
+    if shard_index is not None or shard_count is not None or cases_from is not None:
+        try:
+            shard = CaseShard(shard_index, shard_count, read_case_ids(cases_from) if cases_from else None)
+        except ValueError as e:
+            raise click.BadParameter(str(e)) from e
     logger.info(f"Executing {runner}.")
     start_time = time.perf_counter()
     runner_class = get_implementation_resolver().lookup(runner)
     runner_instance = runner_class(input_dir, testdata_dir, tmp_dir, output_dir, config, version)
     runner_instance.build_output_directory_structure()
+    runner_instance.load_run_manifest(resume, shard)
+    if shard is not None:
+        logger.info(f"Running a shard of {len(runner_instance.run_cases)} phenopackets.")
+    if resume:
+        logger.info(f"Resuming run with {len(runner_instance.pending_cases)} pending phenopackets.")
+    run_timer = runner_instance.run_timer
     logger.info("Executing prepare phase.")
-    runner_instance.prepare()
-    logger.info("Executing run phase.")
-    runner_instance.run()
-    logger.info("Executing post-processing phase.")
-    runner_instance.post_process()
+    with run_timer.time("prepare"):
+        runner_instance.prepare()
+        runner_instance.start_worker_pool()
+    with defer_empty_pheval_results():
+        logger.info("Executing run phase.")
+        try:
+            with run_timer.time("run"):
+                runner_instance.run()
+        finally:
+            runner_instance.stop_worker_pool()
+        logger.info("Executing post-processing phase.")
+        with run_timer.time("post_process"):
+            runner_instance.post_process()
+            runner_instance.update_run_manifest()
+            finalise_pheval_results(
+                None if shard is None else {phenopacket.stem for phenopacket in runner_instance.run_cases}
+            )
+    for phase_timing in run_timer.phase_timings():
+        logger.info(f"{phase_timing.phase} phase took {phase_timing.wall_time:.2f} seconds.")
+    run_timer.write(output_dir)
     run_metadata = runner_instance.construct_meta_data()
     logger.info(f"Writing metadata for run to {output_dir}.")
     write_metadata(output_dir, run_metadata)
@@ -6,11 +6,13 @@ import click
 
 from pheval.analyse.benchmark import benchmark_runs
 from pheval.analyse.generate_plots import generate_plots_from_db
+from pheval.post_processing.phenopacket_truth_set import compile_truth_set
 from pheval.prepare.create_noisy_phenopackets import scramble_phenopackets
 from pheval.prepare.create_spiked_vcf import spike_vcfs
 from pheval.prepare.custom_exceptions import InputError, MutuallyExclusiveOptionError
 from pheval.prepare.prepare_corpus import prepare_corpus
 from pheval.prepare.update_phenopacket import update_phenopackets
+from pheval.runners.shards import merge_shards
 from pheval.utils.exomiser import semsim_to_exomiserdb
 from pheval.utils.semsim_utils import percentage_diff, semsim_heatmap_plot
 from pheval.utils.utils import semsim_scramble
@@ -356,16 +358,24 @@ def create_spiked_vcfs_command(
     default=False,
     help="Disable generation of ROC and Precision-Recall curves (bar plots are still generated).",
 )
+@click.option(
+    "--concurrent",
+    is_flag=True,
+    default=False,
+    help="Evaluate all runs and prioritisation types at once, using more memory to benchmark faster.",
+)
 def benchmark(
     run_yaml: Path,
     output_dir: Path,
     no_curves: bool,
+    concurrent: bool,
 ):
     """Benchmark the gene/variant/disease prioritisation performance for runs."""
     benchmark_runs(
         run_yaml,
         output_dir,
         no_curves,
+        concurrent,
     )
 
 
@@ -581,3 +591,73 @@ def prepare_corpus_command(
         hg38_vcf_dir,
         output_dir,
     )
+
+
+@click.command("compile-truth-set")
+@click.option(
+    "--phenopacket-dir",
+    "-p",
+    required=True,
+    metavar="PATH",
+    help="Path to phenopacket corpus directory.",
+    type=Path,
+)
+@click.option(
+    "--output",
+    "-o",
+    metavar="PATH",
+    required=False,
+    help="Path to write the truth set table to. Defaults to <phenopacket-dir>_truth_set.parquet.",
+    type=Path,
+)
+def compile_truth_set_command(phenopacket_dir: Path, output: Path):
+    """
+    Compile the causative genes, variants and diseases of a phenopacket corpus into a truth set table,
+    used by post-processing and benchmarking instead of parsing every phenopacket.
+
+    Args:
+        phenopacket_dir (Path): The path to the directory containing Phenopackets.
+        output (Path): The path to write the truth set table to (optional).
+    """
+    compile_truth_set(phenopacket_dir, output)
+
+
+@click.command("merge-shards")
+@click.option(
+    "--shard-dir",
+    "-s",
+    required=True,
+    multiple=True,
+    metavar="PATH",
+    help="Output directory of a shard of the run, repeated for every shard.",
+    type=Path,
+)
+@click.option(
+    "--phenopacket-dir",
+    "-p",
+    required=True,
+    metavar="PATH",
+    help="Path to phenopacket corpus directory.",
+    type=Path,
+)
+@click.option(
+    "--output-dir",
+    "-o",
+    required=True,
+    metavar="PATH",
+    help="Output directory to merge the shards into.",
+    type=Path,
+)
+def merge_shards_command(shard_dir: list[Path], phenopacket_dir: Path, output_dir: Path):
+    """
+    Validate that the shards of a sharded pheval run cover the corpus and merge their results for benchmarking.
+
+    Args:
+        shard_dir (List[Path]): The output directories of the shards.
+        phenopacket_dir (Path): The path to the directory containing Phenopackets.
+        output_dir (Path): The output directory to merge the shards into.
+    """
+    try:
+        merge_shards(list(shard_dir), phenopacket_dir, output_dir)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
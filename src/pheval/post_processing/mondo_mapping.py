@@ -1,23 +1,89 @@
+import hashlib
+import os
+from functools import cache
 from pathlib import Path
 
 import polars as pl
 
+from pheval.utils.logger import get_logger
 
-def parse_mondo_mapping_table() -> pl.DataFrame:
+logger = get_logger()
+
+MONDO_MAPPING_PATH = Path(__file__).parent.parent / "resources" / "mondo.sssom.tsv"
+
+
+def _get_cache_dir() -> Path:
+    """
+    Get the PhEval user cache directory, following the XDG base directory specification.
+    Returns:
+        Path: `$XDG_CACHE_HOME/pheval`, defaulting to `~/.cache/pheval`.
+    """
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")).joinpath("pheval")
+
+
+def _get_mondo_mapping_cache_path(mondo_mapping_path: Path) -> Path:
+    """
+    Get the path of the Arrow IPC cache for a Mondo SSSOM table, keyed by the path and modification time of the table.
+    Args:
+        mondo_mapping_path (Path): Path to the Mondo SSSOM table.
+    Returns:
+        Path: Path to the Arrow IPC cache in the user cache directory.
+    """
+    path_key = hashlib.sha256(str(mondo_mapping_path.resolve()).encode()).hexdigest()[:16]
+    return _get_cache_dir().joinpath(
+        f"{mondo_mapping_path.name}.{path_key}.{mondo_mapping_path.stat().st_mtime_ns}.arrow"
+    )
+
+
+def _write_mondo_mapping_cache(mondo_mapping_table: pl.DataFrame, cache_path: Path) -> None:
+    """
+    Write the parsed Mondo SSSOM table to an Arrow IPC cache, removing caches of previous versions of the table.
+    Args:
+        mondo_mapping_table (pl.DataFrame): The parsed Mondo SSSOM table.
+        cache_path (Path): Path to the Arrow IPC cache.
+    """
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        for stale_cache_path in cache_path.parent.glob(f"{cache_path.name.rsplit('.', 2)[0]}.*.arrow"):
+            stale_cache_path.unlink(missing_ok=True)
+        tmp_cache_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        mondo_mapping_table.write_ipc(tmp_cache_path)
+        os.replace(tmp_cache_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Unable to cache the Mondo SSSOM table to {cache_path}: {e}")
+
+
+def parse_mondo_mapping_table(mondo_mapping_path: Path = MONDO_MAPPING_PATH) -> pl.DataFrame:
     """
     Parse the Mondo SSSOM table.
+
+    Notes:
+        The parsed table is cached in Arrow IPC format in the user cache directory, see `_get_cache_dir`,
+        so later processes read the cache rather than parsing the TSV. The TSV is only parsed
+        when there is no cache for its current path and modification time, or the cache cannot be read.
+
+    Args:
+        mondo_mapping_path (Path): Path to the Mondo SSSOM table. Defaults to the PhEval resources directory.
     Returns:
         pl.DataFrame: Mondo SSSOM table.
     """
+    cache_path = _get_mondo_mapping_cache_path(mondo_mapping_path)
+    if cache_path.exists():
+        try:
+            return pl.read_ipc(cache_path, memory_map=True)
+        except (OSError, pl.exceptions.PolarsError) as e:
+            logger.warning(f"Unable to read the cached Mondo SSSOM table {cache_path}: {e}")
     df = pl.read_csv(
-        Path(__file__).parent.parent / "resources" / "mondo.sssom.tsv",
+        mondo_mapping_path,
         separator="\t",
         comment_prefix="#",
     )
     orphanet_rows = df.filter(pl.col("object_id").str.starts_with("Orphanet:"))
     orpha_rows = orphanet_rows.with_columns(pl.col("object_id").str.replace("^Orphanet:", "ORPHA:").alias("object_id"))
 
-    return pl.concat([df, orpha_rows], how="vertical")
+    mondo_mapping_table = pl.concat([df, orpha_rows], how="vertical")
+    _write_mondo_mapping_cache(mondo_mapping_table, cache_path)
+    return mondo_mapping_table
 
 
 def map_disease_id(disease_identifier: str, mondo_mapping_table: pl.DataFrame) -> str:
@@ -33,3 +99,80 @@ def map_disease_id(disease_identifier: str, mondo_mapping_table: pl.DataFrame) -
     if mapped_identifier.height > 0:
         return mapped_identifier["subject_id"].item()
     return disease_identifier
+
+
+class MondoIndex:
+    """
+    Index of the Mondo SSSOM table for mapping whole columns of disease identifiers to MONDO IDs.
+
+    Notes:
+        The index is built once from the SSSOM table, keeping a single MONDO ID per mapped identifier,
+        so that a column of disease identifiers can be mapped with a single join rather than
+        filtering the full table for every identifier.
+    """
+
+    def __init__(self, mondo_mapping_table: pl.DataFrame):
+        """
+        Initialise the MondoIndex class.
+        Args:
+            mondo_mapping_table (pl.DataFrame): The Mondo SSSOM table.
+        """
+        self.mapping = (
+            mondo_mapping_table.select(
+                pl.col("object_id").cast(pl.String),
+                pl.col("subject_id").cast(pl.String).alias("_mondo_id"),
+            )
+            .unique(subset="object_id", keep="first", maintain_order=True)
+            .rechunk()
+        )
+
+    def map_identifiers(
+        self,
+        results: pl.DataFrame,
+        identifier_column: str = "disease_identifier",
+        mapped_column: str = "mondo_identifier",
+    ) -> pl.DataFrame:
+        """
+        Map a column of disease identifiers to MONDO IDs.
+        Identifiers without a MONDO mapping are kept as they are.
+        Args:
+            results (pl.DataFrame): The results containing the disease identifiers.
+            identifier_column (str): The column containing the disease identifiers to map.
+            mapped_column (str): The column to write the MONDO IDs to.
+        Returns:
+            pl.DataFrame: The results with the mapped MONDO ID column.
+        """
+        return (
+            results.drop(mapped_column, strict=False)
+            .join(
+                self.mapping,
+                left_on=identifier_column,
+                right_on="object_id",
+                how="left",
+                maintain_order="left",
+            )
+            .with_columns(pl.coalesce("_mondo_id", identifier_column).alias(mapped_column))
+            .drop("_mondo_id")
+        )
+
+    def map_identifier(self, disease_identifier: str) -> str:
+        """
+        Map a single disease identifier to a MONDO ID.
+        Args:
+            disease_identifier (str): The disease identifier to map to MONDO.
+        Returns:
+            str: The MONDO ID.
+        """
+        return self.map_identifiers(pl.DataFrame({"disease_identifier": [disease_identifier]}))[
+            "mondo_identifier"
+        ].item()
+
+
+@cache
+def get_mondo_index() -> MondoIndex:
+    """
+    Get the Mondo mapping index, loading the Mondo SSSOM table on first use.
+    Returns:
+        MondoIndex: The Mondo mapping index.
+    """
+    return MondoIndex(parse_mondo_mapping_table())
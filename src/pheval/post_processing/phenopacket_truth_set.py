@@ -1,8 +1,12 @@
+import hashlib
 from pathlib import Path
 
 import polars as pl
+import pyarrow.parquet as pq
 
-from pheval.post_processing.mondo_mapping import map_disease_id
+from pheval.post_processing.mondo_mapping import MondoIndex, get_mondo_index
+from pheval.utils.file_utils import files_with_suffix
+from pheval.utils.logger import get_logger
 from pheval.utils.phenopacket_utils import (
     GenomicVariant,
     PhenopacketUtil,
@@ -11,6 +15,27 @@ from pheval.utils.phenopacket_utils import (
     phenopacket_reader,
 )
 
+logger = get_logger()
+
+CORPUS_FINGERPRINT_METADATA_KEY = b"pheval_corpus_fingerprint"
+
+TRUTH_SET_SCHEMA = pl.Schema(
+    {
+        "case_id": pl.String,
+        "entity_type": pl.String,
+        "gene_symbol": pl.String,
+        "gene_identifier": pl.String,
+        "chrom": pl.String,
+        "start": pl.Int64,
+        "end": pl.Int64,
+        "ref": pl.String,
+        "alt": pl.String,
+        "disease_name": pl.String,
+        "disease_identifier": pl.String,
+        "mondo_identifier": pl.String,
+    }
+)
+
 
 def calculate_end_pos(variant_start: int, variant_ref: str) -> int:
     """Calculate the end position for a variant
@@ -24,11 +49,99 @@ def calculate_end_pos(variant_start: int, variant_ref: str) -> int:
     return variant_start + len(variant_ref) - 1
 
 
+def normalise_chromosome(chrom: pl.Expr) -> pl.Expr:
+    """
+    Normalise chromosome names, dropping any `chr` prefix and naming the mitochondrial chromosome `MT`.
+    Args:
+        chrom (pl.Expr): Chromosome names.
+    Returns:
+        pl.Expr: Normalised chromosome names.
+    """
+    return chrom.cast(pl.String).str.replace(r"^(?i)chr", "").str.to_uppercase().str.replace(r"^M$", "MT")
+
+
+def variant_key() -> pl.Expr:
+    """
+    Compute a 64-bit hashed key identifying a variant from the `chrom`, `start`, `end`, `ref` and `alt` columns.
+    The chromosome is normalised first, so `chr1` and `1` give the same key.
+    Returns:
+        pl.Expr: The `variant_key` column.
+    """
+    return (
+        pl.struct(
+            normalise_chromosome(pl.col("chrom")),
+            pl.col("start").cast(pl.Int64),
+            pl.col("end").cast(pl.Int64),
+            pl.col("ref").cast(pl.String),
+            pl.col("alt").cast(pl.String),
+        )
+        .hash(seed=0)
+        .alias("variant_key")
+    )
+
+
+def _case_keys(ranked_results: pl.DataFrame) -> list[str]:
+    """
+    Get the columns identifying the phenopacket of each result.
+    Args:
+        ranked_results (pl.DataFrame): Ranked results, optionally for several phenopackets tagged with a `case_id`.
+    Returns:
+        List[str]: `case_id` for results stacked across phenopackets, otherwise no columns.
+    """
+    return ["case_id"] if "case_id" in ranked_results.columns else []
+
+
+def _is_known_entity(ranked_results: pl.DataFrame, known_entities: pl.DataFrame, on: list[str]) -> pl.Series:
+    """
+    Flag the ranked results matching a known entity on the given columns.
+    Args:
+        ranked_results (pl.DataFrame): Ranked results.
+        known_entities (pl.DataFrame): Classified known entities.
+        on (List[str]): The columns to match on.
+    Returns:
+        pl.Series: Boolean series, True where the ranked result is a known entity.
+    """
+    return (
+        ranked_results.select(on)
+        .join(
+            known_entities.select(on).unique().with_columns(pl.lit(True).alias("known")),
+            on=on,
+            how="left",
+            maintain_order="left",
+        )["known"]
+        .fill_null(False)
+    )
+
+
+def _missing_entities(classified_results: pl.DataFrame, ranked_results: pl.DataFrame, on: list[str]) -> pl.DataFrame:
+    """
+    Get the classified known entities absent from the ranked results.
+    Args:
+        classified_results (pl.DataFrame): Classified known entities.
+        ranked_results (pl.DataFrame): Ranked results.
+        on (List[str]): The columns to match on.
+    Returns:
+        pl.DataFrame: Classified known entities not found in the ranked results.
+    """
+    return classified_results.join(ranked_results.select(on).unique(), on=on, how="anti", maintain_order="left")
+
+
 class PhenopacketTruthSet:
     """Class for finding the causative gene/disease/variant from a phenopacket"""
 
-    def __init__(self, phenopacket_dir: Path):
+    def __init__(self, phenopacket_dir: Path, truth_set_table: pl.DataFrame | None = None):
+        """
+        Initialise the PhenopacketTruthSet class.
+        Args:
+            phenopacket_dir (Path): The directory containing the phenopackets.
+            truth_set_table (pl.DataFrame, optional): A compiled truth set table for the phenopacket directory,
+                used instead of parsing the phenopackets.
+        """
         self.phenopacket_dir = phenopacket_dir
+        self.truth_set_table = truth_set_table
+        self._truth_set_entities: dict[tuple[str, str], list[dict]] | None = None
+        self._phenopacket_utils: dict[str, PhenopacketUtil] = {}
+        self._classified_results: dict[tuple[str, str], pl.DataFrame] = {}
 
     def _get_phenopacket_path(self, phenopacket_name: str) -> Path:
         """
@@ -51,9 +164,26 @@ class PhenopacketTruthSet:
         Returns:
             PhenopacketUtil: PhenopacketUtil object.
         """
-        phenopacket_path = self._get_phenopacket_path(phenopacket_name)
-        phenopacket = phenopacket_reader(phenopacket_path)
-        return PhenopacketUtil(phenopacket)
+        if phenopacket_name not in self._phenopacket_utils:
+            phenopacket_path = self._get_phenopacket_path(phenopacket_name)
+            self._phenopacket_utils[phenopacket_name] = PhenopacketUtil(phenopacket_reader(phenopacket_path))
+        return self._phenopacket_utils[phenopacket_name]
+
+    def _get_truth_set_entities(self, entity_type: str, phenopacket_name: str) -> list[dict]:
+        """
+        Get the known entities of a type for a given phenopacket from the compiled truth set table.
+        Args:
+            entity_type (str): The entity type, either gene, variant or disease.
+            phenopacket_name (str): Name of the phenopacket.
+        Returns:
+            List[dict]: The truth set table rows for the entities.
+        """
+        if self._truth_set_entities is None:
+            self._truth_set_entities = {}
+            for row in self.truth_set_table.iter_rows(named=True):
+                self._truth_set_entities.setdefault((row["entity_type"], row["case_id"]), []).append(row)
+        self._get_phenopacket_path(phenopacket_name)
+        return self._truth_set_entities.get((entity_type, phenopacket_name), [])
 
     def _get_causative_genes(self, phenopacket_name: str) -> list[ProbandCausativeGene]:
         """
@@ -63,6 +193,11 @@ class PhenopacketTruthSet:
         Returns:
             List[ProbandCausativeGene]: List of ProbandCausativeGene.
         """
+        if self.truth_set_table is not None:
+            return [
+                ProbandCausativeGene(gene_symbol=row["gene_symbol"], gene_identifier=row["gene_identifier"])
+                for row in self._get_truth_set_entities("gene", phenopacket_name)
+            ]
         phenopacket_util = self._get_phenopacket_util(phenopacket_name)
         return phenopacket_util.diagnosed_genes()
 
@@ -74,6 +209,11 @@ class PhenopacketTruthSet:
         Returns:
             List[GenomicVariant]: List of GenomicVariant.
         """
+        if self.truth_set_table is not None:
+            return [
+                GenomicVariant(chrom=row["chrom"], pos=row["start"], ref=row["ref"], alt=row["alt"])
+                for row in self._get_truth_set_entities("variant", phenopacket_name)
+            ]
         phenopacket_util = self._get_phenopacket_util(phenopacket_name)
         return phenopacket_util.diagnosed_variants()
 
@@ -85,6 +225,11 @@ class PhenopacketTruthSet:
         Returns:
             List[ProbandDisease]: List of ProbandDisease
         """
+        if self.truth_set_table is not None:
+            return [
+                ProbandDisease(disease_name=row["disease_name"], disease_identifier=row["disease_identifier"])
+                for row in self._get_truth_set_entities("disease", phenopacket_name)
+            ]
         phenopacket_util = self._get_phenopacket_util(phenopacket_name)
         return phenopacket_util.diagnoses()
 
@@ -96,46 +241,54 @@ class PhenopacketTruthSet:
         Returns:
             pl.DataFrame: Classified ranked gene results.
         """
-        causative_genes = self._get_causative_genes(result_name)
-        gene_symbols = [causative_gene.gene_symbol for causative_gene in causative_genes]
-        gene_identifiers = [causative_gene.gene_identifier for causative_gene in causative_genes]
-        return pl.DataFrame(
-            {
-                "gene_symbol": [g for g in gene_symbols],
-                "gene_identifier": [g for g in gene_identifiers],
-            }
-        ).with_columns(
-            [
-                pl.lit(0).cast(pl.Float64).alias("score"),
-                pl.lit(0).cast(pl.Int64).alias("rank"),
-                pl.lit(True).alias("true_positive"),
-            ]
-        )
+        if ("gene", result_name) not in self._classified_results:
+            causative_genes = self._get_causative_genes(result_name)
+            gene_symbols = [causative_gene.gene_symbol for causative_gene in causative_genes]
+            gene_identifiers = [causative_gene.gene_identifier for causative_gene in causative_genes]
+            self._classified_results[("gene", result_name)] = pl.DataFrame(
+                {
+                    "gene_symbol": [g for g in gene_symbols],
+                    "gene_identifier": [g for g in gene_identifiers],
+                },
+                schema={"gene_symbol": pl.String, "gene_identifier": pl.String},
+            ).with_columns(
+                [
+                    pl.lit(0).cast(pl.Float64).alias("score"),
+                    pl.lit(0).cast(pl.Int64).alias("rank"),
+                    pl.lit(True).alias("true_positive"),
+                ]
+            )
+        return self._classified_results[("gene", result_name)]
 
     @staticmethod
-    def merge_gene_results(ranked_results: pl.DataFrame, output_file: Path) -> pl.DataFrame:
+    def merge_gene_results(ranked_results: pl.DataFrame, classified_results: pl.DataFrame) -> pl.DataFrame:
         """
         Merge ranked gene results with the classified genes.
         Args:
             ranked_results (pl.DataFrame): Ranked gene results.
-            output_file (Path): Path to the output file.
+            classified_results (pl.DataFrame): Classified genes for the phenopacket.
         Returns:
             pl.DataFrame: Merged ranked gene results.
         """
-        classified_results = pl.read_parquet(output_file)
+        case_keys = _case_keys(ranked_results)
         return (
             ranked_results.with_columns(
                 (
-                    (pl.col("gene_symbol").is_in(classified_results["gene_symbol"]) & (pl.col("gene_symbol") != ""))
-                    | (
-                        pl.col("gene_identifier").is_in(classified_results["gene_identifier"])
-                        & (pl.col("gene_identifier") != "")
+                    _is_known_entity(
+                        ranked_results,
+                        classified_results.filter(pl.col("gene_symbol") != ""),
+                        [*case_keys, "gene_symbol"],
+                    )
+                    | _is_known_entity(
+                        ranked_results,
+                        classified_results.filter(pl.col("gene_identifier") != ""),
+                        [*case_keys, "gene_identifier"],
                     )
                 ).alias("true_positive")
             )
             .with_columns(pl.col("rank").cast(pl.Int64))
             .select(classified_results.columns)
-            .vstack(classified_results.filter(~pl.col("gene_symbol").is_in(ranked_results["gene_symbol"])))
+            .vstack(_missing_entities(classified_results, ranked_results, [*case_keys, "gene_symbol"]))
         )
 
     def classified_variant(self, result_name: str) -> pl.DataFrame:
@@ -146,111 +299,249 @@ class PhenopacketTruthSet:
         Returns:
             pl.DataFrame: Classified ranked variant results.
         """
-        variants = self._get_causative_variants(result_name)
-        return pl.DataFrame(
-            {
-                "chrom": [v.chrom for v in variants],
-                "start": [v.pos for v in variants],
-                "end": [calculate_end_pos(v.pos, v.ref) for v in variants],
-                "ref": [v.ref for v in variants],
-                "alt": [v.alt for v in variants],
-            }
-        ).with_columns(
-            [
-                pl.concat_str(["chrom", "start", "ref", "alt"], separator="-").alias("variant_id"),
-                pl.lit(0.0).cast(pl.Float64).alias("score"),
-                pl.lit(0).cast(pl.Int64).alias("rank"),
-                pl.lit(True).alias("true_positive"),
-            ]
-        )
+        if ("variant", result_name) not in self._classified_results:
+            variants = self._get_causative_variants(result_name)
+            self._classified_results[("variant", result_name)] = pl.DataFrame(
+                {
+                    "chrom": [v.chrom for v in variants],
+                    "start": [v.pos for v in variants],
+                    "end": [calculate_end_pos(v.pos, v.ref) for v in variants],
+                    "ref": [v.ref for v in variants],
+                    "alt": [v.alt for v in variants],
+                },
+                schema={"chrom": pl.String, "start": pl.Int64, "end": pl.Int64, "ref": pl.String, "alt": pl.String},
+            ).with_columns(
+                [
+                    pl.concat_str(["chrom", "start", "ref", "alt"], separator="-").alias("variant_id"),
+                    pl.lit(0.0).cast(pl.Float64).alias("score"),
+                    pl.lit(0).cast(pl.Int64).alias("rank"),
+                    pl.lit(True).alias("true_positive"),
+                ]
+            )
+        return self._classified_results[("variant", result_name)]
 
     @staticmethod
-    def merge_variant_results(ranked_results: pl.DataFrame, output_file: Path) -> pl.DataFrame:
+    def merge_variant_results(ranked_results: pl.DataFrame, classified_results: pl.DataFrame) -> pl.DataFrame:
         """
         Merge ranked variant results with the classified variants.
+        Variants are matched on their hashed `variant_key`, so chromosome naming differences are ignored.
         Args:
             ranked_results (pl.DataFrame): Ranked variant results.
-            output_file (Path): Path to the output file.
+            classified_results (pl.DataFrame): Classified variants for the phenopacket.
         Returns:
             pl.DataFrame: Merged ranked variant results.
         """
-        classified_results = pl.read_parquet(output_file)
+        variant_keys = [*_case_keys(ranked_results), "variant_key"]
+        keyed_results = ranked_results.with_columns(variant_key())
+        keyed_classified_results = classified_results.with_columns(variant_key())
         return (
             ranked_results.with_columns(
-                [
-                    pl.struct(["chrom", "start", "end", "ref", "alt"])
-                    .is_in(classified_results.select(pl.struct(["chrom", "start", "end", "ref", "alt"])).to_series())
-                    .alias("true_positive")
-                ]
+                _is_known_entity(keyed_results, keyed_classified_results, variant_keys).alias("true_positive")
             )
             .with_columns(pl.col("rank").cast(pl.Int64))
             .select(classified_results.columns)
             .vstack(
-                classified_results.filter(
-                    ~pl.struct(["chrom", "start", "end", "ref", "alt"]).is_in(
-                        ranked_results.select(pl.struct(["chrom", "start", "end", "ref", "alt"])).to_series()
-                    )
+                _missing_entities(keyed_classified_results, keyed_results, variant_keys).select(
+                    classified_results.columns
                 )
             )
         )
 
-    def classified_disease(self, result_name: str, mondo_mapping_table: pl.DataFrame) -> pl.DataFrame:
+    def classified_disease(self, result_name: str, mondo_index: MondoIndex) -> pl.DataFrame:
         """
         Classify disease results for a given phenopacket.
         Args:
             result_name (str): Name of the result file.
-            mondo_mapping_table (pl.DataFrame): Mondo mapping table.
+            mondo_index (MondoIndex): Mondo mapping index.
         Returns:
             pl.DataFrame: Classified ranked disease results.
         """
-        diseases = self._get_causative_diseases(result_name)
-        disease_identifiers = list(set(disease.disease_identifier for disease in diseases))
-        return pl.DataFrame(
-            {
-                "disease_identifier": [d for d in disease_identifiers],
-            }
-        ).with_columns(
-            [
-                pl.lit(0).cast(pl.Float64).alias("score"),
-                pl.lit(0).cast(pl.Int64).alias("rank"),
-                pl.lit(True).alias("true_positive"),
-                pl.col("disease_identifier")
-                .map_elements(lambda x: map_disease_id(x, mondo_mapping_table), return_dtype=pl.Utf8)
-                .alias("mondo_identifier"),
-            ]
-        )
+        if ("disease", result_name) not in self._classified_results:
+            if self.truth_set_table is not None:
+                diseases = (
+                    pl.DataFrame(self._get_truth_set_entities("disease", result_name), schema=TRUTH_SET_SCHEMA)
+                    .select(["disease_identifier", "mondo_identifier"])
+                    .unique(subset="disease_identifier", maintain_order=True)
+                )
+            else:
+                disease_identifiers = list(
+                    set(disease.disease_identifier for disease in self._get_causative_diseases(result_name))
+                )
+                diseases = mondo_index.map_identifiers(
+                    pl.DataFrame({"disease_identifier": disease_identifiers}, schema={"disease_identifier": pl.String})
+                )
+            self._classified_results[("disease", result_name)] = diseases.with_columns(
+                [
+                    pl.lit(0).cast(pl.Float64).alias("score"),
+                    pl.lit(0).cast(pl.Int64).alias("rank"),
+                    pl.lit(True).alias("true_positive"),
+                ]
+            ).select(["disease_identifier", "score", "rank", "true_positive", "mondo_identifier"])
+        return self._classified_results[("disease", result_name)]
 
     @staticmethod
     def merge_disease_results(
         ranked_results: pl.DataFrame,
-        output_file: Path,
-        mondo_mapping_table: pl.DataFrame,
+        classified_results: pl.DataFrame,
+        mondo_index: MondoIndex,
     ) -> pl.DataFrame:
         """
         Merge ranked disease results with the classified diseases.
         Args:
             ranked_results (pl.DataFrame): Ranked disease results.
-            output_file (Path): Path to the output file.
-            mondo_mapping_table (pl.DataFrame): Mondo mapping table.
+            classified_results (pl.DataFrame): Classified diseases for the phenopacket.
+            mondo_index (MondoIndex): Mondo mapping index.
         Returns:
             pl.DataFrame: Merged ranked disease results.
         """
-        classified_results = pl.read_parquet(output_file)
-        ranked_results = ranked_results.with_columns(
-            [
-                pl.col("disease_identifier")
-                .map_elements(
-                    lambda x: map_disease_id(x, mondo_mapping_table),
-                    return_dtype=pl.String,
-                )
-                .alias("mondo_identifier")
-            ]
-        )
+        ranked_results = mondo_index.map_identifiers(ranked_results)
+        disease_keys = [*_case_keys(ranked_results), "mondo_identifier"]
         return (
             ranked_results.with_columns(
-                (pl.col("mondo_identifier").is_in(classified_results["mondo_identifier"])).alias("true_positive")
+                _is_known_entity(ranked_results, classified_results, disease_keys).alias("true_positive")
             )
             .with_columns(pl.col("rank").cast(pl.Int64))
             .select(classified_results.columns)
-            .vstack(classified_results.filter(~pl.col("mondo_identifier").is_in(ranked_results["mondo_identifier"])))
+            .vstack(_missing_entities(classified_results, ranked_results, disease_keys))
+        )
+
+
+_phenopacket_truth_sets: dict[Path, PhenopacketTruthSet] = {}
+
+
+def get_phenopacket_truth_set(phenopacket_dir: Path) -> PhenopacketTruthSet:
+    """
+    Get the process-wide truth set for a phenopacket directory.
+
+    Notes:
+        The truth set is shared by every result generated from the same corpus in this process,
+        so each phenopacket is parsed and classified once rather than once per result file.
+
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+    Returns:
+        PhenopacketTruthSet: The truth set for the phenopacket directory.
+    """
+    phenopacket_dir = Path(phenopacket_dir).resolve()
+    if phenopacket_dir not in _phenopacket_truth_sets:
+        _phenopacket_truth_sets[phenopacket_dir] = PhenopacketTruthSet(phenopacket_dir, load_truth_set(phenopacket_dir))
+    return _phenopacket_truth_sets[phenopacket_dir]
+
+
+def get_truth_set_path(phenopacket_dir: Path) -> Path:
+    """
+    Get the path of the compiled truth set table for a phenopacket directory.
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+    Returns:
+        Path: The path to the compiled truth set table, written alongside the phenopacket directory.
+    """
+    phenopacket_dir = Path(phenopacket_dir)
+    return phenopacket_dir.parent.joinpath(f"{phenopacket_dir.name}_truth_set.parquet")
+
+
+def fingerprint_phenopacket_corpus(phenopacket_dir: Path) -> str:
+    """
+    Compute a fingerprint of the names, sizes and modification times of all phenopackets in a directory.
+
+    Notes:
+        Only the file system metadata of the phenopackets is read, so checking whether a compiled
+        truth set table is up to date does not read every phenopacket.
+
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+    Returns:
+        str: The SHA-256 hex digest of the corpus file metadata.
+    """
+    corpus_fingerprint = hashlib.sha256()
+    for phenopacket_path in files_with_suffix(phenopacket_dir, ".json"):
+        phenopacket_stat = phenopacket_path.stat()
+        corpus_fingerprint.update(
+            f"{phenopacket_path.name}\t{phenopacket_stat.st_size}\t{phenopacket_stat.st_mtime_ns}\n".encode()
         )
+    return corpus_fingerprint.hexdigest()
+
+
+def compile_truth_set(phenopacket_dir: Path, output_file: Path | None = None) -> Path:
+    """
+    Compile the causative genes, variants and diseases of a phenopacket corpus into a columnar truth set table.
+
+    Notes:
+        The table is stamped with a fingerprint of the phenopacket files and is only used by post-processing
+        and benchmarking while the corpus remains unchanged. Disease identifiers are mapped to MONDO when
+        the table is compiled, and the stored MONDO IDs are used when classifying disease results.
+
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+        output_file (Path, optional): The path to write the truth set table to.
+            Defaults to the path alongside the phenopacket directory.
+    Returns:
+        Path: The path to the written truth set table.
+    """
+    output_file = output_file or get_truth_set_path(phenopacket_dir)
+    rows = []
+    for phenopacket_path in files_with_suffix(phenopacket_dir, ".json"):
+        phenopacket_util = PhenopacketUtil(phenopacket_reader(phenopacket_path))
+        case_id = phenopacket_path.stem
+        rows.extend(
+            {
+                "case_id": case_id,
+                "entity_type": "gene",
+                "gene_symbol": gene.gene_symbol,
+                "gene_identifier": gene.gene_identifier,
+            }
+            for gene in phenopacket_util.diagnosed_genes()
+        )
+        rows.extend(
+            {
+                "case_id": case_id,
+                "entity_type": "variant",
+                "chrom": variant.chrom,
+                "start": variant.pos,
+                "end": calculate_end_pos(variant.pos, variant.ref),
+                "ref": variant.ref,
+                "alt": variant.alt,
+            }
+            for variant in phenopacket_util.diagnosed_variants()
+        )
+        rows.extend(
+            {
+                "case_id": case_id,
+                "entity_type": "disease",
+                "disease_name": disease.disease_name,
+                "disease_identifier": disease.disease_identifier,
+            }
+            for disease in phenopacket_util.diagnoses()
+        )
+    truth_set = get_mondo_index().map_identifiers(pl.DataFrame(rows, schema=TRUTH_SET_SCHEMA))
+    truth_set = truth_set.with_columns(
+        pl.when(pl.col("entity_type") == "disease").then(pl.col("mondo_identifier")).alias("mondo_identifier")
+    ).select(TRUTH_SET_SCHEMA.names())
+    pq.write_table(
+        truth_set.to_arrow().replace_schema_metadata(
+            {CORPUS_FINGERPRINT_METADATA_KEY: fingerprint_phenopacket_corpus(phenopacket_dir).encode()}
+        ),
+        output_file,
+        compression="zstd",
+    )
+    logger.info(f"Compiled truth set for {truth_set['case_id'].n_unique()} phenopackets to {output_file}")
+    return output_file
+
+
+def load_truth_set(phenopacket_dir: Path) -> pl.DataFrame | None:
+    """
+    Load the compiled truth set table for a phenopacket directory, if present and up to date.
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+    Returns:
+        Optional[pl.DataFrame]: The memory-mapped truth set table, or None if it is missing or out of date.
+    """
+    truth_set_path = get_truth_set_path(phenopacket_dir)
+    if not truth_set_path.exists():
+        return None
+    metadata = pq.read_schema(truth_set_path).metadata or {}
+    if metadata.get(CORPUS_FINGERPRINT_METADATA_KEY, b"").decode() != fingerprint_phenopacket_corpus(phenopacket_dir):
+        logger.warning(f"Ignoring {truth_set_path} as the phenopackets in {phenopacket_dir} have changed.")
+        return None
+    logger.info(f"Loading compiled truth set from {truth_set_path}")
+    return pl.read_parquet(truth_set_path, memory_map=True)
@@ -1,20 +1,46 @@
-from collections.abc import Callable
+import os
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
 
 import polars as pl
+import pyarrow.parquet as pq
 
-from pheval.post_processing.mondo_mapping import parse_mondo_mapping_table
-from pheval.post_processing.phenopacket_truth_set import PhenopacketTruthSet
-from pheval.post_processing.validate_result_format import ResultSchema, validate_dataframe
+from pheval.post_processing.mondo_mapping import get_mondo_index
+from pheval.post_processing.phenopacket_truth_set import PhenopacketTruthSet, get_phenopacket_truth_set, variant_key
+from pheval.post_processing.validate_result_format import ResultSchema, ValidationMode, validate_dataframe
 from pheval.utils.file_utils import all_files
 from pheval.utils.logger import get_logger
 
 logger = get_logger()
 
-executed_results = set()
+_empty_result_locks = defaultdict(threading.Lock)
 
-mondo_mapping_table = parse_mondo_mapping_table()
+_empty_result_locks_guard = threading.Lock()
+
+_result_dataset_buffers = defaultdict(list)
+
+_result_dataset_lock = threading.Lock()
+
+_DATASET_PART_ROWS = 1_000_000
+
+DATASET_PART_PREFIX = "pheval-part-"
+
+TOP_K_METADATA_KEY = b"pheval_top_k"
+
+registered_results = set()
+
+_completed_results = set()
+
+_deferred_results = set()
+
+_deferred_results_lock = threading.Lock()
+
+_tracked_results = threading.local()
 
 
 class ResultType(Enum):
@@ -25,6 +51,22 @@ class ResultType(Enum):
     VARIANT = "variant"
 
 
+_RESULT_COLUMNS = {
+    ResultType.GENE: ["rank", "score", "gene_symbol", "gene_identifier", "true_positive"],
+    ResultType.VARIANT: ["rank", "score", "chrom", "start", "end", "ref", "alt", "variant_id", "true_positive"],
+    ResultType.DISEASE: ["rank", "score", "disease_identifier", "mondo_identifier", "true_positive"],
+}
+
+
+class OutputMode(Enum):
+    """Enumeration of the layouts PhEval results can be written in."""
+
+    PER_CASE = "per_case"
+    """One Parquet file per phenopacket, named `{phenopacket stem}-{result type}_result.parquet`."""
+    DATASET = "dataset"
+    """A few larger Parquet part files holding the results of many phenopackets, tagged with a `case_id` column."""
+
+
 class SortOrder(Enum):
     """Enumeration representing sorting orders."""
 
@@ -37,6 +79,13 @@ class SortOrder(Enum):
 def _rank_results(results: pl.DataFrame, sort_order: SortOrder) -> pl.DataFrame:
     """
     Rank results with the given sort order.
+    Results for several phenopackets tagged with a `case_id` column are ranked within each case.
+
+    Notes:
+        Tied scores all take the worst rank of the tie, and results without a score are sorted last.
+        When results are grouped by `grouping_id` or `mondo_identifier`, results sharing a score and group
+        count once towards the rank, and `min_rank` holds the dense rank of each score and group.
+
     Args:
         results (pl.DataFrame): The results to rank.
         sort_order (SortOrder): The sort order to use.
@@ -44,6 +93,7 @@ def _rank_results(results: pl.DataFrame, sort_order: SortOrder) -> pl.DataFrame:
         pl.DataFrame: The ranked results.
     """
     sort_descending = True if sort_order == SortOrder.DESCENDING else False
+    case_keys = ["case_id"] if "case_id" in results.columns else []
     group_by = []
     # group by either `grouping_id` or `mondo_identifier` column to implement ranking logic where equal ranks are not
     # penalised. `grouping_id` and `mondo_identifier` cannot be grouped together as ranking logic fails so
@@ -53,80 +103,330 @@ def _rank_results(results: pl.DataFrame, sort_order: SortOrder) -> pl.DataFrame:
         group_by.append("grouping_id")
     if "mondo_identifier" in results.columns:
         group_by.append("mondo_identifier")
-    if group_by:
-        results = (
-            results.sort("score", descending=sort_descending)
-            .with_columns(
-                pl.struct(["score"] + group_by)  # noqa
-                .rank(method="dense", descending=sort_descending)
-                .cast(pl.Int32)
-                .alias("min_rank")
-            )
-            .with_columns(pl.col("min_rank").max().over("score").alias("rank"))
-        )
+    results = results.sort("score", descending=sort_descending, nulls_last=True, maintain_order=True)
+    if not group_by:
+        rank = pl.col("score").rank(method="max", descending=sort_descending)
+        return results.with_columns((rank.over(case_keys) if case_keys else rank).alias("rank"))
+    min_rank = pl.struct(["score", *group_by]).rank(method="dense", descending=sort_descending)
+    if case_keys:
+        rank = pl.col("min_rank").max().over([*case_keys, "score"])
     else:
-        results = results.sort("score", descending=sort_descending).with_columns(
-            pl.col("score").rank(method="max", descending=sort_descending).alias("rank")
+        # results are sorted by score with null scores last, so the worst rank of a tie is the running maximum
+        # at the end of the tie, and null scores form a tie of their own
+        missing_score = pl.col("score").is_null()
+        rank = (
+            pl.when(missing_score)
+            .then(pl.col("min_rank").filter(missing_score).max())
+            .when(pl.col("score").ne_missing(pl.col("score").shift(-1)))
+            .then(pl.col("min_rank").cum_max())
+            .backward_fill()
         )
-    return results
+    return results.with_columns(
+        (min_rank.over(case_keys) if case_keys else min_rank).cast(pl.Int32).alias("min_rank")
+    ).with_columns(rank.alias("rank"))
+
+
+def _get_tmp_file(out_file: Path) -> Path:
+    """
+    Get a temporary file to write an output file to, unique to the current process and thread.
+    Args:
+        out_file (Path): Output file to write to.
+    Returns:
+        Path: The hidden temporary file next to the output file.
+    """
+    return out_file.with_name(f".{out_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
 
 
-def _write_results_file(out_file: Path, output_df: pl.DataFrame) -> None:
+def _write_results_file(out_file: Path, output_df: pl.DataFrame, metadata: dict[bytes, bytes] | None = None) -> None:
     """
     Write results to compressed Parquet output.
+
+    Notes:
+        The results are written to a temporary file which is then renamed,
+        so a result file is never observed partially written by another thread or process.
+
     Args:
         out_file (Path): Output file to write to.
         output_df (pl.DataFrame): Output dataframe.
+        metadata (Dict[bytes, bytes], optional): Key-value metadata to record in the Parquet schema.
+    """
+    tmp_file = _get_tmp_file(out_file)
+    try:
+        if metadata:
+            output_table = output_df.to_arrow()
+            pq.write_table(
+                output_table.replace_schema_metadata({**(output_table.schema.metadata or {}), **metadata}),
+                tmp_file,
+                compression="zstd",
+            )
+        else:
+            output_df.write_parquet(tmp_file, compression="zstd")
+        os.replace(tmp_file, out_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+
+def _sink_results_file(out_file: Path, output_lf: pl.LazyFrame) -> None:
+    """
+    Stream results to compressed Parquet output without collecting them in memory.
+
+    Notes:
+        As with `_write_results_file`, the results are written to a temporary file which is then renamed.
+
+    Args:
+        out_file (Path): Output file to write to.
+        output_lf (pl.LazyFrame): Output LazyFrame.
     """
-    output_df.write_parquet(out_file, compression="zstd")
+    tmp_file = _get_tmp_file(out_file)
+    try:
+        output_lf.sink_parquet(tmp_file, compression="zstd")
+        os.replace(tmp_file, out_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
 
 
-def _write_gene_result(ranked_results: pl.DataFrame, output_file: Path) -> None:
+def _write_gene_result(
+    ranked_results: pl.DataFrame, output_file: Path, metadata: dict[bytes, bytes] | None = None
+) -> None:
     """
     Write ranked PhEval gene results to a parquet file.
 
     Args:
         ranked_results ([PhEvalResult]): List of ranked PhEval gene results.
         output_file (Path): Path to the output file.
+        metadata (Dict[bytes, bytes], optional): Key-value metadata to record in the Parquet schema.
     """
-    gene_output = ranked_results.select(["rank", "score", "gene_symbol", "gene_identifier", "true_positive"])
-    _write_results_file(output_file, gene_output)
+    _write_results_file(output_file, ranked_results.select(_RESULT_COLUMNS[ResultType.GENE]), metadata)
 
 
-def _write_variant_result(ranked_results: pl.DataFrame, output_file: Path) -> None:
+def _write_variant_result(
+    ranked_results: pl.DataFrame, output_file: Path, metadata: dict[bytes, bytes] | None = None
+) -> None:
     """
     Write ranked PhEval variant results to a parquet file.
 
     Args:
         ranked_results ([PhEvalResult]): List of ranked PhEval variant results.
         output_file (Path): Path to the output file.
+        metadata (Dict[bytes, bytes], optional): Key-value metadata to record in the Parquet schema.
     """
-    variant_output = ranked_results.select(
-        [
-            "rank",
-            "score",
-            "chrom",
-            "start",
-            "end",
-            "ref",
-            "alt",
-            "variant_id",
-            "true_positive",
-        ]
-    )
-    _write_results_file(output_file, variant_output)
+    _write_results_file(output_file, ranked_results.select(_RESULT_COLUMNS[ResultType.VARIANT]), metadata)
 
 
-def _write_disease_result(ranked_results: pl.DataFrame, output_file: Path) -> None:
+def _write_disease_result(
+    ranked_results: pl.DataFrame, output_file: Path, metadata: dict[bytes, bytes] | None = None
+) -> None:
     """
     Write ranked PhEval disease results to a parquet file.
 
     Args:
         ranked_results ([PhEvalResult]): List of ranked PhEval disease results.
         output_file (Path): Path to the output file.
+        metadata (Dict[bytes, bytes], optional): Key-value metadata to record in the Parquet schema.
+    """
+    _write_results_file(output_file, ranked_results.select(_RESULT_COLUMNS[ResultType.DISEASE]), metadata)
+
+
+def _write_dataset_part(
+    classified_results: pl.DataFrame, output_dir: Path, metadata: dict[bytes, bytes] | None = None
+) -> None:
+    """
+    Write classified results for several phenopackets, tagged with a `case_id` column, to a new dataset part file.
+    Args:
+        classified_results (pl.DataFrame): Classified results for several phenopackets.
+        output_dir (Path): The PhEval result type output directory.
+        metadata (Dict[bytes, bytes], optional): Key-value metadata to record in the Parquet schema.
+    """
+    _write_results_file(
+        output_dir.joinpath(f"{DATASET_PART_PREFIX}{uuid.uuid4().hex}.parquet"),
+        classified_results.sort("case_id", maintain_order=True),
+        metadata,
+    )
+
+
+def _get_top_k_metadata(top_k: int | None) -> dict[bytes, bytes] | None:
+    """
+    Get the Parquet metadata recording the truncation depth of results.
+    Args:
+        top_k (int, optional): The truncation depth, or None if the results are not truncated.
+    Returns:
+        Dict[bytes, bytes], optional: The Parquet metadata, or None if the results are not truncated.
+    """
+    return None if top_k is None else {TOP_K_METADATA_KEY: str(top_k).encode()}
+
+
+def _validate_top_k(top_k: int) -> None:
+    """
+    Validate the depth to truncate results to.
+    Args:
+        top_k (int): The truncation depth.
+    Raises:
+        ValueError: If the truncation depth is not a positive integer.
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k should be a positive integer, got {top_k}.")
+
+
+def flush_result_datasets(output_dir: Path | None = None) -> None:
+    """
+    Write the buffered dataset results to part files.
+    Args:
+        output_dir (Path, optional): The PhEval result type output directory to flush. Defaults to all of them.
+    """
+    with _result_dataset_lock:
+        buffer_keys = [key for key in _result_dataset_buffers if output_dir is None or key[0] == output_dir]
+        for buffered_dir, top_k in buffer_keys:
+            buffered_results = _result_dataset_buffers.pop((buffered_dir, top_k))
+            if buffered_results:
+                _write_dataset_part(
+                    pl.concat(buffered_results, how="vertical"), buffered_dir, _get_top_k_metadata(top_k)
+                )
+
+
+def _write_results(
+    classified_results: pl.DataFrame,
+    output_dir: Path,
+    result_type: ResultType,
+    write_method: Callable,
+    output_mode: OutputMode,
+    top_k: int | None = None,
+) -> None:
+    """
+    Write classified results for one or more phenopackets, tagged with a `case_id` column, in the given layout.
+
+    Notes:
+        In dataset mode results are buffered in memory and written to a new part file
+        once enough rows are buffered, or when `flush_result_datasets` is called.
+
+    Args:
+        classified_results (pl.DataFrame): Classified results tagged with a `case_id` column.
+        output_dir (Path): The PhEval result type output directory.
+        result_type (ResultType): The result type.
+        write_method (Callable): The write method for the result type, used to write one file per phenopacket.
+        output_mode (OutputMode): The layout to write the results in.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+    """
+    if top_k is not None:
+        _validate_top_k(top_k)
+        classified_results = classified_results.filter((pl.col("rank") <= top_k) | pl.col("true_positive"))
+    if output_mode == OutputMode.PER_CASE:
+        for (case_id,), case_results in classified_results.partition_by(
+            "case_id", as_dict=True, maintain_order=True
+        ).items():
+            write_method(
+                case_results,
+                output_dir.joinpath(f"{case_id}-{result_type.value}_result.parquet"),
+                _get_top_k_metadata(top_k),
+            )
+        return
+    with _result_dataset_lock:
+        buffered_results = _result_dataset_buffers[(output_dir, top_k)]
+        buffered_results.append(classified_results.select(["case_id", *_RESULT_COLUMNS[result_type]]))
+        if sum(results.height for results in buffered_results) < _DATASET_PART_ROWS:
+            return
+        del _result_dataset_buffers[(output_dir, top_k)]
+    _write_dataset_part(pl.concat(buffered_results, how="vertical"), output_dir, _get_top_k_metadata(top_k))
+
+
+def scan_dataset_parts(dataset_parts: list[Path]) -> pl.LazyFrame:
+    """
+    Scan dataset part files, keeping the results of each phenopacket from the most recently written part only.
+
+    Notes:
+        Rerunning a tool in dataset mode writes new part files alongside those of earlier runs, so a phenopacket
+        can have results in several parts. Only the results in the part modified last are kept for each phenopacket.
+
+    Args:
+        dataset_parts (List[Path]): Paths to the dataset part files.
+    Returns:
+        pl.LazyFrame: The results, with the path of the part file they were read from in a `dataset_part` column.
+    """
+    dataset_parts = sorted(dataset_parts, key=lambda dataset_part: (dataset_part.stat().st_mtime_ns, dataset_part.name))
+    part_order = {str(dataset_part): order for order, dataset_part in enumerate(dataset_parts)}
+    part_index = pl.col("dataset_part").replace_strict(part_order, return_dtype=pl.Int64)
+    return pl.scan_parquet(dataset_parts, include_file_paths="dataset_part").filter(
+        part_index == part_index.max().over("case_id")
+    )
+
+
+def get_result_files(
+    results_dir: Path, result_type: ResultType, modified_since: int | None = None
+) -> dict[str, set[Path]]:
+    """
+    Get the result files of each phenopacket in a PhEval result type output directory, in either output layout.
+    Args:
+        results_dir (Path): The PhEval result type output directory.
+        result_type (ResultType): The result type.
+        modified_since (int, optional): Only include result files modified since this time, in nanoseconds
+            since the epoch. Defaults to including all result files.
+    Returns:
+        Dict[str, Set[Path]]: The result files of each phenopacket with a result, keyed by phenopacket stem.
+    """
+    if not results_dir.is_dir():
+        return {}
+    result_suffix = f"-{result_type.value}_result.parquet"
+    result_files, dataset_parts = defaultdict(set), []
+    for entry in os.scandir(results_dir):
+        if modified_since is not None and entry.stat().st_mtime_ns < modified_since:
+            continue
+        if entry.name.endswith(result_suffix):
+            result_files[entry.name.removesuffix(result_suffix)].add(Path(entry.path))
+        elif entry.name.startswith(DATASET_PART_PREFIX) and entry.name.endswith(".parquet"):
+            dataset_parts.append(Path(entry.path))
+    if dataset_parts:
+        for case_id, dataset_part in (
+            scan_dataset_parts(dataset_parts).select(["case_id", "dataset_part"]).unique().collect().iter_rows()
+        ):
+            result_files[case_id].add(Path(dataset_part))
+    return dict(result_files)
+
+
+def get_result_cases(results_dir: Path, result_type: ResultType) -> set[str]:
+    """
+    Get the phenopackets with a result in a PhEval result type output directory, in either output layout.
+    Args:
+        results_dir (Path): The PhEval result type output directory.
+        result_type (ResultType): The result type.
+    Returns:
+        Set[str]: The stems of the phenopackets with a result.
+    """
+    return set(get_result_files(results_dir, result_type))
+
+
+def _classified_cases(
+    classify_method: Callable,
+    case_ids: list[str],
+) -> pl.DataFrame:
+    """
+    Classify the known entities for several phenopackets, tagged with a `case_id` column.
+    Args:
+        classify_method (Callable): The classify method for the result type.
+        case_ids (List[str]): The phenopacket stems to classify.
+    Returns:
+        pl.DataFrame: The stacked classified known entities.
+    """
+    return pl.concat(
+        [
+            classify_method(case_id).with_columns(pl.lit(case_id, dtype=pl.String).alias("case_id"))
+            for case_id in case_ids
+        ],
+        how="vertical",
+    )
+
+
+def _validate_batch(results: pl.DataFrame) -> None:
     """
-    disease_output = ranked_results.select(["rank", "score", "disease_identifier", "mondo_identifier", "true_positive"])
-    _write_results_file(output_file, disease_output)
+    Validate that batched results are tagged with the phenopacket they belong to.
+    Args:
+        results (pl.DataFrame): The batched results.
+    Raises:
+        ValueError: If the `case_id` column is missing or contains null values.
+    """
+    if "case_id" not in results.columns:
+        raise ValueError("Missing required column for batched results: case_id")
+    if results["case_id"].null_count() > 0:
+        raise ValueError("'case_id' column should not contain null values.")
 
 
 def _get_result_type(result_type: ResultType, phenopacket_truth_set: PhenopacketTruthSet) -> tuple[Callable, Callable]:
@@ -145,12 +445,18 @@ def _get_result_type(result_type: ResultType, phenopacket_truth_set: Phenopacket
             return phenopacket_truth_set.classified_variant, _write_variant_result
         case ResultType.DISEASE:
             return (
-                lambda id_: phenopacket_truth_set.classified_disease(id_, mondo_mapping_table),
+                lambda id_: phenopacket_truth_set.classified_disease(id_, get_mondo_index()),
                 _write_disease_result,
             )
 
 
-def create_empty_pheval_result(phenopacket_dir: Path, output_dir: Path, result_type: ResultType) -> None:
+def create_empty_pheval_result(
+    phenopacket_dir: Path,
+    output_dir: Path,
+    result_type: ResultType,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    case_ids: set[str] | None = None,
+) -> None:
     """
     Create an empty PhEval result for a given result type (gene, variant, or disease).
 
@@ -159,25 +465,216 @@ def create_empty_pheval_result(phenopacket_dir: Path, output_dir: Path, result_t
         By explicitly creating an empty result, which will contain the known entity with a rank and score of 0,
         we can track and identify false negatives  during benchmarking,
         ensuring that missing predictions are accounted for in the evaluation.
+        Empty results are only written for phenopackets without an existing result in the output directory,
+        so repeated calls for the same corpus and output directory only write the results still missing.
+        Calls for the same corpus, output directory and result type are serialised across threads.
 
     Args:
         phenopacket_dir (Path): The directory containing the phenopackets.
         output_dir (Path): The output directory.
         result_type (ResultType): The result type.
+        output_mode (OutputMode): The layout to write the empty results in. Defaults to one file per phenopacket.
+        case_ids (Set[str], optional): The stems of the phenopackets to write empty results for,
+            e.g. the phenopackets of a shard. Defaults to all phenopackets in the directory.
 
     """
-    if result_type in executed_results:
-        return
-    logger.info(f"Writing classified results for {len(all_files(phenopacket_dir))} phenopackets to {output_dir}")
-    executed_results.add(result_type)
-    phenopacket_truth_set = PhenopacketTruthSet(phenopacket_dir)
-    classify_method, write_method = _get_result_type(result_type, phenopacket_truth_set)
-    for file in all_files(phenopacket_dir):
-        classified_results = classify_method(file.stem)
-        write_method(
-            classified_results,
-            output_dir.joinpath(f"{file.stem}-{result_type.value}_result.parquet"),
+    key = (phenopacket_dir.resolve(), output_dir.resolve(), result_type)
+    with _empty_result_locks_guard:
+        lock = _empty_result_locks[key]
+    with lock:
+        flush_result_datasets(output_dir)
+        existing_results = get_result_cases(output_dir, result_type)
+        missing_results = [
+            file.stem
+            for file in all_files(phenopacket_dir)
+            if file.stem not in existing_results and (case_ids is None or file.stem in case_ids)
+        ]
+        if not missing_results:
+            return
+        logger.info(
+            f"Writing classified results for {len(missing_results)} phenopackets without results to {output_dir}"
+        )
+        phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
+        classify_method, write_method = _get_result_type(result_type, phenopacket_truth_set)
+        _write_results(
+            _classified_cases(classify_method, missing_results), output_dir, result_type, write_method, output_mode
         )
+        flush_result_datasets(output_dir)
+
+
+def finalise_pheval_results(case_ids: set[str] | None = None) -> None:
+    """
+    Write empty PhEval results for every phenopacket the tool did not produce a result for.
+
+    Notes:
+        Every output directory written to by `generate_gene_result`, `generate_variant_result`
+        or `generate_disease_result` in this process is completed with empty results for the
+        remaining phenopackets of its corpus. This is needed when empty results were deferred with
+        `defer_empty_pheval_results` or results were written in dataset mode, and is called by `pheval run`
+        after the post-processing phase. Results buffered in dataset mode are written out first.
+
+    Args:
+        case_ids (Set[str], optional): The stems of the phenopackets to write empty results for,
+            e.g. the phenopackets of a shard. Defaults to all phenopackets in each corpus.
+    """
+    flush_result_datasets()
+    for phenopacket_dir, output_dir, result_type, output_mode in sorted(registered_results, key=str):
+        create_empty_pheval_result(phenopacket_dir, output_dir, result_type, output_mode, case_ids)
+    registered_results.clear()
+
+
+@contextmanager
+def defer_empty_pheval_results() -> Iterator[None]:
+    """
+    Defer writing empty PhEval results until `finalise_pheval_results` is called.
+
+    Notes:
+        By default, the first result written to an output directory completes it with empty results
+        for the remaining phenopackets of its corpus, which later results overwrite. Within this context
+        they are only written by `finalise_pheval_results`, so results can be generated concurrently
+        or in dataset mode without an empty result being written alongside or over a real one.
+        `pheval run` defers empty results for its run and post-processing phases.
+
+    Example:
+        >>> with defer_empty_pheval_results():
+        ...     for result_path in raw_results_dir.iterdir():
+        ...         generate_gene_result(...)
+        >>> finalise_pheval_results()
+    """
+    deferral = object()
+    with _deferred_results_lock:
+        _deferred_results.add(deferral)
+    try:
+        yield
+    finally:
+        with _deferred_results_lock:
+            _deferred_results.discard(deferral)
+
+
+def empty_pheval_results_deferred() -> bool:
+    """
+    Whether empty PhEval results are currently deferred, see `defer_empty_pheval_results`.
+    Returns:
+        bool: True within a `defer_empty_pheval_results` context.
+    """
+    with _deferred_results_lock:
+        return bool(_deferred_results)
+
+
+def _register_pheval_results(
+    phenopacket_dir: Path, output_dir: Path, result_type: ResultType, output_mode: OutputMode
+) -> None:
+    """
+    Register an output directory written to, to be completed with empty results.
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+        output_dir (Path): The PhEval result type output directory.
+        result_type (ResultType): The result type.
+        output_mode (OutputMode): The layout the results are written in.
+    """
+    result_output = (phenopacket_dir, output_dir, result_type, output_mode)
+    registered_results.add(result_output)
+    for tracked_results in getattr(_tracked_results, "stack", []):
+        tracked_results.add(result_output)
+
+
+@contextmanager
+def track_pheval_results() -> Iterator[set[tuple[Path, Path, ResultType, OutputMode]]]:
+    """
+    Record the output directories written to by the current thread.
+
+    Notes:
+        Each result output is recorded as a tuple of the phenopacket directory, the PhEval result type
+        output directory, the result type and the output mode, as expected by `register_pheval_results`
+        and `complete_pheval_results`.
+
+    Example:
+        >>> with track_pheval_results() as result_outputs:
+        ...     generate_gene_result(...)
+        >>> complete_pheval_results(result_outputs)
+
+    Returns:
+        ContextManager[Set[Tuple[Path, Path, ResultType, OutputMode]]]: The result outputs written to
+            within the context.
+    """
+    result_outputs = set()
+    if not hasattr(_tracked_results, "stack"):
+        _tracked_results.stack = []
+    _tracked_results.stack.append(result_outputs)
+    try:
+        yield result_outputs
+    finally:
+        _tracked_results.stack.remove(result_outputs)
+
+
+def register_pheval_results(result_outputs: Iterable[tuple[Path, Path, ResultType, OutputMode]]) -> None:
+    """
+    Register output directories written to by another process, to be completed by `finalise_pheval_results`.
+    Args:
+        result_outputs (Iterable[Tuple[Path, Path, ResultType, OutputMode]]): The result outputs,
+            as recorded by `track_pheval_results`.
+    """
+    for result_output in result_outputs:
+        _register_pheval_results(*result_output)
+
+
+def complete_pheval_results(result_outputs: Iterable[tuple[Path, Path, ResultType, OutputMode]]) -> None:
+    """
+    Complete the given output directories with empty results, unless empty results are deferred.
+
+    Notes:
+        This writes the empty results the result generation helpers write after the first result,
+        for results generated elsewhere with empty results deferred, e.g. in worker threads or processes.
+        Only the given output directories are completed.
+
+    Args:
+        result_outputs (Iterable[Tuple[Path, Path, ResultType, OutputMode]]): The result outputs,
+            as recorded by `track_pheval_results`.
+    """
+    for result_output in sorted(set(result_outputs), key=str):
+        _complete_pheval_results(*result_output)
+
+
+def reset_post_processing_state() -> None:
+    """
+    Reset the post-processing state of the process, e.g. between the runs of a long-lived worker.
+
+    Notes:
+        Results buffered in dataset mode are written out first. The output directories registered
+        for `finalise_pheval_results` and the record of the output directories already completed with
+        empty results are then cleared, so state from earlier runs neither accumulates nor stops later
+        runs from writing empty results. This should not be called while results are being generated.
+    """
+    flush_result_datasets()
+    registered_results.clear()
+    with _deferred_results_lock:
+        _completed_results.clear()
+    with _empty_result_locks_guard:
+        _empty_result_locks.clear()
+
+
+def _complete_pheval_results(
+    phenopacket_dir: Path, output_dir: Path, result_type: ResultType, output_mode: OutputMode
+) -> None:
+    """
+    Write empty PhEval results for the rest of the corpus the first time results are written to an output directory.
+
+    Notes:
+        Empty results are not written when they are deferred, or in dataset mode, where later results would be
+        appended alongside them rather than replacing them. `finalise_pheval_results` writes them in both cases.
+
+    Args:
+        phenopacket_dir (Path): The directory containing the phenopackets.
+        output_dir (Path): The PhEval result type output directory.
+        result_type (ResultType): The result type.
+        output_mode (OutputMode): The layout the results are written in.
+    """
+    key = (phenopacket_dir, output_dir, result_type, output_mode)
+    with _deferred_results_lock:
+        if _deferred_results or output_mode != OutputMode.PER_CASE or key in _completed_results:
+            return
+        _completed_results.add(key)
+    create_empty_pheval_result(phenopacket_dir, output_dir, result_type, output_mode)
 
 
 @validate_dataframe(ResultSchema.GENE_RESULT_SCHEMA)
@@ -187,21 +684,41 @@ def generate_gene_result(
     output_dir: Path,
     result_path: Path,
     phenopacket_dir: Path,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
 ) -> None:
     """
     Generate PhEval gene results to a compressed Parquet output.
     Args:
-        results (pl.DataFrame): The gene results.
+        results (pl.DataFrame): The gene results, or an Arrow table, record batch or C stream of them.
         sort_order (SortOrder): The sort order to use.
         output_dir (Path): Path to the output directory
         result_path (Path): Path to the tool-specific result file.
         phenopacket_dir (Path): Path to the Phenopacket directory
+        output_mode (OutputMode): The layout to write the results in. Defaults to one file per phenopacket.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
     """
-    output_file = output_dir.joinpath(f"pheval_gene_results/{result_path.stem}-gene_result.parquet")
-    create_empty_pheval_result(phenopacket_dir, output_dir.joinpath("pheval_gene_results"), ResultType.GENE)
+    gene_output_dir = output_dir.joinpath("pheval_gene_results")
+    _register_pheval_results(phenopacket_dir, gene_output_dir, ResultType.GENE, output_mode)
+    phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
     ranked_results = _rank_results(results, sort_order)
-    classified_results = PhenopacketTruthSet(phenopacket_dir).merge_gene_results(ranked_results, output_file)
-    _write_gene_result(classified_results, output_file)
+    classified_results = phenopacket_truth_set.merge_gene_results(
+        ranked_results, phenopacket_truth_set.classified_gene(result_path.stem)
+    )
+    _write_results(
+        classified_results.with_columns(pl.lit(result_path.stem, dtype=pl.String).alias("case_id")),
+        gene_output_dir,
+        ResultType.GENE,
+        _write_gene_result,
+        output_mode,
+        top_k,
+    )
+    _complete_pheval_results(phenopacket_dir, gene_output_dir, ResultType.GENE, output_mode)
 
 
 @validate_dataframe(ResultSchema.VARIANT_RESULT_SCHEMA)
@@ -211,27 +728,172 @@ def generate_variant_result(
     output_dir: Path,
     result_path: Path,
     phenopacket_dir: Path,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
 ) -> None:
     """
     Generate PhEval variant results to a compressed Parquet output.
     Args:
-        results (pl.DataFrame): The variant results.
+        results (pl.DataFrame): The variant results, or an Arrow table, record batch or C stream of them.
         sort_order (SortOrder): The sort order to use.
         output_dir (Path): Path to the output directory
         result_path (Path): Path to the tool-specific result file.
         phenopacket_dir (Path): Path to the Phenopacket directory
+        output_mode (OutputMode): The layout to write the results in. Defaults to one file per phenopacket.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
     """
-    output_file = output_dir.joinpath(f"pheval_variant_results/{result_path.stem}-variant_result.parquet")
-    create_empty_pheval_result(
-        phenopacket_dir,
-        output_dir.joinpath("pheval_variant_results"),
-        ResultType.VARIANT,
-    )
+    variant_output_dir = output_dir.joinpath("pheval_variant_results")
+    _register_pheval_results(phenopacket_dir, variant_output_dir, ResultType.VARIANT, output_mode)
+    phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
     ranked_results = _rank_results(results, sort_order).with_columns(
         pl.concat_str(["chrom", "start", "ref", "alt"], separator="-").alias("variant_id")
     )
-    classified_results = PhenopacketTruthSet(phenopacket_dir).merge_variant_results(ranked_results, output_file)
-    _write_variant_result(classified_results, output_file)
+    classified_results = phenopacket_truth_set.merge_variant_results(
+        ranked_results, phenopacket_truth_set.classified_variant(result_path.stem)
+    )
+    _write_results(
+        classified_results.with_columns(pl.lit(result_path.stem, dtype=pl.String).alias("case_id")),
+        variant_output_dir,
+        ResultType.VARIANT,
+        _write_variant_result,
+        output_mode,
+        top_k,
+    )
+    _complete_pheval_results(phenopacket_dir, variant_output_dir, ResultType.VARIANT, output_mode)
+
+
+def _scan_variant_results(results: pl.LazyFrame | Path) -> pl.LazyFrame:
+    """
+    Lazily scan variant results.
+    Args:
+        results (pl.LazyFrame | Path): The variant results, as a LazyFrame or the path to a Parquet or TSV file.
+    Returns:
+        pl.LazyFrame: The variant results.
+    """
+    if isinstance(results, pl.LazyFrame):
+        return results
+    if results.suffix == ".parquet":
+        return pl.scan_parquet(results)
+    return pl.scan_csv(results, separator="\t", schema_overrides=dict(ResultSchema.VARIANT_RESULT_SCHEMA.value))
+
+
+def _rank_scores(results: pl.LazyFrame, sort_order: SortOrder) -> pl.LazyFrame:
+    """
+    Rank the distinct scores of results, following the ranking logic of `_rank_results`.
+
+    Notes:
+        The rank of a score is the number of results scoring at least as well, or the number of distinct
+        groups scoring at least as well when results are grouped by `grouping_id`. Ranks are therefore
+        computed by aggregating the scores, without sorting the results themselves.
+        As in `_rank_results`, results without a score are not ranked, unless results are grouped,
+        in which case a missing score ranks below every score when sorting in descending order
+        and above every score when sorting in ascending order.
+
+    Args:
+        results (pl.LazyFrame): The results to rank.
+        sort_order (SortOrder): The sort order to use.
+    Returns:
+        pl.LazyFrame: The rank of each distinct score, including a null score if it is ranked.
+    """
+    sort_descending = sort_order == SortOrder.DESCENDING
+    if "grouping_id" in results.collect_schema().names():
+        results = results.select(["score", "grouping_id"]).unique()
+    else:
+        results = results.select("score").drop_nulls()
+    return (
+        results.group_by("score")
+        .agg(pl.len().alias("count"))
+        .sort("score", descending=sort_descending, nulls_last=sort_descending)
+        .select("score", pl.col("count").cum_sum().cast(pl.Int64).alias("rank"))
+    )
+
+
+def generate_variant_result_streaming(
+    results: pl.LazyFrame | Path,
+    sort_order: SortOrder,
+    output_dir: Path,
+    result_path: Path,
+    phenopacket_dir: Path,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
+) -> None:
+    """
+    Generate PhEval variant results to a compressed Parquet output without loading the results in memory.
+
+    Notes:
+        Intended for variant results too large to fit in memory, such as those from whole genome sequencing.
+        The results are scanned twice, once to rank the distinct scores and find the known variants, and once
+        to rank, classify and stream them to the output file. The score ranks and known variants are joined onto
+        the results as small lookup tables, so peak memory is bounded by the number of distinct scores rather than
+        the number of results. Results are written in the order they are scanned rather than by rank.
+        With `top_k`, only the retained results are collected in memory before being written.
+
+    Args:
+        results (pl.LazyFrame | Path): The variant results, as a LazyFrame or the path to a Parquet or TSV file.
+        sort_order (SortOrder): The sort order to use.
+        output_dir (Path): Path to the output directory
+        result_path (Path): Path to the tool-specific result file.
+        phenopacket_dir (Path): Path to the Phenopacket directory
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
+    """
+    if top_k is not None:
+        _validate_top_k(top_k)
+    variant_output_dir = output_dir.joinpath("pheval_variant_results")
+    _register_pheval_results(phenopacket_dir, variant_output_dir, ResultType.VARIANT, OutputMode.PER_CASE)
+    results = ResultSchema.VARIANT_RESULT_SCHEMA.validate_lazy(
+        _scan_variant_results(results), validation_mode
+    ).with_columns(variant_key())
+    classified_variants = (
+        get_phenopacket_truth_set(phenopacket_dir).classified_variant(result_path.stem).with_columns(variant_key())
+    )
+    known_variants = classified_variants.select(
+        pl.col("variant_key").unique(), pl.lit(True).alias("true_positive")
+    ).lazy()
+    queries = [
+        _rank_scores(results, sort_order),
+        results.join(known_variants, on="variant_key", how="semi").select("variant_key").unique(),
+    ]
+    if validation_mode != ValidationMode.SKIP and "grouping_id" in results.collect_schema().names():
+        queries.append(results.select(pl.col("grouping_id").null_count()))
+    score_ranks, found_variants, *grouping_id_nulls = pl.collect_all(queries)
+    if grouping_id_nulls and grouping_id_nulls[0].item() > 0:
+        raise ValueError("'grouping_id' column should not contain null values if provided.")
+    missing_score_rank = score_ranks.filter(pl.col("score").is_null())["rank"].max()
+    classified_results = pl.concat(
+        [
+            results.join(score_ranks.lazy(), on="score", how="left")
+            .join(known_variants, on="variant_key", how="left")
+            .with_columns(
+                pl.concat_str(["chrom", "start", "ref", "alt"], separator="-").alias("variant_id"),
+                pl.col("rank").fill_null(pl.lit(missing_score_rank, dtype=pl.Int64)),
+                pl.col("true_positive").fill_null(False),
+            )
+            .select(_RESULT_COLUMNS[ResultType.VARIANT]),
+            classified_variants.join(found_variants, on="variant_key", how="anti")
+            .select(_RESULT_COLUMNS[ResultType.VARIANT])
+            .lazy(),
+        ],
+        how="vertical",
+    )
+    output_file = variant_output_dir.joinpath(f"{result_path.stem}-{ResultType.VARIANT.value}_result.parquet")
+    if top_k is None:
+        _sink_results_file(output_file, classified_results)
+    else:
+        _write_variant_result(
+            classified_results.filter((pl.col("rank") <= top_k) | pl.col("true_positive")).collect(),
+            output_file,
+            _get_top_k_metadata(top_k),
+        )
+    _complete_pheval_results(phenopacket_dir, variant_output_dir, ResultType.VARIANT, OutputMode.PER_CASE)
 
 
 @validate_dataframe(ResultSchema.DISEASE_RESULT_SCHEMA)
@@ -241,25 +903,164 @@ def generate_disease_result(
     output_dir: Path,
     result_path: Path,
     phenopacket_dir: Path,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
 ) -> None:
     """
     Generate PhEval disease results to a compressed Parquet output.
     Args:
-        results (pl.DataFrame): The disease results.
+        results (pl.DataFrame): The disease results, or an Arrow table, record batch or C stream of them.
         sort_order (SortOrder): The sort order to use.
         output_dir (Path): Path to the output directory
         result_path (Path): Path to the tool-specific result file.
         phenopacket_dir (Path): Path to the Phenopacket directory
+        output_mode (OutputMode): The layout to write the results in. Defaults to one file per phenopacket.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
     """
-    output_file = output_dir.joinpath(f"pheval_disease_results/{result_path.stem}-disease_result.parquet")
-    create_empty_pheval_result(
-        phenopacket_dir,
-        output_dir.joinpath("pheval_disease_results"),
+    disease_output_dir = output_dir.joinpath("pheval_disease_results")
+    _register_pheval_results(phenopacket_dir, disease_output_dir, ResultType.DISEASE, output_mode)
+    phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
+    ranked_results = _rank_results(results, sort_order)
+    mondo_index = get_mondo_index()
+    classified_results = phenopacket_truth_set.merge_disease_results(
+        ranked_results, phenopacket_truth_set.classified_disease(result_path.stem, mondo_index), mondo_index
+    )
+
+    _write_results(
+        classified_results.with_columns(pl.lit(result_path.stem, dtype=pl.String).alias("case_id")),
+        disease_output_dir,
         ResultType.DISEASE,
+        _write_disease_result,
+        output_mode,
+        top_k,
     )
+    _complete_pheval_results(phenopacket_dir, disease_output_dir, ResultType.DISEASE, output_mode)
+
+
+@validate_dataframe(ResultSchema.GENE_RESULT_SCHEMA)
+def generate_gene_results_batch(
+    results: pl.DataFrame,
+    sort_order: SortOrder,
+    output_dir: Path,
+    phenopacket_dir: Path,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
+) -> None:
+    """
+    Generate PhEval gene results for many phenopackets in one pass to compressed Parquet outputs.
+    Args:
+        results (pl.DataFrame): The gene results for all phenopackets, or an Arrow table, record batch or C stream
+            of them, tagged with a `case_id` column containing the phenopacket stem.
+        sort_order (SortOrder): The sort order to use.
+        output_dir (Path): Path to the output directory
+        phenopacket_dir (Path): Path to the Phenopacket directory
+        output_mode (OutputMode): The layout to write the results in. Defaults to one file per phenopacket.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
+    """
+    _validate_batch(results)
+    if results.is_empty():
+        return
+    gene_output_dir = output_dir.joinpath("pheval_gene_results")
+    _register_pheval_results(phenopacket_dir, gene_output_dir, ResultType.GENE, output_mode)
+    phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
     ranked_results = _rank_results(results, sort_order)
-    classified_results = PhenopacketTruthSet(phenopacket_dir).merge_disease_results(
-        ranked_results, output_file, mondo_mapping_table
+    classify_method, write_method = _get_result_type(ResultType.GENE, phenopacket_truth_set)
+    classified_results = phenopacket_truth_set.merge_gene_results(
+        ranked_results, _classified_cases(classify_method, ranked_results["case_id"].unique().to_list())
+    )
+    _write_results(classified_results, gene_output_dir, ResultType.GENE, write_method, output_mode, top_k)
+    _complete_pheval_results(phenopacket_dir, gene_output_dir, ResultType.GENE, output_mode)
+
+
+@validate_dataframe(ResultSchema.VARIANT_RESULT_SCHEMA)
+def generate_variant_results_batch(
+    results: pl.DataFrame,
+    sort_order: SortOrder,
+    output_dir: Path,
+    phenopacket_dir: Path,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
+) -> None:
+    """
+    Generate PhEval variant results for many phenopackets in one pass to compressed Parquet outputs.
+    Args:
+        results (pl.DataFrame): The variant results for all phenopackets, or an Arrow table, record batch or C stream
+            of them, tagged with a `case_id` column containing the phenopacket stem.
+        sort_order (SortOrder): The sort order to use.
+        output_dir (Path): Path to the output directory
+        phenopacket_dir (Path): Path to the Phenopacket directory
+        output_mode (OutputMode): The layout to write the results in. Defaults to one file per phenopacket.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
+    """
+    _validate_batch(results)
+    if results.is_empty():
+        return
+    variant_output_dir = output_dir.joinpath("pheval_variant_results")
+    _register_pheval_results(phenopacket_dir, variant_output_dir, ResultType.VARIANT, output_mode)
+    phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
+    ranked_results = _rank_results(results, sort_order).with_columns(
+        pl.concat_str(["chrom", "start", "ref", "alt"], separator="-").alias("variant_id")
+    )
+    classify_method, write_method = _get_result_type(ResultType.VARIANT, phenopacket_truth_set)
+    classified_results = phenopacket_truth_set.merge_variant_results(
+        ranked_results, _classified_cases(classify_method, ranked_results["case_id"].unique().to_list())
     )
+    _write_results(classified_results, variant_output_dir, ResultType.VARIANT, write_method, output_mode, top_k)
+    _complete_pheval_results(phenopacket_dir, variant_output_dir, ResultType.VARIANT, output_mode)
+
 
-    _write_disease_result(classified_results, output_file)
+@validate_dataframe(ResultSchema.DISEASE_RESULT_SCHEMA)
+def generate_disease_results_batch(
+    results: pl.DataFrame,
+    sort_order: SortOrder,
+    output_dir: Path,
+    phenopacket_dir: Path,
+    output_mode: OutputMode = OutputMode.PER_CASE,
+    top_k: int | None = None,
+    *,
+    validation_mode: ValidationMode = ValidationMode.STRICT,
+) -> None:
+    """
+    Generate PhEval disease results for many phenopackets in one pass to compressed Parquet outputs.
+    Args:
+        results (pl.DataFrame): The disease results for all phenopackets, or an Arrow table, record batch or C stream
+            of them, tagged with a `case_id` column containing the phenopacket stem.
+        sort_order (SortOrder): The sort order to use.
+        output_dir (Path): Path to the output directory
+        phenopacket_dir (Path): Path to the Phenopacket directory
+        output_mode (OutputMode): The layout to write the results in. Defaults to one file per phenopacket.
+        top_k (int, optional): Keep only results ranked within the top K and the true positives.
+            The truncation depth is recorded in the Parquet metadata. Defaults to keeping all results.
+        validation_mode (ValidationMode): How to validate the results against the result schema.
+            Defaults to failing on any column with an unexpected data type.
+    """
+    _validate_batch(results)
+    if results.is_empty():
+        return
+    disease_output_dir = output_dir.joinpath("pheval_disease_results")
+    _register_pheval_results(phenopacket_dir, disease_output_dir, ResultType.DISEASE, output_mode)
+    phenopacket_truth_set = get_phenopacket_truth_set(phenopacket_dir)
+    ranked_results = _rank_results(results, sort_order)
+    classify_method, write_method = _get_result_type(ResultType.DISEASE, phenopacket_truth_set)
+    classified_results = phenopacket_truth_set.merge_disease_results(
+        ranked_results,
+        _classified_cases(classify_method, ranked_results["case_id"].unique().to_list()),
+        get_mondo_index(),
+    )
+    _write_results(classified_results, disease_output_dir, ResultType.DISEASE, write_method, output_mode, top_k)
+    _complete_pheval_results(phenopacket_dir, disease_output_dir, ResultType.DISEASE, output_mode)
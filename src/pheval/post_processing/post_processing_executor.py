@@ -0,0 +1,144 @@
+import math
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from tqdm import tqdm
+
+from pheval.post_processing.phenopacket_truth_set import get_phenopacket_truth_set
+from pheval.post_processing.post_processing import (
+    complete_pheval_results,
+    defer_empty_pheval_results,
+    flush_result_datasets,
+    register_pheval_results,
+    reset_post_processing_state,
+    track_pheval_results,
+)
+from pheval.utils.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class PostProcessingError:
+    """
+    An error raised while post-processing a raw result file.
+
+    Args:
+        result_path (Path): Path to the tool-specific result file.
+        error (str): Description of the error.
+    """
+
+    result_path: Path
+    error: str
+
+
+def _initialise_worker(phenopacket_dir: Path) -> None:
+    """
+    Load the truth set for the corpus once per worker process.
+    Args:
+        phenopacket_dir (Path): Path to the Phenopacket directory.
+    """
+    get_phenopacket_truth_set(phenopacket_dir)
+
+
+def _post_process_result_files(
+    post_process_result: Callable[[Path], None], result_paths: list[Path]
+) -> tuple[set, list[PostProcessingError]]:
+    """
+    Post-process a chunk of raw result files in a worker process.
+    Args:
+        post_process_result (Callable[[Path], None]): Callable generating the PhEval results for a raw result file.
+        result_paths (List[Path]): Paths to the tool-specific result files.
+    Returns:
+        Tuple[set, List[PostProcessingError]]: The result outputs written to by the chunk, see
+            `track_pheval_results`, and the errors raised. Empty results are left to the parent process.
+    """
+    errors = []
+    with defer_empty_pheval_results(), track_pheval_results() as result_outputs:
+        for result_path in result_paths:
+            try:
+                post_process_result(result_path)
+            except Exception as e:
+                errors.append(PostProcessingError(result_path=result_path, error=f"{type(e).__name__}: {e}"))
+    reset_post_processing_state()
+    return result_outputs, errors
+
+
+def post_process_result_files(
+    result_files: list[Path],
+    post_process_result: Callable[[Path], None],
+    phenopacket_dir: Path,
+    num_workers: int | None = None,
+) -> list[PostProcessingError]:
+    """
+    Post-process raw result files in parallel across a pool of worker processes.
+
+    Notes:
+        `post_process_result` is called once per raw result file and is expected to read it and call
+        `generate_gene_result`, `generate_variant_result` or `generate_disease_result`.
+        It must be picklable, e.g. a module-level function or a `functools.partial` of one.
+        Errors for individual result files are logged and returned rather than aborting the run.
+        Result files are distributed to the workers in chunks, and results buffered in dataset
+        output mode are written out at the end of each chunk. Empty results for the phenopackets
+        without a result are written once all workers have finished, unless they are deferred.
+
+    Args:
+        result_files (List[Path]): Paths to the tool-specific result files.
+        post_process_result (Callable[[Path], None]): Callable generating the PhEval results for a raw result file.
+        phenopacket_dir (Path): Path to the Phenopacket directory.
+        num_workers (int, optional): Number of worker processes. Defaults to the number of CPUs,
+            a value of 1 post-processes the result files serially in the current process.
+    Returns:
+        List[PostProcessingError]: The errors raised for result files that failed to post-process.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    logger.info(f"Post-processing {len(result_files)} result files with {num_workers} workers.")
+    errors = []
+    if num_workers == 1:
+        _initialise_worker(phenopacket_dir)
+        for result_path in tqdm(result_files, desc="Post-processing results"):
+            try:
+                post_process_result(result_path)
+            except Exception as e:
+                errors.append(PostProcessingError(result_path=result_path, error=f"{type(e).__name__}: {e}"))
+        flush_result_datasets()
+    else:
+        chunk_size = max(1, math.ceil(len(result_files) / (num_workers * 4)))
+        written_results = set()
+        with (
+            ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialise_worker,
+                initargs=(phenopacket_dir,),
+            ) as executor,
+            tqdm(total=len(result_files), desc="Post-processing results") as progress,
+        ):
+            futures = {
+                executor.submit(_post_process_result_files, post_process_result, chunk): chunk
+                for chunk in (result_files[i : i + chunk_size] for i in range(0, len(result_files), chunk_size))
+            }
+            for future in as_completed(futures):
+                try:
+                    result_outputs, chunk_errors = future.result()
+                except Exception as e:
+                    result_outputs, chunk_errors = (
+                        set(),
+                        [
+                            PostProcessingError(result_path=result_path, error=f"{type(e).__name__}: {e}")
+                            for result_path in futures[future]
+                        ],
+                    )
+                register_pheval_results(result_outputs)
+                written_results.update(result_outputs)
+                errors.extend(chunk_errors)
+                progress.update(len(futures[future]))
+        complete_pheval_results(written_results)
+    for error in errors:
+        logger.error(f"Failed to post-process {error.result_path}: {error.error}")
+    logger.info(f"Post-processed {len(result_files) - len(errors)} of {len(result_files)} result files.")
+    return errors
@@ -1,8 +1,49 @@
 from collections.abc import Callable
+from dataclasses import dataclass, field
 from enum import Enum
 from functools import wraps
+from typing import Any
 
 import polars as pl
+import pyarrow as pa
+
+from pheval.utils.logger import get_logger
+
+logger = get_logger()
+
+_SAFE_CASTS = {
+    pl.Float64: (pl.Float32, pl.Int8, pl.Int16, pl.Int32, pl.UInt8, pl.UInt16, pl.UInt32),
+    pl.Int64: (pl.Int8, pl.Int16, pl.Int32, pl.UInt8, pl.UInt16, pl.UInt32),
+    pl.String: (pl.Categorical, pl.Enum),
+}
+
+
+class ValidationMode(Enum):
+    """
+    Enum for the ways results can be validated against their schema.
+    Attributes:
+        STRICT (str): Fail on any column with an unexpected data type.
+        COERCE (str): Cast columns that can be safely widened to the expected data type, fail on any other mismatch.
+        SKIP (str): Trust the results and skip validation.
+    """
+
+    STRICT = "strict"
+    COERCE = "coerce"
+    SKIP = "skip"
+
+
+@dataclass
+class ValidationReport:
+    """
+    Summary of validating results against their schema.
+    Args:
+        num_rows (int): Number of rows validated.
+        cast_columns (Dict[str, Tuple[pl.DataType, pl.DataType]]): The columns cast to the expected data type,
+            mapped to their original and expected data types.
+    """
+
+    num_rows: int
+    cast_columns: dict[str, tuple[pl.DataType, pl.DataType]] = field(default_factory=dict)
 
 
 class ResultSchema(Enum):
@@ -67,10 +108,125 @@ class ResultSchema(Enum):
 
         return True
 
+    def _get_casts(self, schema: pl.Schema, allow_casts: bool) -> dict[str, tuple[pl.DataType, pl.DataType]]:
+        """
+        Compare a schema with the expected schema, collecting the columns to cast to the expected data type.
+        Args:
+            schema (pl.Schema): The schema to compare.
+            allow_casts (bool): Whether columns that can be safely widened to the expected data type are allowed.
+        Raises:
+            ValueError: If a required column is missing.
+            TypeError: If a column has an incorrect data type that cannot be cast.
+        Returns:
+            Dict[str, Tuple[pl.DataType, pl.DataType]]: The columns to cast, mapped to their original
+                and expected data types.
+        """
+        casts = {}
+        for col_name, expected_type in self.value.items():
+            actual_type = schema.get(col_name)
+            if actual_type is None:
+                if col_name == "grouping_id":
+                    continue
+                raise ValueError(f"Missing required column: {col_name}")
+            if actual_type == expected_type:
+                continue
+            if not allow_casts or not isinstance(actual_type, _SAFE_CASTS.get(expected_type.base_type(), ())):
+                raise TypeError(f"Column '{col_name}' has type {actual_type}, expected {expected_type}")
+            casts[col_name] = (actual_type, expected_type)
+        return casts
+
+    def coerce(self, results: pl.DataFrame) -> tuple[pl.DataFrame, ValidationReport]:
+        """
+        Validate a DataFrame, casting columns that can be safely widened to the expected data type.
+
+        Notes:
+            Integers and Float32 are widened to Float64, narrower integers to Int64 and categoricals to strings.
+            All casts are applied in a single projection, columns already matching the schema are not copied.
+
+        Args:
+            results (pl.DataFrame): The DataFrame to validate.
+        Raises:
+            ValueError: If a required column is missing or the grouping_id column contains a null value.
+            TypeError: If a column has an incorrect data type that cannot be safely widened.
+        Returns:
+            Tuple[pl.DataFrame, ValidationReport]: The validated DataFrame and a report of the columns cast.
+        """
+        report = ValidationReport(num_rows=results.height, cast_columns=self._get_casts(results.schema, True))
+        if report.cast_columns:
+            results = results.with_columns(
+                pl.col(col_name).cast(expected_type) for col_name, (_, expected_type) in report.cast_columns.items()
+            )
+        self.validate(results)
+        return results, report
+
+    def validate_lazy(
+        self, results: pl.LazyFrame, validation_mode: ValidationMode = ValidationMode.STRICT
+    ) -> pl.LazyFrame:
+        """
+        Validate the schema of a LazyFrame without collecting it.
+
+        Notes:
+            Only the schema is compared, null values in the grouping_id column are not checked.
+
+        Args:
+            results (pl.LazyFrame): The LazyFrame to validate.
+            validation_mode (ValidationMode): How to validate the results. Defaults to strict validation.
+        Raises:
+            ValueError: If a required column is missing.
+            TypeError: If a column has an incorrect data type, or one that cannot be safely widened when coercing.
+        Returns:
+            pl.LazyFrame: The LazyFrame, with columns cast to the expected data type when coercing.
+        """
+        if validation_mode == ValidationMode.SKIP:
+            return results
+        casts = self._get_casts(results.collect_schema(), validation_mode == ValidationMode.COERCE)
+        return results.with_columns(
+            pl.col(col_name).cast(expected_type) for col_name, (_, expected_type) in casts.items()
+        )
+
+
+def to_results_dataframe(results: Any, schema: ResultSchema) -> pl.DataFrame:
+    """
+    Convert results to a Polars DataFrame without copying columns whose types already match the schema.
+
+    Notes:
+        Accepts a Polars DataFrame, a PyArrow Table or RecordBatch, or any object implementing the
+        Arrow C stream interface (`__arrow_c_stream__`), e.g. a PyArrow RecordBatchReader or a DuckDB relation.
+        Dictionary-encoded string columns are decoded to strings where the schema expects a string.
+
+    Args:
+        results (Any): The results to convert.
+        schema (ResultSchema): The expected schema from the `ResultSchema` enum.
+    Raises:
+        TypeError: If the results are not a DataFrame or an Arrow compatible object.
+    Returns:
+        pl.DataFrame: The results as a Polars DataFrame.
+    """
+    if isinstance(results, pl.DataFrame):
+        return results
+    if isinstance(results, pa.Table | pa.RecordBatch):
+        results = pl.from_arrow(results, rechunk=False)
+    elif hasattr(results, "__arrow_c_stream__"):
+        results = pl.DataFrame(results)
+    else:
+        raise TypeError(
+            f"Results should be a Polars DataFrame or an Arrow compatible object, got {type(results).__name__}."
+        )
+    return results.with_columns(
+        pl.col(col_name).cast(pl.String)
+        for col_name, expected_type in schema.value.items()
+        if expected_type == pl.String
+        and col_name in results.schema
+        and isinstance(results.schema[col_name], pl.Categorical | pl.Enum)
+    )
+
 
 def validate_dataframe(schema: ResultSchema) -> Callable:
     """
     Decorator to validate DataFrame input based on a ResultSchema.
+    Arrow compatible inputs are converted to a Polars DataFrame before validation.
+    The validation mode is read from the `validation_mode` keyword argument of the wrapped function,
+    defaulting to `ValidationMode.STRICT`.
     Args:
         schema (ResultSchema): The expected schema from the `ResultSchema` enum.
     Returns:
@@ -79,8 +235,15 @@ def validate_dataframe(schema: ResultSchema) -> Callable:
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
-        def wrapper(results: pl.DataFrame, *args, **kwargs):
-            schema.validate(results)
+        def wrapper(results: Any, *args, **kwargs):
+            results = to_results_dataframe(results, schema)
+            validation_mode = kwargs.get("validation_mode", ValidationMode.STRICT)
+            if validation_mode == ValidationMode.STRICT:
+                schema.validate(results)
+            elif validation_mode == ValidationMode.COERCE:
+                results, report = schema.coerce(results)
+                if report.cast_columns:
+                    logger.debug(f"Cast columns of {report.num_rows} results: {report.cast_columns}")
             return func(results, *args, **kwargs)
 
         return wrapper
@@ -5,6 +5,28 @@ from typing import Any
 from serde import serde
 
 
+@serde
+@dataclass
+class PhaseTiming:
+    """Class for defining the time and resources used by a phase of a run.
+    Args:
+        phase (str): Name of the phase (prepare, run or post_process)
+        wall_time (float): Wall clock time in seconds
+        cpu_time (Optional[float]): User and system CPU time in seconds, including child processes
+        peak_rss (Optional[int]): Peak resident set size in bytes of the process or its largest child process,
+                                  up to the end of the phase
+        read_bytes (Optional[int]): Bytes read from disk, including child processes
+        write_bytes (Optional[int]): Bytes written to disk, including child processes
+    """
+
+    phase: str
+    wall_time: float
+    cpu_time: float | None = None
+    peak_rss: int | None = None
+    read_bytes: int | None = None
+    write_bytes: int | None = None
+
+
 @serde
 @dataclass
 class BasicOutputRunMetaData:
@@ -19,6 +41,7 @@ class BasicOutputRunMetaData:
         hgnc_download_date (Optional[str]): ISO timestamp for HGNC file
         tool_specific_configuration_options (Any): Special field that can be overwritten by tool implementations to
                                                    contain any extra tool specific configurations used in the run
+        phase_timings (Optional[List[PhaseTiming]]): Time and resources used by each phase of the run
     """
 
     tool: str
@@ -29,3 +52,4 @@ class BasicOutputRunMetaData:
     mondo_download_date: str
     hgnc_download_date: str
     tool_specific_configuration_options: Any = None
+    phase_timings: list[PhaseTiming] | None = None
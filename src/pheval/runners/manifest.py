@@ -0,0 +1,126 @@
+"""Run Manifest Module"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from pathlib import Path
+
+from pheval.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class CaseStatus(Enum):
+    """Enumeration of the statuses of a phenopacket in a run."""
+
+    COMPLETE = "complete"
+    """PhEval results were written for every analysis of the run."""
+    FAILED = "failed"
+    """The tool did not produce PhEval results for every analysis of the run."""
+
+
+@dataclass
+class CaseRecord:
+    """
+    Record of a phenopacket in a run manifest.
+
+    Args:
+        case_id (str): The phenopacket stem.
+        status (CaseStatus): The status of the phenopacket.
+        input_hash (str): Hash of the inputs the phenopacket was run with.
+        output_files (List[str]): The raw and PhEval result files written for the phenopacket,
+            relative to the run output directory.
+    """
+
+    case_id: str
+    status: CaseStatus
+    input_hash: str
+    output_files: list[str] = field(default_factory=list)
+
+
+def hash_case_inputs(phenopacket_path: Path, run_inputs: bytes) -> str:
+    """
+    Hash the inputs a phenopacket is run with.
+    Args:
+        phenopacket_path (Path): Path to the phenopacket.
+        run_inputs (bytes): The inputs shared by every phenopacket of the run, e.g. the tool configuration.
+    Returns:
+        str: The SHA-256 hex digest of the inputs.
+    """
+    input_hash = hashlib.sha256(run_inputs)
+    input_hash.update(phenopacket_path.read_bytes())
+    return input_hash.hexdigest()
+
+
+class RunManifest:
+    """
+    Per-phenopacket manifest of a run, stored as JSON Lines in the run output directory.
+
+    Notes:
+        Records are only ever appended, and the last record of a phenopacket wins, so a run interrupted
+        while the manifest is updated loses at most the record being written.
+    """
+
+    def __init__(self, manifest_path: Path):
+        """
+        Initialise the RunManifest class, reading any existing records.
+        Args:
+            manifest_path (Path): Path to the manifest file.
+        """
+        self.manifest_path = manifest_path
+        self.records = self._read_records()
+
+    def _read_records(self) -> dict[str, CaseRecord]:
+        """
+        Read the records from the manifest file.
+        Returns:
+            Dict[str, CaseRecord]: The latest record of each phenopacket.
+        """
+        records = {}
+        if not self.manifest_path.is_file():
+            return records
+        with open(self.manifest_path) as manifest_file:
+            for line in manifest_file:
+                try:
+                    record = json.loads(line)
+                    records[record["case_id"]] = CaseRecord(
+                        case_id=record["case_id"],
+                        status=CaseStatus(record["status"]),
+                        input_hash=record["input_hash"],
+                        output_files=record["output_files"],
+                    )
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    logger.warning(f"Skipping malformed record in {self.manifest_path}: {line.strip()}")
+        return records
+
+    def is_complete(self, case_id: str, input_hash: str) -> bool:
+        """
+        Check whether a phenopacket was run to completion with the same inputs and its outputs are still present.
+        Args:
+            case_id (str): The phenopacket stem.
+            input_hash (str): Hash of the inputs the phenopacket is run with.
+        Returns:
+            bool: True if the phenopacket does not need to be run again.
+        """
+        record = self.records.get(case_id)
+        return (
+            record is not None
+            and record.status == CaseStatus.COMPLETE
+            and record.input_hash == input_hash
+            and all(self.manifest_path.parent.joinpath(output_file).exists() for output_file in record.output_files)
+        )
+
+    def update(self, records: list[CaseRecord]) -> None:
+        """
+        Append records to the manifest.
+        Args:
+            records (List[CaseRecord]): The records to append.
+        """
+        with open(self.manifest_path, "a") as manifest_file:
+            for record in records:
+                manifest_file.write(json.dumps({**asdict(record), "status": record.status.value}) + "\n")
+                self.records[record.case_id] = record
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
@@ -1,12 +1,26 @@
 """Runners Module"""
 
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
 from pheval.config_parser import parse_input_dir_config
-from pheval.run_metadata import BasicOutputRunMetaData
+from pheval.post_processing.post_processing import (
+    ResultType,
+    flush_result_datasets,
+    get_result_files,
+    reset_post_processing_state,
+)
+from pheval.run_metadata import BasicOutputRunMetaData, PhaseTiming
+from pheval.runners.manifest import CaseRecord, CaseStatus, RunManifest, hash_case_inputs
+from pheval.runners.scheduler import JobResult, ToolJob, run_jobs
+from pheval.runners.shards import CaseShard
+from pheval.runners.timings import RunTimer
+from pheval.runners.worker_pool import WorkerPool
+from pheval.utils.file_utils import all_files
 from pheval.utils.logger import get_logger
 from pheval.utils.utils import get_resource_timestamp
 
@@ -26,12 +40,18 @@ class PhEvalRunner(ABC):
     directory_path = None
     input_dir_config = None
     _meta_data = None
+    _run_cases = None
+    _pending_cases = None
+    _run_started_at = None
+    _run_timer = None
+    _worker_pool = None
     __raw_results_dir = "raw_results/"
     __pheval_gene_results_dir = "pheval_gene_results/"
     __pheval_variant_results_dir = "pheval_variant_results/"
     __pheval_disease_results_dir = "pheval_disease_results/"
     __tool_input_commands_dir = "tool_input_commands/"
     __run_meta_data_file = "results.yml"
+    __run_manifest_file = "run_manifest.jsonl"
 
     def __post_init__(self):
         self.input_dir_config = parse_input_dir_config(self.input_dir)
@@ -88,6 +108,277 @@ class PhEvalRunner(ABC):
     def pheval_disease_results_dir(self, directory_path):
         self.directory_path = Path(directory_path)
 
+    @property
+    def run_manifest_file(self):
+        return Path(self.output_dir).joinpath(self.__run_manifest_file)
+
+    def _get_phenopacket_dir(self) -> Path:
+        return Path(self.testdata_dir).joinpath("phenopackets")
+
+    def _get_pheval_results_dirs(self) -> list[tuple[Path, ResultType]]:
+        """Get the PhEval results directories of the analyses enabled for the run."""
+        return [
+            (results_dir, result_type)
+            for results_dir, result_type, enabled in [
+                (self.pheval_gene_results_dir, ResultType.GENE, self._get_gene_analysis()),
+                (self.pheval_variant_results_dir, ResultType.VARIANT, self._get_variant_analysis()),
+                (self.pheval_disease_results_dir, ResultType.DISEASE, self._get_disease_analysis()),
+            ]
+            if enabled
+        ]
+
+    def _get_run_inputs(self) -> bytes:
+        """Get the inputs shared by every phenopacket of the run, hashed to detect changed inputs when resuming."""
+        return Path(self.input_dir).joinpath("config.yaml").read_bytes() + str(self.version).encode()
+
+    def _get_case_records(
+        self,
+        phenopackets: list[Path],
+        status_if_missing: CaseStatus | None,
+        modified_since: int | None = None,
+        newer_than_inputs: bool = False,
+    ) -> list[CaseRecord]:
+        """
+        Build run manifest records for phenopackets from the result files in the output directory.
+        Args:
+            phenopackets (List[Path]): The phenopackets to record.
+            status_if_missing (CaseStatus, optional): The status of phenopackets missing PhEval results for an
+                analysis of the run, or None to not record them.
+            modified_since (int, optional): Only consider PhEval results modified since this time,
+                in nanoseconds since the epoch.
+            newer_than_inputs (bool): Only consider PhEval results modified after the phenopacket and
+                the tool configuration.
+        Returns:
+            List[CaseRecord]: The records of the phenopackets.
+        """
+        results_files = [
+            get_result_files(results_dir, result_type, modified_since)
+            for results_dir, result_type in self._get_pheval_results_dirs()
+        ]
+        raw_results = os.listdir(self.raw_results_dir) if self.raw_results_dir.is_dir() else []
+        config_file = Path(self.input_dir).joinpath("config.yaml")
+        run_inputs, records = self._get_run_inputs(), []
+        for phenopacket in phenopackets:
+            case_results = [result_files.get(phenopacket.stem, set()) for result_files in results_files]
+            if newer_than_inputs:
+                inputs_modified = max(phenopacket.stat().st_mtime_ns, config_file.stat().st_mtime_ns)
+                case_results = [
+                    {result_file for result_file in result_files if result_file.stat().st_mtime_ns >= inputs_modified}
+                    for result_files in case_results
+                ]
+            status = CaseStatus.COMPLETE if all(case_results) else status_if_missing
+            if status is None:
+                continue
+            raw_result_files = {
+                self.raw_results_dir.joinpath(raw_result)
+                for raw_result in raw_results
+                if raw_result.startswith(phenopacket.stem)
+                and not raw_result[len(phenopacket.stem) : len(phenopacket.stem) + 1].isalnum()
+            }
+            records.append(
+                CaseRecord(
+                    case_id=phenopacket.stem,
+                    status=status,
+                    input_hash=hash_case_inputs(phenopacket, run_inputs),
+                    output_files=sorted(
+                        str(output_file.relative_to(self.output_dir))
+                        for output_file in raw_result_files.union(*case_results)
+                    ),
+                )
+            )
+        return records
+
+    @property
+    def run_cases(self) -> list[Path]:
+        """
+        Phenopackets of the run.
+        Returns:
+            List[Path]: The phenopackets in the corpus, or in the shard of the corpus being run.
+        """
+        if self._run_cases is None:
+            self.load_run_manifest()
+        return self._run_cases
+
+    @property
+    def pending_cases(self) -> list[Path]:
+        """
+        Phenopackets still to be run.
+        Plugins can restrict the prepare, run and post-processing phases to these phenopackets,
+        so that a sharded or resumed run only executes its part of the corpus.
+        Returns:
+            List[Path]: The phenopackets of the run, less those skipped when resuming a run.
+        """
+        if self._pending_cases is None:
+            self.load_run_manifest()
+        return self._pending_cases
+
+    def load_run_manifest(self, resume: bool = False, shard: CaseShard | None = None) -> None:
+        """
+        Load the run manifest from the output directory and determine the phenopackets still to be run.
+
+        Notes:
+            When resuming, phenopackets recorded as complete are skipped if their inputs are unchanged
+            and their recorded output files are still present. Phenopackets without a record, e.g. because
+            the previous run was interrupted, are skipped if PhEval results were written for every analysis
+            after the phenopacket and tool configuration were last modified.
+            This starts a run, so the post-processing state left by earlier runs in the process is reset.
+
+        Args:
+            resume (bool): Whether to skip the phenopackets completed by a previous run. Defaults to running all.
+            shard (CaseShard, optional): The shard of the corpus to run. Defaults to running the whole corpus.
+        """
+        reset_post_processing_state()
+        # take the start time from the file system clock, which result file modification times are compared to
+        self.run_manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        self.run_manifest_file.touch()
+        self._run_started_at = self.run_manifest_file.stat().st_mtime_ns
+        phenopacket_dir = self._get_phenopacket_dir()
+        phenopackets = all_files(phenopacket_dir) if phenopacket_dir.is_dir() else []
+        if shard is not None:
+            phenopackets = shard.select(phenopackets)
+        self._run_cases = phenopackets
+        if resume:
+            manifest = RunManifest(self.run_manifest_file)
+            manifest.update(
+                self._get_case_records(
+                    [phenopacket for phenopacket in phenopackets if phenopacket.stem not in manifest.records],
+                    status_if_missing=None,
+                    newer_than_inputs=True,
+                )
+            )
+            run_inputs = self._get_run_inputs()
+            phenopackets = [
+                phenopacket
+                for phenopacket in phenopackets
+                if not manifest.is_complete(phenopacket.stem, hash_case_inputs(phenopacket, run_inputs))
+            ]
+        self._pending_cases = phenopackets
+
+    def update_run_manifest(self) -> None:
+        """
+        Record the status of the pending phenopackets in the run manifest.
+        Phenopackets are complete when PhEval results were written for every analysis of the run since
+        the run manifest was loaded, so this should be called before empty results are written.
+        Results buffered in dataset mode are written out first.
+        """
+        flush_result_datasets()
+        records = self._get_case_records(
+            self.pending_cases, status_if_missing=CaseStatus.FAILED, modified_since=self._run_started_at
+        )
+        RunManifest(self.run_manifest_file).update(records)
+        logger.info(
+            f"Recorded {sum(record.status == CaseStatus.COMPLETE for record in records)} of {len(records)} "
+            f"phenopackets as complete in {self.run_manifest_file}."
+        )
+
+    @property
+    def run_timer(self) -> RunTimer:
+        """
+        Timer recording the time and resources used by the run.
+        Returns:
+            RunTimer: The timer of the run.
+        """
+        if self._run_timer is None:
+            self._run_timer = RunTimer()
+        return self._run_timer
+
+    def time_case(self, case_id: str, phase: str = "run"):
+        """
+        Time the work done for a phenopacket, to be written to the run timings alongside the phase timings.
+
+        Example:
+            >>> for phenopacket in self.pending_cases:
+            ...     with self.time_case(phenopacket.stem):
+            ...         subprocess.run(...)
+
+        Args:
+            case_id (str): The phenopacket stem.
+            phase (str): The phase the work belongs to. Defaults to "run".
+        Returns:
+            ContextManager[None]: Context manager recording the timing when it exits.
+        """
+        return self.run_timer.time(phase, case_id)
+
+    def run_tool_jobs(
+        self,
+        jobs: list[ToolJob],
+        on_complete: Callable[[JobResult], None] | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        retries: int = 0,
+    ) -> list[JobResult]:
+        """
+        Run tool commands concurrently, post-processing each phenopacket as soon as its command succeeds.
+
+        Notes:
+            The standard output and error of each command are captured to `<case_id>.stdout.log` and
+            `<case_id>.stderr.log` in the raw results directory, and the time taken by each job
+            is written to the run timings.
+
+        Args:
+            jobs (List[ToolJob]): The jobs to run, typically one per phenopacket in `pending_cases`.
+            on_complete (Callable[[JobResult], None], optional): Callable post-processing the outputs of a
+                successful job, called in a worker thread while the remaining jobs keep running.
+            max_concurrency (int, optional): Maximum number of commands running at once. Defaults to the number of CPUs.
+            timeout (float, optional): Timeout in seconds for each attempt of a command. Defaults to no timeout.
+            retries (int): Number of times to retry a command that fails or times out. Defaults to 0.
+        Returns:
+            List[JobResult]: The outcome of each job, in the order of `jobs`.
+        """
+        job_results = run_jobs(
+            jobs,
+            self.raw_results_dir,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            retries=retries,
+            on_complete=on_complete,
+        )
+        for job_result in job_results:
+            self.run_timer.record(PhaseTiming(phase="run", wall_time=job_result.wall_time), job_result.job.case_id)
+        return job_results
+
+    def create_worker_pool(self) -> WorkerPool | None:
+        """
+        Create a pool of long-lived tool workers for the run phase.
+        Override this in runners for tools with a heavy startup cost, e.g. loading large databases,
+        so that it is paid once per worker rather than once per phenopacket.
+        Returns:
+            WorkerPool, optional: The worker pool, or None to not use one. Defaults to None.
+        """
+        return None
+
+    @property
+    def worker_pool(self) -> WorkerPool | None:
+        """
+        Pool of long-lived tool workers, started after `prepare()` and stopped after `run()`.
+        Returns:
+            WorkerPool, optional: The started worker pool, or None if the runner does not use one.
+        """
+        return self._worker_pool
+
+    def start_worker_pool(self) -> None:
+        """
+        Create and start the worker pool of the runner, if it uses one.
+
+        Notes:
+            A pool of 0 workers, e.g. configured to disable it, is not started
+            and `worker_pool` is left as None.
+        """
+        worker_pool = self.create_worker_pool()
+        if worker_pool is None:
+            return
+        if worker_pool.num_workers == 0:
+            logger.info("Worker pool disabled with 0 tool workers.")
+            return
+        worker_pool.start()
+        self._worker_pool = worker_pool
+
+    def stop_worker_pool(self) -> None:
+        """Stop the worker pool of the runner, if it was started."""
+        if self._worker_pool is not None:
+            self._worker_pool.stop()
+            self._worker_pool = None
+
     def build_output_directory_structure(self):
         """build output directory structure"""
         logger.info(
@@ -113,6 +404,7 @@ class PhEvalRunner(ABC):
             corpus=f"{Path(self.testdata_dir).parent.name}/{Path(self.testdata_dir).name}",
             mondo_download_date=get_resource_timestamp("mondo.sssom.tsv"),
             hgnc_download_date=get_resource_timestamp("hgnc_complete_set.txt"),
+            phase_timings=self.run_timer.phase_timings() or None,
         )
         return self._meta_data
 
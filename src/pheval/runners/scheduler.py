@@ -0,0 +1,298 @@
+"""Tool Job Scheduler Module"""
+
+import asyncio
+import os
+import signal
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+from pheval.post_processing.post_processing import (
+    complete_pheval_results,
+    defer_empty_pheval_results,
+    flush_result_datasets,
+    track_pheval_results,
+)
+from pheval.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class JobStatus(Enum):
+    """Enumeration of the outcomes of a tool job."""
+
+    SUCCEEDED = "succeeded"
+    """The command exited with a return code of 0."""
+    FAILED = "failed"
+    """The command exited with a non-zero return code or could not be started."""
+    TIMED_OUT = "timed_out"
+    """The command was killed after exceeding its timeout."""
+
+
+@dataclass
+class ToolJob:
+    """
+    A tool command to run for a phenopacket.
+
+    Args:
+        case_id (str): The phenopacket stem, used to name the captured output of the command.
+        command (List[str] | str): The command to run, either as arguments executed directly
+            or as a string executed by the shell, e.g. a line of a command file.
+        cwd (Path, optional): The working directory of the command.
+        env (Dict[str, str], optional): Environment variables to add to the environment of the command.
+        timeout (float, optional): Timeout in seconds overriding the timeout of the scheduler.
+    """
+
+    case_id: str
+    command: list[str] | str
+    cwd: Path | None = None
+    env: dict[str, str] | None = None
+    timeout: float | None = None
+
+
+@dataclass
+class JobResult:
+    """
+    The outcome of a tool job.
+
+    Args:
+        job (ToolJob): The job that was run.
+        status (JobStatus): The outcome of the last attempt of the job.
+        return_code (int, optional): The return code of the last attempt, None if it timed out or could not start.
+        attempts (int): The number of times the command was run.
+        wall_time (float): Wall clock time in seconds across all attempts.
+        stdout_path (Path): Path to the standard output captured from the last attempt.
+        stderr_path (Path): Path to the standard error captured from the last attempt.
+        post_processing_error (str, optional): The error raised post-processing the outputs of the job.
+    """
+
+    job: ToolJob
+    status: JobStatus
+    return_code: int | None
+    attempts: int
+    wall_time: float
+    stdout_path: Path
+    stderr_path: Path
+    post_processing_error: str | None = field(default=None)
+
+
+async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """
+    Kill a command together with any processes it started, e.g. the tool launched by a shell command.
+
+    Notes:
+        Process groups are only available on POSIX systems. Elsewhere only the command itself is killed.
+
+    Args:
+        process (asyncio.subprocess.Process): The command, started in a new session on POSIX systems.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+
+async def _run_command(job: ToolJob, stdout_path: Path, stderr_path: Path, timeout: float | None) -> int | None:
+    """
+    Run the command of a job once, capturing its output.
+    Args:
+        job (ToolJob): The job to run.
+        stdout_path (Path): Path to capture the standard output to.
+        stderr_path (Path): Path to capture the standard error to.
+        timeout (float, optional): Timeout in seconds.
+    Returns:
+        int, optional: The return code of the command, or None if it timed out.
+    Notes:
+        The command runs in its own session, so that when it times out or is cancelled
+        the processes it started are killed with it rather than left running.
+    """
+    env = {**os.environ, **job.env} if job.env else None
+    with open(stdout_path, "wb") as stdout, open(stderr_path, "wb") as stderr:
+        if isinstance(job.command, str):
+            process = await asyncio.create_subprocess_shell(
+                job.command, stdout=stdout, stderr=stderr, cwd=job.cwd, env=env, start_new_session=os.name == "posix"
+            )
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *job.command, stdout=stdout, stderr=stderr, cwd=job.cwd, env=env, start_new_session=os.name == "posix"
+            )
+        try:
+            return await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:  # noqa: UP041, not an alias of TimeoutError on Python 3.10
+            await _kill_process_group(process)
+            return None
+        except asyncio.CancelledError:
+            await _kill_process_group(process)
+            raise
+
+
+async def _run_job(
+    job: ToolJob, semaphore: asyncio.Semaphore, log_dir: Path, timeout: float | None, retries: int
+) -> JobResult:
+    """
+    Run a job, retrying it if it fails or times out.
+    Args:
+        job (ToolJob): The job to run.
+        semaphore (asyncio.Semaphore): Semaphore limiting the number of jobs running at once.
+        log_dir (Path): Directory to capture the output of the job to.
+        timeout (float, optional): Timeout in seconds, unless the job sets its own.
+        retries (int): Number of times to retry the job.
+    Returns:
+        JobResult: The outcome of the job.
+    """
+    stdout_path = log_dir.joinpath(f"{job.case_id}.stdout.log")
+    stderr_path = log_dir.joinpath(f"{job.case_id}.stderr.log")
+    timeout = job.timeout if job.timeout is not None else timeout
+    async with semaphore:
+        start_time, attempts = time.perf_counter(), 0
+        while True:
+            attempts += 1
+            try:
+                return_code = await _run_command(job, stdout_path, stderr_path, timeout)
+            except OSError as e:
+                logger.error(f"Failed to start the command for {job.case_id}: {e}")
+                return_code, status = None, JobStatus.FAILED
+            else:
+                status = (
+                    JobStatus.TIMED_OUT
+                    if return_code is None
+                    else JobStatus.SUCCEEDED
+                    if return_code == 0
+                    else JobStatus.FAILED
+                )
+            if status == JobStatus.SUCCEEDED or attempts > retries:
+                break
+            logger.warning(f"Retrying {job.case_id} after attempt {attempts} {status.value}.")
+    return JobResult(
+        job=job,
+        status=status,
+        return_code=return_code,
+        attempts=attempts,
+        wall_time=time.perf_counter() - start_time,
+        stdout_path=stdout_path,
+        stderr_path=stderr_path,
+    )
+
+
+def _post_process_job_outputs(job_result: JobResult, on_complete: Callable[[JobResult], None]) -> set:
+    """
+    Post-process the outputs of a successful job, recording any error raised.
+    Args:
+        job_result (JobResult): The outcome of the job.
+        on_complete (Callable[[JobResult], None]): Callable post-processing the outputs of the job.
+    Returns:
+        Set: The result outputs written to by `on_complete`, see `track_pheval_results`.
+    """
+    with track_pheval_results() as result_outputs:
+        try:
+            on_complete(job_result)
+        except Exception as e:
+            job_result.post_processing_error = f"{type(e).__name__}: {e}"
+    return result_outputs
+
+
+async def _post_process_job(
+    job_result: JobResult, on_complete: Callable[[JobResult], None], executor: ThreadPoolExecutor
+) -> set:
+    """
+    Post-process the outputs of a successful job in a worker thread, recording any error raised.
+    Args:
+        job_result (JobResult): The outcome of the job.
+        on_complete (Callable[[JobResult], None]): Callable post-processing the outputs of the job.
+        executor (ThreadPoolExecutor): The post-processing worker threads.
+    Returns:
+        Set: The result outputs written to by `on_complete`, see `track_pheval_results`.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, _post_process_job_outputs, job_result, on_complete
+    )
+
+
+async def run_jobs_async(
+    jobs: list[ToolJob],
+    log_dir: Path,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    retries: int = 0,
+    on_complete: Callable[[JobResult], None] | None = None,
+    post_processing_workers: int = 1,
+) -> list[JobResult]:
+    """
+    Run tool jobs concurrently, post-processing each job as soon as it succeeds.
+    See `run_jobs` for details.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+    job_tasks = [asyncio.ensure_future(_run_job(job, semaphore, log_dir, timeout, retries)) for job in jobs]
+    post_processing = []
+    with defer_empty_pheval_results(), ThreadPoolExecutor(max_workers=post_processing_workers) as executor:
+        for next_result in asyncio.as_completed(job_tasks):
+            job_result = await next_result
+            if job_result.status != JobStatus.SUCCEEDED:
+                logger.error(
+                    f"Tool job for {job_result.job.case_id} {job_result.status.value} after "
+                    f"{job_result.attempts} attempts, see {job_result.stderr_path}."
+                )
+            elif on_complete is not None:
+                post_processing.append(asyncio.ensure_future(_post_process_job(job_result, on_complete, executor)))
+        result_outputs = set().union(*await asyncio.gather(*post_processing))
+    if on_complete is not None:
+        flush_result_datasets()
+        complete_pheval_results(result_outputs)
+    job_results = [job_task.result() for job_task in job_tasks]
+    for job_result in job_results:
+        if job_result.post_processing_error is not None:
+            logger.error(f"Failed to post-process {job_result.job.case_id}: {job_result.post_processing_error}")
+    return job_results
+
+
+def run_jobs(
+    jobs: list[ToolJob],
+    log_dir: Path,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    retries: int = 0,
+    on_complete: Callable[[JobResult], None] | None = None,
+    post_processing_workers: int = 1,
+) -> list[JobResult]:
+    """
+    Run tool jobs concurrently, post-processing each job as soon as it succeeds.
+
+    Notes:
+        Up to `max_concurrency` commands run at once, and the standard output and error of each command
+        are captured to `<case_id>.stdout.log` and `<case_id>.stderr.log` in `log_dir`.
+        `on_complete` is called in a worker thread for each job that succeeds, while the remaining jobs
+        keep running, so post-processing overlaps tool execution. It is expected to read the raw results
+        of the job and call `generate_gene_result`, `generate_variant_result` or `generate_disease_result`.
+        Errors of individual jobs are logged and returned rather than aborting the run.
+        Empty results for the phenopackets without a result are written once all jobs have finished
+        to the output directories written to by `on_complete`, unless they are deferred.
+
+    Args:
+        jobs (List[ToolJob]): The jobs to run.
+        log_dir (Path): Directory to capture the output of the commands to.
+        max_concurrency (int, optional): Maximum number of commands running at once. Defaults to the number of CPUs.
+        timeout (float, optional): Timeout in seconds for each attempt of a command. Defaults to no timeout.
+        retries (int): Number of times to retry a command that fails or times out. Defaults to 0.
+        on_complete (Callable[[JobResult], None], optional): Callable post-processing the outputs of a successful job.
+        post_processing_workers (int): Number of threads post-processing jobs. Defaults to 1.
+    Returns:
+        List[JobResult]: The outcome of each job, in the order of `jobs`.
+    """
+    logger.info(f"Running {len(jobs)} tool jobs with up to {max_concurrency or os.cpu_count() or 1} at once.")
+    job_results = asyncio.run(
+        run_jobs_async(jobs, log_dir, max_concurrency, timeout, retries, on_complete, post_processing_workers)
+    )
+    succeeded = sum(
+        job_result.status == JobStatus.SUCCEEDED and job_result.post_processing_error is None
+        for job_result in job_results
+    )
+    logger.info(f"Completed {succeeded} of {len(jobs)} tool jobs.")
+    return job_results
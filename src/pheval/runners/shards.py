@@ -0,0 +1,157 @@
+"""Sharding Module"""
+
+import os
+import shutil
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import polars as pl
+
+from pheval.post_processing.post_processing import ResultType, get_result_files
+from pheval.runners.timings import TIMINGS_FILE_NAME
+from pheval.utils.file_utils import all_files
+from pheval.utils.logger import get_logger
+
+logger = get_logger()
+
+PHEVAL_RESULTS_DIRS = {
+    "pheval_gene_results": ResultType.GENE,
+    "pheval_variant_results": ResultType.VARIANT,
+    "pheval_disease_results": ResultType.DISEASE,
+}
+
+
+@dataclass(frozen=True)
+class CaseShard:
+    """
+    A deterministic subset of the phenopackets in a corpus.
+
+    Notes:
+        Phenopackets are assigned to shards by the CRC32 checksum of their stem, so the assignment does not
+        depend on the machine, the listing order of the corpus or the other phenopackets in it.
+
+    Args:
+        shard_index (int, optional): The index of the shard, from 0 to `shard_count` - 1.
+        shard_count (int, optional): The number of shards the corpus is split into.
+        case_ids (FrozenSet[str], optional): The stems of the phenopackets to restrict the shard to.
+    """
+
+    shard_index: int | None = None
+    shard_count: int | None = None
+    case_ids: frozenset[str] | None = None
+
+    def __post_init__(self):
+        if (self.shard_index is None) != (self.shard_count is None):
+            raise ValueError("Both the shard index and the shard count should be provided.")
+        if self.shard_count is not None and not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(f"The shard index should be between 0 and {self.shard_count - 1}, got {self.shard_index}.")
+
+    def contains(self, case_id: str) -> bool:
+        """
+        Check whether a phenopacket belongs to the shard.
+        Args:
+            case_id (str): The phenopacket stem.
+        Returns:
+            bool: True if the phenopacket belongs to the shard.
+        """
+        if self.case_ids is not None and case_id not in self.case_ids:
+            return False
+        return self.shard_count is None or zlib.crc32(case_id.encode()) % self.shard_count == self.shard_index
+
+    def select(self, phenopackets: list[Path]) -> list[Path]:
+        """
+        Select the phenopackets belonging to the shard.
+        Args:
+            phenopackets (List[Path]): Paths to the phenopackets of the corpus.
+        Returns:
+            List[Path]: Paths to the phenopackets of the shard.
+        """
+        return [phenopacket for phenopacket in phenopackets if self.contains(phenopacket.stem)]
+
+
+def read_case_ids(cases_from: Path) -> frozenset[str]:
+    """
+    Read the phenopackets to run from a file.
+    Args:
+        cases_from (Path): Path to a file listing one phenopacket file name or stem per line.
+            Blank lines and lines starting with `#` are ignored.
+    Returns:
+        FrozenSet[str]: The phenopacket stems.
+    """
+    with open(cases_from) as cases_file:
+        return frozenset(
+            Path(line.strip()).name.removesuffix(".json")
+            for line in cases_file
+            if line.strip() and not line.startswith("#")
+        )
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """
+    Hard link a file, copying it instead if linking is not possible, e.g. across file systems.
+    Args:
+        source (Path): The file to link.
+        destination (Path): The path to link the file to.
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def merge_shards(shard_dirs: list[Path], phenopacket_dir: Path, output_dir: Path) -> None:
+    """
+    Validate that the shards of a sharded run cover the corpus and merge their PhEval results into one run directory.
+
+    Notes:
+        Every phenopacket of the corpus must have a result in exactly one shard for each result type,
+        so a missing or duplicated shard is reported before any result is merged.
+        Result files are hard linked into the merged run directory where possible, along with the
+        run metadata of the first shard. The run timings of the shards are concatenated, so the
+        throughput of a merged run is computed from the total time taken by its shards.
+
+    Args:
+        shard_dirs (List[Path]): The output directories of the shards.
+        phenopacket_dir (Path): The directory containing the phenopackets of the corpus.
+        output_dir (Path): The output directory to merge the shards into.
+    Raises:
+        ValueError: If the shards do not cover the corpus exactly once for each result type.
+    """
+    expected_cases = {phenopacket.stem for phenopacket in all_files(phenopacket_dir)}
+    results_dirs = sorted(
+        results_dir for results_dir in PHEVAL_RESULTS_DIRS if any(d.joinpath(results_dir).is_dir() for d in shard_dirs)
+    )
+    shard_results = {}
+    for results_dir in results_dirs:
+        case_shards = {}
+        for shard_dir in shard_dirs:
+            if not shard_dir.joinpath(results_dir).is_dir():
+                raise ValueError(f"Shard {shard_dir} has no {results_dir} directory.")
+            result_files = get_result_files(shard_dir.joinpath(results_dir), PHEVAL_RESULTS_DIRS[results_dir])
+            shard_results[(shard_dir, results_dir)] = result_files
+            for case_id in result_files:
+                if case_id in case_shards:
+                    raise ValueError(
+                        f"{case_id} has {results_dir} in more than one shard: {case_shards[case_id]} and {shard_dir}."
+                    )
+                case_shards[case_id] = shard_dir
+        missing_cases = expected_cases - set(case_shards)
+        if missing_cases:
+            raise ValueError(
+                f"{len(missing_cases)} phenopackets in {phenopacket_dir} have no {results_dir} in any shard, "
+                f"e.g. {sorted(missing_cases)[0]}. Check that every shard has completed."
+            )
+    for (_, results_dir), result_files in shard_results.items():
+        output_dir.joinpath(results_dir).mkdir(parents=True, exist_ok=True)
+        for result_file in set().union(*result_files.values()):
+            _link_or_copy(result_file, output_dir.joinpath(results_dir, result_file.name))
+    run_metadata = shard_dirs[0].joinpath("results.yml")
+    if run_metadata.is_file():
+        shutil.copy2(run_metadata, output_dir.joinpath("results.yml"))
+    timings_files = [shard_dir.joinpath(TIMINGS_FILE_NAME) for shard_dir in shard_dirs]
+    if any(timings_file.is_file() for timings_file in timings_files):
+        pl.concat(
+            [pl.read_parquet(timings_file) for timings_file in timings_files if timings_file.is_file()]
+        ).write_parquet(output_dir.joinpath(TIMINGS_FILE_NAME))
+    logger.info(f"Merged results for {len(expected_cases)} phenopackets from {len(shard_dirs)} shards to {output_dir}.")
@@ -0,0 +1,148 @@
+"""Run Timings Module"""
+
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+
+import polars as pl
+
+from pheval.run_metadata import PhaseTiming
+
+try:
+    import resource
+except ImportError:  # not available on Windows, where only wall clock times are recorded
+    resource = None
+
+TIMINGS_FILE_NAME = "pheval_timings.parquet"
+
+_TIMINGS_SCHEMA = pl.Schema(
+    {
+        "phase": pl.String,
+        "case_id": pl.String,
+        "wall_time": pl.Float64,
+        "cpu_time": pl.Float64,
+        "peak_rss": pl.Int64,
+        "read_bytes": pl.Int64,
+        "write_bytes": pl.Int64,
+    }
+)
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere, ru_inblock/ru_oublock in 512-byte blocks
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+_BLOCK_SIZE = 512
+
+
+def _get_resource_usage() -> tuple[float, int, int, int] | None:
+    """
+    Get the resources used so far by the current process and its terminated child processes.
+    Returns:
+        Tuple[float, int, int, int], optional: The CPU time in seconds, peak resident set size in bytes,
+            and bytes read from and written to disk, or None if resource usage is unavailable.
+    """
+    if resource is None:
+        return None
+    usages = [resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)]
+    return (
+        sum(usage.ru_utime + usage.ru_stime for usage in usages),
+        max(usage.ru_maxrss for usage in usages) * _MAXRSS_UNIT,
+        sum(usage.ru_inblock for usage in usages) * _BLOCK_SIZE,
+        sum(usage.ru_oublock for usage in usages) * _BLOCK_SIZE,
+    )
+
+
+class RunTimer:
+    """Records the time and resources used by the phases of a run and by individual phenopackets."""
+
+    def __init__(self):
+        """Initialise the RunTimer class."""
+        self.timings: list[tuple[str | None, PhaseTiming]] = []
+
+    @contextmanager
+    def time(self, phase: str, case_id: str | None = None) -> Iterator[None]:
+        """
+        Time the work done in a context, recording it when the context exits.
+
+        Notes:
+            CPU time and disk I/O include child processes once they have terminated, e.g. a tool run with
+            `subprocess.run`. Timings of phenopackets processed concurrently in threads overlap.
+
+        Args:
+            phase (str): Name of the phase.
+            case_id (str, optional): The stem of the phenopacket, or None to time the whole phase.
+        """
+        start_usage, start_time = _get_resource_usage(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(
+                PhaseTiming(phase=phase, wall_time=time.perf_counter() - start_time),
+                case_id,
+                start_usage,
+            )
+
+    def record(
+        self,
+        timing: PhaseTiming,
+        case_id: str | None = None,
+        start_usage: tuple[float, int, int, int] | None = None,
+    ) -> None:
+        """
+        Record a timing.
+        Args:
+            timing (PhaseTiming): The timing to record.
+            case_id (str, optional): The stem of the phenopacket, or None for a whole phase.
+            start_usage (Tuple[float, int, int, int], optional): The resource usage at the start of the timing,
+                used to fill in the resources used by the timing.
+        """
+        end_usage = _get_resource_usage()
+        if start_usage is not None and end_usage is not None:
+            timing.cpu_time = end_usage[0] - start_usage[0]
+            timing.peak_rss = end_usage[1]
+            timing.read_bytes = end_usage[2] - start_usage[2]
+            timing.write_bytes = end_usage[3] - start_usage[3]
+        self.timings.append((case_id, timing))
+
+    def phase_timings(self) -> list[PhaseTiming]:
+        """
+        Get the timings of the whole phases of the run.
+        Returns:
+            List[PhaseTiming]: The phase timings, in the order the phases ran.
+        """
+        return [timing for case_id, timing in self.timings if case_id is None]
+
+    def to_dataframe(self) -> pl.DataFrame:
+        """
+        Get all the timings as a table, with a null `case_id` for whole phases.
+        Returns:
+            pl.DataFrame: The timings.
+        """
+        return pl.DataFrame(
+            [{**asdict(timing), "case_id": case_id} for case_id, timing in self.timings], schema=_TIMINGS_SCHEMA
+        )
+
+    def write(self, output_dir: Path) -> None:
+        """
+        Write the timings to a Parquet file in the run output directory.
+        Args:
+            output_dir (Path): The run output directory.
+        """
+        self.to_dataframe().write_parquet(Path(output_dir).joinpath(TIMINGS_FILE_NAME))
+
+
+def get_run_wall_time(results_dir: Path) -> float | None:
+    """
+    Get the wall clock time of a run from its recorded timings.
+    Args:
+        results_dir (Path): The run output directory.
+    Returns:
+        float, optional: The total wall clock time in seconds of the phases of the run,
+            or None if no timings were recorded.
+    """
+    timings_file = Path(results_dir).joinpath(TIMINGS_FILE_NAME)
+    if not timings_file.is_file():
+        return None
+    wall_time = pl.read_parquet(timings_file).filter(pl.col("case_id").is_null())["wall_time"].sum()
+    return wall_time if wall_time > 0 else None
@@ -0,0 +1,370 @@
+"""Tool Worker Pool Module"""
+
+import queue
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+from pheval.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class WorkerError(Exception):
+    """Raised when a tool worker fails to start or to process a request."""
+
+
+class ToolWorker(ABC):
+    """
+    A long-lived tool process or local service processing one request at a time.
+
+    Notes:
+        Implementations pay the startup cost of the tool, e.g. loading its databases, in `start()`
+        and then process any number of requests, typically one per phenopacket, until `stop()`.
+    """
+
+    @abstractmethod
+    def start(self) -> None:
+        """
+        Start the worker, returning once it is ready to process requests.
+        Raises:
+            WorkerError: If the worker fails to start.
+        """
+
+    @abstractmethod
+    def submit(self, request: str, timeout: float | None = None) -> str:
+        """
+        Process a request.
+        Args:
+            request (str): The request, e.g. the path to a phenopacket or to a batch file.
+            timeout (float, optional): Timeout in seconds. Defaults to no timeout.
+        Returns:
+            str: The response of the worker.
+        Raises:
+            WorkerError: If the worker fails to process the request, after which it is restarted.
+        """
+
+    def is_healthy(self) -> bool:
+        """
+        Check whether the worker can process requests, e.g. whether its process is still alive.
+        Returns:
+            bool: True if the worker is healthy.
+        """
+        return True
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stop the worker, releasing its resources."""
+
+
+class SubprocessToolWorker(ToolWorker):
+    """
+    A persistent tool process fed one request per line over stdin and answering with one line on stdout.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        cwd: Path | None = None,
+        env: dict[str, str] | None = None,
+        ready_line: str | None = None,
+        startup_timeout: float | None = None,
+        log_path: Path | None = None,
+        stop_timeout: float = 10,
+    ):
+        """
+        Initialise the SubprocessToolWorker class.
+        Args:
+            command (List[str]): The command starting the tool process.
+            cwd (Path, optional): The working directory of the tool process.
+            env (Dict[str, str], optional): The environment of the tool process. Defaults to the current environment.
+            ready_line (str, optional): Line the tool writes to stdout once it is ready to process requests.
+                Defaults to not waiting for the tool to be ready.
+            startup_timeout (float, optional): Timeout in seconds waiting for `ready_line`.
+            log_path (Path, optional): File to append the standard error of the tool process to.
+                Defaults to discarding it.
+            stop_timeout (float): Seconds to wait for the tool to exit once stdin is closed before killing it.
+        """
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.ready_line = ready_line
+        self.startup_timeout = startup_timeout
+        self.log_path = log_path
+        self.stop_timeout = stop_timeout
+        self._process = None
+        self._responses = None
+        self._log_file = None
+
+    def _read_responses(self, process: subprocess.Popen, responses: queue.Queue) -> None:
+        """Read the stdout of the tool process line by line, marking the end of the output with None."""
+        for line in process.stdout:
+            responses.put(line.rstrip("\n"))
+        responses.put(None)
+
+    def _get_response(self, timeout: float | None) -> str:
+        """Get the next line written by the tool process."""
+        process = self._process
+        try:
+            response = self._responses.get(timeout=timeout)
+        except queue.Empty as e:
+            raise WorkerError(f"No response from {self.command[0]} within {timeout} seconds.") from e
+        if response is None:
+            raise WorkerError(f"{self.command[0]} exited with return code {process.wait()}.")
+        return response
+
+    def start(self) -> None:
+        self._log_file = open(self.log_path, "ab") if self.log_path else None
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._log_file or subprocess.DEVNULL,
+                cwd=self.cwd,
+                env=self.env,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            self.stop()
+            raise WorkerError(f"Failed to start {self.command[0]}: {e}") from e
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_responses, args=(self._process, self._responses), daemon=True).start()
+        if self.ready_line is not None:
+            try:
+                while self._get_response(self.startup_timeout) != self.ready_line:
+                    pass
+            except WorkerError:
+                self.stop()
+                raise
+
+    def submit(self, request: str, timeout: float | None = None) -> str:
+        try:
+            self._process.stdin.write(f"{request}\n")
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise WorkerError(f"Failed to send request to {self.command[0]}: {e}") from e
+        return self._get_response(timeout)
+
+    def is_healthy(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def stop(self) -> None:
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            try:
+                self._process.wait(self.stop_timeout)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+
+@dataclass
+class WorkerResult:
+    """
+    The outcome of a request processed by a worker pool.
+
+    Args:
+        case_id (str): The phenopacket stem the request was made for.
+        response (str, optional): The response of the worker, None if the request failed.
+        error (str, optional): The error raised processing the request.
+    """
+
+    case_id: str
+    response: str | None = None
+    error: str | None = None
+
+
+class WorkerPool:
+    """
+    A pool of long-lived tool workers, so the startup cost of a tool is paid once per worker rather than per case.
+
+    Notes:
+        Each worker processes one request at a time. A worker that is found unhealthy before a request,
+        or that fails to process one, is stopped and replaced with a new worker, and the request retried.
+        A worker that fails the last attempt at a request is stopped and only replaced before the next request.
+        The pool gives up once more than `max_restarts` workers have been restarted in total.
+    """
+
+    def __init__(
+        self,
+        worker_factory: Callable[[int], ToolWorker],
+        num_workers: int = 1,
+        request_timeout: float | None = None,
+        retries: int = 1,
+        max_restarts: int = 3,
+        stop_timeout: float | None = 60,
+    ):
+        """
+        Initialise the WorkerPool class.
+        Args:
+            worker_factory (Callable[[int], ToolWorker]): Callable creating the worker with the given index,
+                e.g. to assign each worker its own port or log file.
+            num_workers (int): Number of workers. Defaults to 1. A pool of 0 workers is treated as disabled
+                by `pheval run`, see `PhEvalRunner.start_worker_pool`.
+            request_timeout (float, optional): Timeout in seconds for each request. Defaults to no timeout.
+            retries (int): Number of times to retry a failed request on a restarted worker. Defaults to 1.
+            max_restarts (int): Maximum number of worker restarts across the pool. Defaults to 3.
+            stop_timeout (float, optional): Seconds to wait for the workers to stop. Defaults to 60 seconds.
+        Raises:
+            ValueError: If the number of workers is negative.
+        """
+        if num_workers < 0:
+            raise ValueError(f"The number of tool workers must be 0 or more, got {num_workers}.")
+        self.worker_factory = worker_factory
+        self.num_workers = num_workers
+        self.request_timeout = request_timeout
+        self.retries = retries
+        self.max_restarts = max_restarts
+        self.stop_timeout = stop_timeout
+        self.restarts = 0
+        self._workers = None
+        self._idle_workers = None
+        self._restart_lock = threading.Lock()
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _start_worker(self, index: int) -> ToolWorker:
+        """Create and start the worker with the given index."""
+        worker = self.worker_factory(index)
+        worker.start()
+        return worker
+
+    def _stop_worker(self, index: int, worker: ToolWorker) -> None:
+        """Stop a failed worker, to be restarted before its next request, unless the pool is stopping it."""
+        with self._restart_lock:
+            if self._workers is None:
+                return
+            self._workers[index] = None
+        worker.stop()
+
+    def _restart_worker(self, index: int) -> ToolWorker:
+        """
+        Replace a stopped worker with a new one.
+        Raises:
+            WorkerError: If the pool has restarted the maximum number of workers or has been stopped.
+        """
+        with self._restart_lock:
+            if self._workers is None:
+                raise WorkerError("The worker pool has been stopped.")
+            self.restarts += 1
+            if self.restarts > self.max_restarts:
+                raise WorkerError(f"Giving up after restarting {self.max_restarts} workers.")
+        logger.warning(f"Restarting worker {index} ({self.restarts} of {self.max_restarts} restarts).")
+        worker = self._start_worker(index)
+        with self._restart_lock:
+            if self._workers is not None:
+                self._workers[index] = worker
+                return worker
+        worker.stop()
+        raise WorkerError("The worker pool has been stopped.")
+
+    def start(self) -> None:
+        """Start the workers, in parallel, returning once they are all ready."""
+        logger.info(f"Starting {self.num_workers} tool workers.")
+        self._workers, self._idle_workers, errors = {}, queue.Queue(), []
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = {index: executor.submit(self._start_worker, index) for index in range(self.num_workers)}
+        for index, future in futures.items():
+            try:
+                self._workers[index] = future.result()
+                self._idle_workers.put((index, self._workers[index]))
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            self.stop()
+            raise WorkerError(f"Failed to start {len(errors)} of {self.num_workers} tool workers: {errors[0]}")
+
+    def submit(self, request: str) -> str:
+        """
+        Process a request on the next idle worker, blocking until one is available.
+        Args:
+            request (str): The request.
+        Returns:
+            str: The response of the worker.
+        Raises:
+            WorkerError: If the request failed on every attempt.
+        """
+        idle_workers = self._idle_workers
+        index, worker = idle_workers.get()
+        try:
+            attempts = 0
+            while True:
+                if worker is not None and not worker.is_healthy():
+                    logger.warning(f"Worker {index} is unhealthy.")
+                    self._stop_worker(index, worker)
+                    worker = None
+                if worker is None:
+                    worker = self._restart_worker(index)
+                try:
+                    return worker.submit(request, self.request_timeout)
+                except WorkerError as e:
+                    attempts += 1
+                    logger.warning(f"Worker {index} failed to process {request}: {e}")
+                    self._stop_worker(index, worker)
+                    worker = None
+                    if attempts > self.retries:
+                        raise
+        finally:
+            idle_workers.put((index, worker))
+
+    def map(self, requests: dict[str, str]) -> list[WorkerResult]:
+        """
+        Process requests across all the workers of the pool.
+        Args:
+            requests (Dict[str, str]): The request for each phenopacket stem.
+        Returns:
+            List[WorkerResult]: The outcome of each request, in the order of `requests`.
+        """
+
+        def process(case_id: str, request: str) -> WorkerResult:
+            try:
+                return WorkerResult(case_id=case_id, response=self.submit(request))
+            except WorkerError as e:
+                logger.error(f"Failed to process {case_id}: {e}")
+                return WorkerResult(case_id=case_id, error=str(e))
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            return list(executor.map(process, requests.keys(), requests.values()))
+
+    def stop(self) -> None:
+        """
+        Stop all the workers of the pool, including those still processing a request.
+
+        Notes:
+            The workers are stopped in parallel. Requests in progress fail, and workers still stopping
+            after `stop_timeout` seconds are left to stop in the background.
+        """
+        with self._restart_lock:
+            workers, self._workers, self._idle_workers = self._workers, None, None
+        if workers is None:
+            return
+        workers = {index: worker for index, worker in workers.items() if worker is not None}
+        if workers:
+            executor = ThreadPoolExecutor(max_workers=len(workers))
+            futures = {executor.submit(worker.stop): index for index, worker in workers.items()}
+            done, not_done = wait(futures, self.stop_timeout)
+            executor.shutdown(wait=False)
+            for future in done:
+                if future.exception() is not None:
+                    logger.warning(f"Failed to stop worker {futures[future]}: {future.exception()}")
+            for future in not_done:
+                logger.warning(f"Worker {futures[future]} did not stop within {self.stop_timeout} seconds.")
+        logger.info("Stopped tool workers.")
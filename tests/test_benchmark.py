@@ -0,0 +1,241 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import yaml
+
+from pheval.analyse.benchmark import _join_true_positive_cases, _scan_results, benchmark_runs, recompute_rank_stats
+from pheval.analyse.benchmark_output_type import BenchmarkOutputTypeEnum
+from pheval.post_processing.post_processing import DATASET_PART_PREFIX, ResultType, get_result_files
+
+gene_results = {
+    "case_a": pl.DataFrame(
+        {
+            "rank": [1, 2],
+            "score": [0.9, 0.5],
+            "gene_symbol": ["PAGE1", "GCDH"],
+            "gene_identifier": ["ENSG00000068985", "ENSG00000105607"],
+            "true_positive": [False, True],
+        }
+    ),
+    "case_b": pl.DataFrame(
+        {
+            "rank": [1],
+            "score": [0.8],
+            "gene_symbol": ["BBS1"],
+            "gene_identifier": ["ENSG00000174483"],
+            "true_positive": [True],
+        }
+    ),
+}
+
+
+class TestScanResults(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.per_case_dir = self.temp_dir.joinpath("per_case")
+        self.per_case_dir.mkdir()
+        for case_id, results in gene_results.items():
+            results.write_parquet(self.per_case_dir.joinpath(f"{case_id}-gene_result.parquet"))
+        self.dataset_dir = self.temp_dir.joinpath("dataset")
+        self.dataset_dir.mkdir()
+        pl.concat(
+            [results.with_columns(pl.lit(case_id).alias("case_id")) for case_id, results in gene_results.items()]
+        ).select(["case_id", *gene_results["case_a"].columns]).write_parquet(
+            self.dataset_dir.joinpath(f"{DATASET_PART_PREFIX}0.parquet")
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test__scan_results_per_case(self):
+        self.assertEqual(
+            sorted(
+                _scan_results(self.per_case_dir, BenchmarkOutputTypeEnum.GENE.value)
+                .collect()["file_path"]
+                .str.extract(r"([^/\\]+)$")
+                .unique()
+                .to_list()
+            ),
+            ["case_a-gene_result.parquet", "case_b-gene_result.parquet"],
+        )
+
+    def test__scan_results_dataset(self):
+        per_case_results = _scan_results(self.per_case_dir, BenchmarkOutputTypeEnum.GENE.value).collect()
+        dataset_results = _scan_results(self.dataset_dir, BenchmarkOutputTypeEnum.GENE.value).collect()
+        self.assertEqual(dataset_results.columns, per_case_results.columns)
+        self.assertTrue(
+            dataset_results.with_columns(pl.col("file_path").str.extract(r"([^/\\]+)$"))
+            .sort(["file_path", "rank"])
+            .equals(
+                per_case_results.with_columns(pl.col("file_path").str.extract(r"([^/\\]+)$")).sort(
+                    ["file_path", "rank"]
+                )
+            )
+        )
+
+    def test__scan_results_mixed_layout(self):
+        gene_results["case_b"].write_parquet(self.dataset_dir.joinpath("case_c-gene_result.parquet"))
+        self.assertEqual(
+            _scan_results(self.dataset_dir, BenchmarkOutputTypeEnum.GENE.value)
+            .collect()["file_path"]
+            .str.extract(r"([^/\\]+)$")
+            .n_unique(),
+            3,
+        )
+
+    def test__scan_results_dataset_rerun(self):
+        stale_part = self.dataset_dir.joinpath(f"{DATASET_PART_PREFIX}0.parquet")
+        os.utime(stale_part, ns=(0, 0))
+        gene_results["case_b"].with_columns(pl.lit("case_a").alias("case_id"), pl.lit(0.7).alias("score")).select(
+            ["case_id", *gene_results["case_a"].columns]
+        ).write_parquet(self.dataset_dir.joinpath(f"{DATASET_PART_PREFIX}1.parquet"))
+        results = _scan_results(self.dataset_dir, BenchmarkOutputTypeEnum.GENE.value).collect()
+        self.assertEqual(
+            sorted(
+                results.select(pl.col("file_path").str.extract(r"([^/\\]+)$"), "score").iter_rows(),
+            ),
+            [("case_a-gene_result.parquet", 0.7), ("case_b-gene_result.parquet", 0.8)],
+        )
+        self.assertEqual(
+            get_result_files(self.dataset_dir, ResultType.GENE),
+            {
+                "case_a": {self.dataset_dir.joinpath(f"{DATASET_PART_PREFIX}1.parquet")},
+                "case_b": {stale_part},
+            },
+        )
+
+
+class TestJoinTruePositiveCases(unittest.TestCase):
+    def test__join_true_positive_cases(self):
+        self.assertTrue(
+            _join_true_positive_cases(
+                [
+                    pl.LazyFrame(
+                        {
+                            "result_file": ["case_a", "case_b"],
+                            "variant_key": [1, 2],
+                            "variant_id": ["1-100-A-T", "2-200-C-G"],
+                            "run_1": [1, 3],
+                        }
+                    ),
+                    pl.LazyFrame(
+                        {
+                            "result_file": ["case_b", "case_a"],
+                            "variant_key": [2, 1],
+                            "variant_id": ["chr2-200-C-G", "chr1-100-A-T"],
+                            "run_2": [4, 2],
+                        }
+                    ),
+                ],
+                ["result_file", "variant_key"],
+                BenchmarkOutputTypeEnum.VARIANT.value,
+            )
+            .collect()
+            .equals(
+                pl.DataFrame(
+                    {
+                        "result_file": ["case_a", "case_b"],
+                        "variant_id": ["1-100-A-T", "2-200-C-G"],
+                        "run_1": [1, 3],
+                        "run_2": [2, 4],
+                    }
+                )
+            )
+        )
+
+
+class TestBenchmarkRuns(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        runs = []
+        for run_identifier in ["run_a", "run_b"]:
+            results_dir = self.temp_dir.joinpath(run_identifier, "pheval_gene_results")
+            results_dir.mkdir(parents=True)
+            for case_id, results in gene_results.items():
+                results.write_parquet(results_dir.joinpath(f"{case_id}-gene_result.parquet"))
+            runs.append(
+                {
+                    "run_identifier": run_identifier,
+                    "phenopacket_dir": str(self.temp_dir),
+                    "results_dir": str(results_dir.parent),
+                    "gene_analysis": True,
+                    "variant_analysis": False,
+                    "disease_analysis": False,
+                    "threshold": None,
+                    "score_order": "descending",
+                }
+            )
+        self.config_file = self.temp_dir.joinpath("benchmark_config.yaml")
+        with open(self.config_file, "w") as config_file:
+            plot_customisation = {
+                "plot_type": "bar_cumulative",
+                "rank_plot_title": None,
+                "roc_curve_title": None,
+                "precision_recall_title": None,
+            }
+            yaml.safe_dump(
+                {
+                    "benchmark_name": "benchmark",
+                    "runs": runs,
+                    "plot_customisation": {
+                        f"{prioritisation_type}_plots": plot_customisation
+                        for prioritisation_type in ["gene", "variant", "disease"]
+                    },
+                },
+                config_file,
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def read_tables(self, db_path: Path) -> dict[str, pl.DataFrame]:
+        conn = duckdb.connect(db_path, read_only=True)
+        tables = {
+            table_name: pl.from_arrow(conn.execute(f'SELECT * FROM "{table_name}"').fetch_arrow_table())
+            for (table_name,) in conn.execute("SHOW TABLES").fetchall()
+        }
+        conn.close()
+        return tables
+
+    def test_benchmark_runs_concurrent(self):
+        benchmark_runs(self.config_file, self.temp_dir.joinpath("sequential"), no_curves=False)
+        benchmark_runs(self.config_file, self.temp_dir.joinpath("concurrent"), no_curves=False, concurrent=True)
+        sequential_tables = self.read_tables(self.temp_dir.joinpath("sequential/benchmark.duckdb"))
+        concurrent_tables = self.read_tables(self.temp_dir.joinpath("concurrent/benchmark.duckdb"))
+        self.assertEqual(
+            sorted(sequential_tables),
+            [
+                "benchmark_gene_binary_classification_curves",
+                "benchmark_gene_rank_histogram",
+                "benchmark_gene_summary",
+                "benchmark_gene_true_positive_ranks",
+                "run_a_vs_run_b_gene_rank_changes",
+            ],
+        )
+        self.assertEqual(sorted(sequential_tables), sorted(concurrent_tables))
+        for table_name, table in sequential_tables.items():
+            self.assertTrue(table.equals(concurrent_tables[table_name]), table_name)
+
+    def test_recompute_rank_stats(self):
+        benchmark_runs(self.config_file, self.temp_dir, no_curves=True)
+        tables = self.read_tables(self.temp_dir.joinpath("benchmark.duckdb"))
+        self.assertEqual(
+            tables["benchmark_gene_rank_histogram"].to_dicts(),
+            [
+                {"run_identifier": "run_a", "rank": 1, "count": 1, "cumulative_count": 1},
+                {"run_identifier": "run_a", "rank": 2, "count": 1, "cumulative_count": 2},
+                {"run_identifier": "run_b", "rank": 1, "count": 1, "cumulative_count": 1},
+                {"run_identifier": "run_b", "rank": 2, "count": 1, "cumulative_count": 2},
+            ],
+        )
+        conn = duckdb.connect(self.temp_dir.joinpath("benchmark.duckdb"), read_only=True)
+        rank_stats = recompute_rank_stats(conn, "benchmark", BenchmarkOutputTypeEnum.GENE.value)
+        top20_stats = recompute_rank_stats(conn, "benchmark", BenchmarkOutputTypeEnum.GENE.value, k_values=[1, 20])
+        conn.close()
+        self.assertTrue(rank_stats.equals(tables["benchmark_gene_summary"].select(rank_stats.columns)))
+        self.assertEqual(top20_stats["top20"].to_list(), [2, 2])
@@ -2,8 +2,9 @@ import unittest
 
 import numpy as np
 import polars as pl
+from sklearn.metrics import precision_recall_curve, roc_curve
 
-from pheval.analyse.binary_classification_curves import BinaryClassificationCurves
+from pheval.analyse.binary_classification_curves import BinaryClassificationCurves, CurveMode
 
 
 class TestBinaryClassificationCurves(unittest.TestCase):
@@ -15,16 +16,9 @@ class TestBinaryClassificationCurves(unittest.TestCase):
             }
         )
 
-    def test_compute_finite_bounds(self):
-        """Test computing finite bounds (min and max finite values)."""
-        max_finite, min_finite = BinaryClassificationCurves._compute_finite_bounds(self.test_data)
-        self.assertEqual(max_finite, 0.8)
-        self.assertEqual(min_finite, 0.3)
-
     def test_clean_and_extract_data(self):
         """Test that scores are properly cleaned and NaNs/Inf are replaced."""
-        max_finite, min_finite = BinaryClassificationCurves._compute_finite_bounds(self.test_data)
-        cleaned = BinaryClassificationCurves._clean_and_extract_data(self.test_data, max_finite, min_finite).collect()
+        cleaned = BinaryClassificationCurves._clean_and_extract_data(self.test_data).collect()
 
         expected_cleaned_scores = [0.5, 0.0, 0.8, 0.8, 0.3, 0.3]
         expected_true_positive = [1, 0, 1, 1, 0, 0]
@@ -32,29 +26,40 @@ class TestBinaryClassificationCurves(unittest.TestCase):
         self.assertListEqual(cleaned["score"].to_list(), expected_cleaned_scores)
         self.assertListEqual(cleaned["true_positive"].to_list(), expected_true_positive)
 
-    def test_compute_roc_pr_curves(self):
-        """Test that ROC and PR curves are computed correctly."""
-        labels = np.array([1, 0, 1, 1, 0])
-        scores = np.array([0.9, 0.1, 0.8, 0.4, 0.2])
+    def test_clean_and_extract_data_null_score(self):
+        """Test that results without a score are dropped."""
+        cleaned = BinaryClassificationCurves._clean_and_extract_data(
+            pl.LazyFrame({"score": [0.5, None, 0.2], "true_positive": [True, True, False]})
+        ).collect()
+        self.assertListEqual(cleaned["score"].to_list(), [0.5, 0.2])
+        self.assertListEqual(cleaned["true_positive"].to_list(), [1, 0])
 
-        curves = BinaryClassificationCurves._compute_roc_pr_curves("test_run", labels, scores).collect()
-        self.assertTrue(
-            curves.equals(
-                pl.DataFrame(
-                    [
-                        {
-                            "run_identifier": "test_run",
-                            "fpr": [0.0, 0.0, 0.0, 1.0],
-                            "tpr": [0.0, 0.3333333333333333, 1.0, 1.0],
-                            "threshold_roc": [np.inf, 0.9, 0.4, 0.1],
-                            "precision": [0.6, 0.75, 1.0, 1.0, 1.0, 1.0],
-                            "recall": [1.0, 1.0, 1.0, 0.6666666666666666, 0.3333333333333333, 0.0],
-                            "threshold_pr": [0.1, 0.2, 0.4, 0.8, 0.9],
-                        }
-                    ]
-                )
-            )
+    def test_process_null_score(self):
+        """Test that results without a score do not contribute to the curves."""
+        with_null_scores = pl.concat(
+            [self.test_data, pl.LazyFrame({"score": [None, None], "true_positive": [1, 0]})], how="vertical_relaxed"
         )
+        for mode in CurveMode:
+            self.assertTrue(
+                BinaryClassificationCurves.process(with_null_scores, "test_run", mode)
+                .collect()
+                .equals(BinaryClassificationCurves.process(self.test_data, "test_run", mode).collect()),
+                mode,
+            )
+
+    def test_bin_scores(self):
+        """Test that scores are replaced with the lower edge of their bin."""
+        binned = BinaryClassificationCurves._bin_scores(
+            pl.LazyFrame({"score": [0.0, 0.24, 0.26, 0.99, 1.0], "true_positive": [0, 0, 1, 1, 1]}), 4
+        ).collect()
+        self.assertListEqual(binned["score"].to_list(), [0.0, 0.0, 0.25, 0.75, 0.75])
+
+    def test_bin_scores_single_score(self):
+        """Test that binning a single distinct score keeps it."""
+        binned = BinaryClassificationCurves._bin_scores(
+            pl.LazyFrame({"score": [0.7, 0.7], "true_positive": [0, 1]}), 4
+        ).collect()
+        self.assertListEqual(binned["score"].to_list(), [0.7, 0.7])
 
     def test_process_integration(self):
         """Test full process integration from raw data to final curves."""
@@ -62,17 +67,44 @@ class TestBinaryClassificationCurves(unittest.TestCase):
         self.assertTrue(
             result.equals(
                 pl.DataFrame(
-                    [
-                        {
-                            "run_identifier": "test_run",
-                            "fpr": [0.0, 0.0, 0.0, 0.6666666666666666, 1.0],
-                            "tpr": [0.0, 0.6666666666666666, 1.0, 1.0, 1.0],
-                            "threshold_roc": [np.inf, 0.8, 0.5, 0.3, 0.0],
-                            "precision": [0.5, 0.6, 1.0, 1.0, 1.0],
-                            "recall": [1.0, 1.0, 1.0, 0.6666666666666666, 0.0],
-                            "threshold_pr": [0.0, 0.3, 0.5, 0.8],
-                        }
-                    ]
+                    {
+                        "run_identifier": ["test_run"] * 5,
+                        "threshold": [np.inf, 0.8, 0.5, 0.3, 0.0],
+                        "true_positives": [0, 2, 3, 3, 3],
+                        "false_positives": [0, 0, 0, 2, 3],
+                        "fpr": [0.0, 0.0, 0.0, 0.6666666666666666, 1.0],
+                        "tpr": [0.0, 0.6666666666666666, 1.0, 1.0, 1.0],
+                        "precision": [1.0, 1.0, 1.0, 0.6, 0.5],
+                        "recall": [0.0, 0.6666666666666666, 1.0, 1.0, 1.0],
+                    }
                 )
             )
         )
+
+    def test_process_matches_sklearn(self):
+        """Test that the exact curves match the curves computed by sklearn."""
+        rng = np.random.default_rng(42)
+        labels = rng.choice([True, False], 500, p=[0.2, 0.8])
+        scores = np.round(rng.random(500), 2)
+        result = BinaryClassificationCurves.process(
+            pl.LazyFrame({"score": scores, "true_positive": labels}), "test_run", max_points=1000
+        ).collect()
+        fpr, tpr, _ = roc_curve(labels, scores, drop_intermediate=False)
+        precision, recall, _ = precision_recall_curve(labels, scores)
+        np.testing.assert_allclose(result["fpr"].to_numpy(), fpr)
+        np.testing.assert_allclose(result["tpr"].to_numpy(), tpr)
+        np.testing.assert_allclose(result["precision"].to_numpy(), [1.0, *precision[-2::-1]])
+        np.testing.assert_allclose(result["recall"].to_numpy(), [0.0, *recall[-2::-1]])
+
+    def test_process_downsampled(self):
+        """Test that curves are downsampled to the maximum number of points, keeping both ends."""
+        rng = np.random.default_rng(42)
+        data = pl.LazyFrame(
+            {"score": rng.random(10000), "true_positive": rng.choice([True, False], 10000, p=[0.1, 0.9])}
+        )
+        for mode in CurveMode:
+            result = BinaryClassificationCurves.process(data, "test_run", mode, max_points=50, bins=1000).collect()
+            self.assertLessEqual(result.height, 50, mode)
+            self.assertEqual(result.row(0, named=True)["threshold"], np.inf, mode)
+            self.assertEqual((result["fpr"][-1], result["tpr"][-1]), (1.0, 1.0), mode)
+            self.assertTrue(result["fpr"].is_sorted() and result["tpr"].is_sorted(), mode)
@@ -2,12 +2,14 @@ import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import duckdb
 import matplotlib.pyplot as plt
 import polars as pl
 from duckdb import DuckDBPyConnection
 
+from pheval.analyse.benchmark_db_manager import write_table
 from pheval.analyse.benchmark_output_type import BenchmarkOutputTypeEnum
-from pheval.analyse.generate_plots import PlotGenerator, generate_plots
+from pheval.analyse.generate_plots import PlotGenerator, generate_plots, load_curves
 from pheval.analyse.run_data_parser import PlotCustomisation, SinglePlotCustomisation
 
 
@@ -29,11 +31,11 @@ class TestPlotGenerator(unittest.TestCase):
 
         self.curves_df = pl.DataFrame(
             {
-                "run_identifier": ["Run1"],
-                "fpr": [[0.0, 0.1, 0.2, 1.0]],
-                "tpr": [[0.0, 0.4, 0.8, 1.0]],
-                "precision": [[0.8, 0.75, 0.6, 0.5]],
-                "recall": [[1.0, 0.9, 0.7, 0.0]],
+                "run_identifier": ["Run1", "Run1", "Run1", "Run1"],
+                "fpr": [0.0, 0.1, 0.2, 1.0],
+                "tpr": [0.0, 0.4, 0.8, 1.0],
+                "precision": [1.0, 0.75, 0.6, 0.5],
+                "recall": [0.0, 0.7, 0.9, 1.0],
             }
         )
 
@@ -233,6 +235,52 @@ class TestPlotGenerator(unittest.TestCase):
         mock_rank_change_plot.assert_called_once()
 
 
+class TestLoadCurves(unittest.TestCase):
+    def setUp(self):
+        self.conn = duckdb.connect()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_load_curves(self):
+        curves = pl.DataFrame(
+            {
+                "run_identifier": ["Run1", "Run1"],
+                "fpr": [0.0, 1.0],
+                "tpr": [0.5, 1.0],
+                "precision": [1.0, 0.5],
+                "recall": [0.5, 1.0],
+            }
+        )
+        write_table(self.conn, curves, "test_gene_binary_classification_curves")
+        self.assertTrue(load_curves("test_gene_binary_classification_curves", self.conn).equals(curves))
+
+    @patch.object(plt, "savefig")
+    def test_load_curves_list_columns(self, mock_savefig):
+        write_table(
+            self.conn,
+            pl.DataFrame(
+                {
+                    "run_identifier": ["Run1"],
+                    "fpr": [[0.0, 0.0, 1.0]],
+                    "tpr": [[0.0, 0.5, 1.0]],
+                    "threshold_roc": [[float("inf"), 0.9, 0.1]],
+                    "precision": [[0.5, 1.0]],
+                    "recall": [[1.0, 0.5]],
+                    "threshold_pr": [[0.9]],
+                }
+            ),
+            "test_gene_binary_classification_curves",
+        )
+        curves = load_curves("test_gene_binary_classification_curves", self.conn)
+        self.assertEqual(curves.drop_nulls(["fpr", "tpr"])["tpr"].to_list(), [0.0, 0.5, 1.0])
+        self.assertEqual(curves.drop_nulls(["precision", "recall"])["precision"].to_list(), [0.5, 1.0])
+        plot_generator = PlotGenerator("test", Path("out"))
+        plot_generator.generate_roc_curve(curves, MagicMock(), MagicMock())
+        plot_generator.generate_precision_recall(curves, MagicMock(), MagicMock())
+        self.assertEqual(mock_savefig.call_count, 2)
+
+
 class TestClassifyRankChanges(unittest.TestCase):
     def setUp(self):
         self.plot_generator = PlotGenerator("test_benchmark", Path("out"))
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import polars as pl
+
+from pheval.post_processing.mondo_mapping import MondoIndex, map_disease_id, parse_mondo_mapping_table
+
+mondo_mapping_table = pl.DataFrame(
+    {
+        "subject_id": ["MONDO:0009061", "MONDO:0015264", "MONDO:0009825", "MONDO:0009825"],
+        "predicate_id": ["skos:exactMatch", "skos:exactMatch", "skos:exactMatch", "skos:exactMatch"],
+        "object_id": ["OMIM:219700", "OMIM:604131", "Orphanet:84", "ORPHA:84"],
+    }
+)
+
+
+class TestMondoIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mondo_index = MondoIndex(mondo_mapping_table)
+
+    def test_map_identifiers(self):
+        self.assertTrue(
+            self.mondo_index.map_identifiers(
+                pl.DataFrame(
+                    {
+                        "disease_identifier": ["OMIM:604131", "OMIM:12345", "ORPHA:84", "OMIM:219700"],
+                        "score": [0.9, 0.8, 0.7, 0.6],
+                    }
+                )
+            ).equals(
+                pl.DataFrame(
+                    {
+                        "disease_identifier": ["OMIM:604131", "OMIM:12345", "ORPHA:84", "OMIM:219700"],
+                        "score": [0.9, 0.8, 0.7, 0.6],
+                        "mondo_identifier": ["MONDO:0015264", "OMIM:12345", "MONDO:0009825", "MONDO:0009061"],
+                    }
+                )
+            )
+        )
+
+    def test_map_identifiers_matches_map_disease_id(self):
+        identifiers = ["OMIM:604131", "OMIM:12345", "Orphanet:84", "OMIM:219700"]
+        self.assertEqual(
+            self.mondo_index.map_identifiers(pl.DataFrame({"disease_identifier": identifiers}))[
+                "mondo_identifier"
+            ].to_list(),
+            [map_disease_id(identifier, mondo_mapping_table) for identifier in identifiers],
+        )
+
+    def test_map_identifier(self):
+        self.assertEqual(self.mondo_index.map_identifier("OMIM:219700"), "MONDO:0009061")
+
+    def test_map_identifier_unmapped(self):
+        self.assertEqual(self.mondo_index.map_identifier("OMIM:12345"), "OMIM:12345")
+
+
+class TestParseMondoMappingTable(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.mondo_mapping_path = Path(self.test_dir.name).joinpath("mondo.sssom.tsv")
+        self.mondo_mapping_path.write_text(
+            "# curie_map:\n"
+            "subject_id\tpredicate_id\tobject_id\n"
+            "MONDO:0009061\tskos:exactMatch\tOMIM:219700\n"
+            "MONDO:0009825\tskos:exactMatch\tOrphanet:84\n"
+        )
+        self.cache_dir = Path(self.test_dir.name).joinpath("cache")
+        self.environ = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.cache_dir)})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        self.test_dir.cleanup()
+
+    def cache_files(self) -> list[Path]:
+        return list(self.cache_dir.joinpath("pheval").glob("mondo.sssom.tsv.*.arrow"))
+
+    def test_parse_mondo_mapping_table(self):
+        self.assertEqual(
+            parse_mondo_mapping_table(self.mondo_mapping_path)["object_id"].to_list(),
+            ["OMIM:219700", "Orphanet:84", "ORPHA:84"],
+        )
+
+    def test_parse_mondo_mapping_table_writes_cache(self):
+        mondo_mapping_table = parse_mondo_mapping_table(self.mondo_mapping_path)
+        self.assertEqual(len(self.cache_files()), 1)
+        self.assertEqual(list(Path(self.test_dir.name).glob("*.arrow")), [])
+        self.assertTrue(parse_mondo_mapping_table(self.mondo_mapping_path).equals(mondo_mapping_table))
+
+    def test_parse_mondo_mapping_table_invalidates_cache(self):
+        parse_mondo_mapping_table(self.mondo_mapping_path)
+        with open(self.mondo_mapping_path, "a") as mondo_mapping_file:
+            mondo_mapping_file.write("MONDO:0015264\tskos:exactMatch\tOMIM:604131\n")
+        os.utime(self.mondo_mapping_path, ns=(0, 0))
+        self.assertIn("OMIM:604131", parse_mondo_mapping_table(self.mondo_mapping_path)["object_id"].to_list())
+        self.assertEqual(len(self.cache_files()), 1)
+
+    def test_parse_mondo_mapping_table_cache_keyed_by_path(self):
+        other_mondo_mapping_path = Path(self.test_dir.name).joinpath("other/mondo.sssom.tsv")
+        other_mondo_mapping_path.parent.mkdir()
+        other_mondo_mapping_path.write_text(
+            "subject_id\tpredicate_id\tobject_id\nMONDO:0015264\tskos:exactMatch\tOMIM:604131\n"
+        )
+        os.utime(other_mondo_mapping_path, ns=(0, self.mondo_mapping_path.stat().st_mtime_ns))
+        parse_mondo_mapping_table(self.mondo_mapping_path)
+        self.assertEqual(parse_mondo_mapping_table(other_mondo_mapping_path)["object_id"].to_list(), ["OMIM:604131"])
+        self.assertEqual(len(self.cache_files()), 2)
+
+    def test_parse_mondo_mapping_table_unwritable_cache(self):
+        self.cache_dir.write_text("")
+        self.assertEqual(len(parse_mondo_mapping_table(self.mondo_mapping_path)), 3)
+
+    def test_parse_mondo_mapping_table_corrupt_cache(self):
+        parse_mondo_mapping_table(self.mondo_mapping_path)
+        [cache_file] = self.cache_files()
+        cache_file.write_text("corrupt")
+        self.assertEqual(len(parse_mondo_mapping_table(self.mondo_mapping_path)), 3)
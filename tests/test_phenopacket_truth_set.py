@@ -1,11 +1,20 @@
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import polars as pl
 
-from pheval.post_processing.mondo_mapping import parse_mondo_mapping_table
-from pheval.post_processing.phenopacket_truth_set import PhenopacketTruthSet
+from pheval.post_processing.mondo_mapping import MondoIndex, parse_mondo_mapping_table
+from pheval.post_processing.phenopacket_truth_set import (
+    PhenopacketTruthSet,
+    compile_truth_set,
+    get_truth_set_path,
+    load_truth_set,
+    variant_key,
+)
 from pheval.utils.phenopacket_utils import GenomicVariant, ProbandCausativeGene, ProbandDisease
 
 diagnosed_genes = [
@@ -20,7 +29,9 @@ variants = [
 
 diseases = [ProbandDisease(disease_name="Cystic Fibrosis", disease_identifier="OMIM:219700")]
 
-mondo_mapping_table = parse_mondo_mapping_table()
+mondo_index = MondoIndex(parse_mondo_mapping_table())
+
+phenopacket_corpus_dir = Path(__file__).parent.parent.joinpath("corpora/lirical/default/phenopackets")
 
 
 class TestPhenopacketTruthSet(unittest.TestCase):
@@ -132,11 +143,11 @@ class TestPhenopacketTruthSet(unittest.TestCase):
             .equals(self.mock_gene_classified_results.sort("gene_identifier"))
         )
 
-    @patch("polars.read_parquet")
-    def test_merge_gene_results(self, mock_read_parquet):
-        mock_read_parquet.return_value = self.mock_gene_classified_results
+    def test_merge_gene_results(self):
         self.assertTrue(
-            self.phenopacket_truth_set.merge_gene_results(self.mock_gene_ranked_results, "output_file")
+            self.phenopacket_truth_set.merge_gene_results(
+                self.mock_gene_ranked_results, self.mock_gene_classified_results
+            )
             .sort("gene_identifier")
             .equals(
                 pl.DataFrame(
@@ -174,11 +185,11 @@ class TestPhenopacketTruthSet(unittest.TestCase):
             .equals(self.mock_variant_classified_results.sort("chrom"))
         )
 
-    @patch("polars.read_parquet")
-    def test_merge_variant_results(self, mock_read_parquet):
-        mock_read_parquet.return_value = self.mock_variant_classified_results
+    def test_merge_variant_results(self):
         self.assertTrue(
-            self.phenopacket_truth_set.merge_variant_results(self.mock_variant_ranked_results, "output_file")
+            self.phenopacket_truth_set.merge_variant_results(
+                self.mock_variant_ranked_results, self.mock_variant_classified_results
+            )
             .sort("chrom")
             .equals(
                 pl.DataFrame(
@@ -221,24 +232,47 @@ class TestPhenopacketTruthSet(unittest.TestCase):
             )
         )
 
+    def test_merge_variant_results_chr_prefix(self):
+        self.assertEqual(
+            self.phenopacket_truth_set.merge_variant_results(
+                self.mock_variant_ranked_results.with_columns(pl.lit("chrX").alias("chrom")).head(1),
+                self.mock_variant_classified_results,
+            )["true_positive"].to_list(),
+            [True, True],
+        )
+
+    def test_variant_key(self):
+        self.assertEqual(
+            pl.DataFrame(
+                {
+                    "chrom": ["chr1", "1", "chrM", "MT", "2"],
+                    "start": [100, 100, 50, 50, 100],
+                    "end": [100, 100, 50, 50, 100],
+                    "ref": ["A", "A", "C", "C", "A"],
+                    "alt": ["T", "T", "G", "G", "T"],
+                }
+            )
+            .select(variant_key())["variant_key"]
+            .n_unique(),
+            3,
+        )
+
     def test_classified_disease(self):
         self.assertTrue(
-            self.phenopacket_truth_set.classified_disease("dummy_result_name", mondo_mapping_table)
+            self.phenopacket_truth_set.classified_disease("dummy_result_name", mondo_index)
             .sort("disease_identifier")
             .equals(self.mock_disease_classified_results.sort("disease_identifier"))
         )
 
-    @patch("polars.read_parquet")
-    def test_merge_disease_results(self, mock_read_parquet):
-        mock_read_parquet.return_value = self.mock_disease_classified_results
+    def test_merge_disease_results(self):
         print(
             self.phenopacket_truth_set.merge_disease_results(
-                self.mock_disease_ranked_results, "output_file", mondo_mapping_table
+                self.mock_disease_ranked_results, self.mock_disease_classified_results, mondo_index
             ).sort("disease_identifier")
         )
         self.assertTrue(
             self.phenopacket_truth_set.merge_disease_results(
-                self.mock_disease_ranked_results, "output_file", mondo_mapping_table
+                self.mock_disease_ranked_results, self.mock_disease_classified_results, mondo_index
             )
             .sort("disease_identifier")
             .equals(
@@ -269,3 +303,69 @@ class TestPhenopacketTruthSet(unittest.TestCase):
                 ).sort("disease_identifier")
             )
         )
+
+
+class TestCompiledTruthSet(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        self.phenopacket_dir.mkdir()
+        for phenopacket in ["Abdul_Wahab-2016-GCDH-Patient_5.json", "Ajmal-2013-BBS1-IV-5_family_A.json"]:
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), self.phenopacket_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_compile_truth_set(self):
+        truth_set_path = compile_truth_set(self.phenopacket_dir)
+        self.assertEqual(truth_set_path, get_truth_set_path(self.phenopacket_dir))
+        truth_set = load_truth_set(self.phenopacket_dir)
+        self.assertEqual(
+            truth_set.filter(pl.col("entity_type") == "gene").select(["case_id", "gene_symbol"]).sort("case_id").rows(),
+            [("Abdul_Wahab-2016-GCDH-Patient_5", "GCDH"), ("Ajmal-2013-BBS1-IV-5_family_A", "BBS1")],
+        )
+
+    def test_load_truth_set_changed_corpus(self):
+        compile_truth_set(self.phenopacket_dir)
+        self.phenopacket_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A.json").unlink()
+        self.assertIsNone(load_truth_set(self.phenopacket_dir))
+
+    def test_load_truth_set_modified_phenopacket(self):
+        compile_truth_set(self.phenopacket_dir)
+        phenopacket_path = self.phenopacket_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A.json")
+        phenopacket_mtime_ns = phenopacket_path.stat().st_mtime_ns
+        os.utime(phenopacket_path, ns=(phenopacket_mtime_ns, phenopacket_mtime_ns + 1_000_000_000))
+        self.assertIsNone(load_truth_set(self.phenopacket_dir))
+
+    def test_classified_disease_uses_compiled_mondo_identifier(self):
+        compile_truth_set(self.phenopacket_dir)
+        truth_set_table = load_truth_set(self.phenopacket_dir).with_columns(
+            pl.when(pl.col("entity_type") == "disease").then(pl.lit("MONDO:0000001")).alias("mondo_identifier")
+        )
+        mondo_index = MagicMock()
+        classified_disease = PhenopacketTruthSet(self.phenopacket_dir, truth_set_table).classified_disease(
+            "Abdul_Wahab-2016-GCDH-Patient_5", mondo_index
+        )
+        self.assertEqual(classified_disease["mondo_identifier"].to_list(), ["MONDO:0000001"])
+        mondo_index.map_identifiers.assert_not_called()
+
+    def test_truth_set_table_matches_phenopackets(self):
+        compile_truth_set(self.phenopacket_dir)
+        compiled_truth_set = PhenopacketTruthSet(self.phenopacket_dir, load_truth_set(self.phenopacket_dir))
+        phenopacket_truth_set = PhenopacketTruthSet(self.phenopacket_dir)
+        for phenopacket in ["Abdul_Wahab-2016-GCDH-Patient_5", "Ajmal-2013-BBS1-IV-5_family_A"]:
+            self.assertTrue(
+                compiled_truth_set.classified_gene(phenopacket).equals(
+                    phenopacket_truth_set.classified_gene(phenopacket)
+                )
+            )
+            self.assertTrue(
+                compiled_truth_set.classified_variant(phenopacket).equals(
+                    phenopacket_truth_set.classified_variant(phenopacket)
+                )
+            )
+            self.assertTrue(
+                compiled_truth_set.classified_disease(phenopacket, mondo_index).equals(
+                    phenopacket_truth_set.classified_disease(phenopacket, mondo_index)
+                )
+            )
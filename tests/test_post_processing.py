@@ -1,9 +1,41 @@
+import itertools
+import random
+import shutil
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import polars as pl
+import pyarrow.parquet as pq
 
 from pheval.post_processing.phenopacket_truth_set import calculate_end_pos
-from pheval.post_processing.post_processing import SortOrder, _rank_results
+from pheval.post_processing.post_processing import (
+    DATASET_PART_PREFIX,
+    TOP_K_METADATA_KEY,
+    OutputMode,
+    ResultType,
+    SortOrder,
+    _rank_results,
+    complete_pheval_results,
+    create_empty_pheval_result,
+    defer_empty_pheval_results,
+    finalise_pheval_results,
+    generate_disease_result,
+    generate_disease_results_batch,
+    generate_gene_result,
+    generate_gene_results_batch,
+    generate_variant_result,
+    generate_variant_result_streaming,
+    generate_variant_results_batch,
+    get_result_cases,
+    registered_results,
+    reset_post_processing_state,
+    scan_dataset_parts,
+    track_pheval_results,
+)
+
+phenopacket_corpus_dir = Path(__file__).parent.parent.joinpath("corpora/lirical/default/phenopackets")
 
 gene_results = pl.DataFrame(
     [
@@ -251,3 +283,560 @@ class TestRankResults(unittest.TestCase):
                 )
             )
         )
+
+    def test__rank_results_null_score(self):
+        results = pl.DataFrame(
+            {"score": [3.0, 2.0, 1.0, None], "mondo_identifier": ["MONDO:1", "MONDO:2", "MONDO:3", "MONDO:4"]}
+        )
+        self.assertEqual(_rank_results(results, SortOrder.DESCENDING)["rank"].to_list(), [1, 2, 3, 4])
+
+    def test__rank_results_case_id(self):
+        stacked_variant_results = pl.concat(
+            [
+                variant_results.with_columns(pl.lit("case_1").alias("case_id")),
+                variant_results.head(3).with_columns(pl.lit("case_2").alias("case_id")),
+            ]
+        )
+        ranked_results = _rank_results(stacked_variant_results, SortOrder.DESCENDING)
+        for case_id, case_results in [("case_1", variant_results), ("case_2", variant_results.head(3))]:
+            self.assertTrue(
+                ranked_results.filter(pl.col("case_id") == case_id)
+                .drop("case_id")
+                .equals(_rank_results(case_results, SortOrder.DESCENDING))
+            )
+
+
+def _reference_rank_results(results: pl.DataFrame, sort_order: SortOrder) -> pl.DataFrame:
+    """Window based ranking the ranking kernel is validated against."""
+    sort_descending = sort_order == SortOrder.DESCENDING
+    case_keys = ["case_id"] if "case_id" in results.columns else []
+    group_by = [col for col in ["grouping_id", "mondo_identifier"] if col in results.columns]
+    if group_by:
+        min_rank = pl.struct(["score", *group_by]).rank(method="dense", descending=sort_descending)
+        return (
+            results.sort("score", descending=sort_descending)
+            .with_columns((min_rank.over(case_keys) if case_keys else min_rank).cast(pl.Int32).alias("min_rank"))
+            .with_columns(pl.col("min_rank").max().over([*case_keys, "score"]).alias("rank"))
+        )
+    rank = pl.col("score").rank(method="max", descending=sort_descending)
+    return results.sort("score", descending=sort_descending).with_columns(
+        (rank.over(case_keys) if case_keys else rank).alias("rank")
+    )
+
+
+class TestRankResultsProperties(unittest.TestCase):
+    def _random_results(self, rng: random.Random) -> pl.DataFrame:
+        num_results = rng.randint(1, 60)
+        scores = [rng.choice([0.0, 0.25, 0.5, 0.75, 1.0, None, rng.random()]) for _ in range(num_results)]
+        results = {"row": list(range(num_results)), "score": scores}
+        if rng.choice([True, False]):
+            results["case_id"] = [rng.choice(["case_a", "case_b", "case_c"]) for _ in range(num_results)]
+        for group_column in rng.choice(
+            [[], ["grouping_id"], ["mondo_identifier"], ["grouping_id", "mondo_identifier"]]
+        ):
+            results[group_column] = [rng.choice(["A", "B", "C", None]) for _ in range(num_results)]
+        return pl.DataFrame(results, schema_overrides={"score": pl.Float64})
+
+    def test__rank_results_matches_reference(self):
+        rng = random.Random(20240611)
+        for _ in range(500):
+            results = self._random_results(rng)
+            sort_order = rng.choice(list(SortOrder))
+            ranked_results = _rank_results(results, sort_order)
+            expected_results = _reference_rank_results(results, sort_order)
+            self.assertEqual(ranked_results.schema, expected_results.schema)
+            self.assertTrue(
+                ranked_results.sort("row").equals(expected_results.sort("row")), msg=f"{sort_order}\n{results}"
+            )
+
+    def test__rank_results_sorted_by_score(self):
+        rng = random.Random(7)
+        for _ in range(100):
+            results = self._random_results(rng)
+            case_keys = ["case_id"] if "case_id" in results.columns else []
+            ranked_results = _rank_results(results, SortOrder.DESCENDING)
+            for _, case_results in ranked_results.group_by(case_keys or pl.lit(True), maintain_order=True):
+                scores = case_results["score"].drop_nulls().to_list()
+                self.assertEqual(scores, sorted(scores, reverse=True))
+                self.assertEqual(case_results["score"].null_count(), case_results.height - len(scores))
+                self.assertTrue(case_results["score"].tail(case_results.height - len(scores)).is_null().all())
+                ranks = case_results["rank"].to_list()
+                self.assertEqual(ranks, sorted(ranks, key=lambda rank: float("inf") if rank is None else rank))
+
+
+class TestGenerateGeneResult(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        self.phenopacket_dir.mkdir()
+        for phenopacket in ["Abdul_Wahab-2016-GCDH-Patient_5.json", "Ajmal-2013-BBS1-IV-5_family_A.json"]:
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), self.phenopacket_dir)
+        self.output_dir = self.temp_dir.joinpath("output")
+        self.output_dir.joinpath("pheval_gene_results").mkdir(parents=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        registered_results.clear()
+
+    def _generate_gene_result(self):
+        generate_gene_result(
+            results=pl.DataFrame(
+                {
+                    "gene_symbol": ["PAGE1", "GCDH"],
+                    "gene_identifier": ["ENSG00000068985", "ENSG00000105607"],
+                    "score": [0.9, 0.5],
+                }
+            ),
+            sort_order=SortOrder.DESCENDING,
+            output_dir=self.output_dir,
+            result_path=Path("Abdul_Wahab-2016-GCDH-Patient_5.tsv"),
+            phenopacket_dir=self.phenopacket_dir,
+        )
+
+    def test_generate_gene_result_writes_empty_results(self):
+        self._generate_gene_result()
+        self.assertEqual(
+            sorted(file.name for file in self.output_dir.joinpath("pheval_gene_results").iterdir()),
+            [
+                "Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet",
+                "Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet",
+            ],
+        )
+        self.assertEqual(
+            pl.read_parquet(
+                self.output_dir.joinpath("pheval_gene_results/Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet")
+            )["rank"].to_list(),
+            [1, 2],
+        )
+        self.assertEqual(
+            pl.read_parquet(
+                self.output_dir.joinpath("pheval_gene_results/Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet")
+            )["rank"].to_list(),
+            [0],
+        )
+
+    def test_generate_gene_result(self):
+        with defer_empty_pheval_results():
+            self._generate_gene_result()
+        self.assertEqual(
+            [file.name for file in self.output_dir.joinpath("pheval_gene_results").iterdir()],
+            ["Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet"],
+        )
+        self.assertTrue(
+            pl.read_parquet(
+                self.output_dir.joinpath("pheval_gene_results/Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet")
+            ).equals(
+                pl.DataFrame(
+                    {
+                        "rank": [1, 2],
+                        "score": [0.9, 0.5],
+                        "gene_symbol": ["PAGE1", "GCDH"],
+                        "gene_identifier": ["ENSG00000068985", "ENSG00000105607"],
+                        "true_positive": [False, True],
+                    }
+                ),
+            )
+        )
+        finalise_pheval_results()
+        self.assertTrue(
+            pl.read_parquet(
+                self.output_dir.joinpath("pheval_gene_results/Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet")
+            ).equals(
+                pl.DataFrame(
+                    {
+                        "rank": [0],
+                        "score": [0.0],
+                        "gene_symbol": ["BBS1"],
+                        "gene_identifier": ["ENSG00000174483"],
+                        "true_positive": [True],
+                    }
+                ),
+            )
+        )
+
+    def test_complete_pheval_results(self):
+        other_output_dir = self.temp_dir.joinpath("other_output")
+        other_output_dir.joinpath("pheval_gene_results").mkdir(parents=True)
+        with defer_empty_pheval_results():
+            with track_pheval_results() as result_outputs:
+                self._generate_gene_result()
+            generate_gene_result(
+                results=pl.DataFrame({"gene_symbol": ["GCDH"], "gene_identifier": ["ENSG00000105607"], "score": [0.5]}),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=other_output_dir,
+                result_path=Path("Abdul_Wahab-2016-GCDH-Patient_5.tsv"),
+                phenopacket_dir=self.phenopacket_dir,
+            )
+        self.assertEqual(
+            result_outputs,
+            {
+                (
+                    self.phenopacket_dir,
+                    self.output_dir.joinpath("pheval_gene_results"),
+                    ResultType.GENE,
+                    OutputMode.PER_CASE,
+                )
+            },
+        )
+        complete_pheval_results(result_outputs)
+        self.assertEqual(len(list(self.output_dir.joinpath("pheval_gene_results").iterdir())), 2)
+        self.assertEqual(len(list(other_output_dir.joinpath("pheval_gene_results").iterdir())), 1)
+
+    def test_reset_post_processing_state(self):
+        gene_output_dir = self.output_dir.joinpath("pheval_gene_results")
+        self._generate_gene_result()
+        shutil.rmtree(gene_output_dir)
+        gene_output_dir.mkdir()
+        self._generate_gene_result()
+        self.assertEqual(len(list(gene_output_dir.iterdir())), 1)
+        reset_post_processing_state()
+        self.assertEqual(registered_results, set())
+        self._generate_gene_result()
+        self.assertEqual(len(list(gene_output_dir.iterdir())), 2)
+
+
+class TestGenerateResultsBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        self.phenopacket_dir.mkdir()
+        for phenopacket in ["Abdul_Wahab-2016-GCDH-Patient_5.json", "Ajmal-2013-BBS1-IV-5_family_A.json"]:
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), self.phenopacket_dir)
+        self.case_results = {
+            "Abdul_Wahab-2016-GCDH-Patient_5": {
+                "gene": pl.DataFrame(
+                    {
+                        "gene_symbol": ["PAGE1", "GCDH", "BBS1"],
+                        "gene_identifier": ["ENSG00000068985", "ENSG00000105607", "ENSG00000174483"],
+                        "score": [0.9, 0.5, 0.5],
+                    }
+                ),
+                "variant": pl.DataFrame(
+                    {
+                        "chrom": ["19", "1"],
+                        "start": [13007113, 12345],
+                        "end": [13007113, 12345],
+                        "ref": ["G", "A"],
+                        "alt": ["A", "T"],
+                        "score": [0.2, 0.7],
+                    }
+                ),
+                "disease": pl.DataFrame({"disease_identifier": ["OMIM:231670", "OMIM:209900"], "score": [0.1, 0.3]}),
+            },
+            "Ajmal-2013-BBS1-IV-5_family_A": {
+                "gene": pl.DataFrame(
+                    {"gene_symbol": ["BBS1"], "gene_identifier": ["ENSG00000174483"], "score": [0.8]},
+                ),
+                "variant": pl.DataFrame(
+                    {"chrom": ["3"], "start": [100], "end": [100], "ref": ["C"], "alt": ["G"], "score": [0.4]}
+                ),
+                "disease": pl.DataFrame({"disease_identifier": ["OMIM:209900"], "score": [0.6]}),
+            },
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        registered_results.clear()
+
+    def test_generate_results_batch_matches_single_results(self):
+        for result_type, generate_result, generate_results_batch in [
+            ("gene", generate_gene_result, generate_gene_results_batch),
+            ("variant", generate_variant_result, generate_variant_results_batch),
+            ("disease", generate_disease_result, generate_disease_results_batch),
+        ]:
+            single_output_dir = self.temp_dir.joinpath("single")
+            batch_output_dir = self.temp_dir.joinpath("batch")
+            for output_dir in [single_output_dir, batch_output_dir]:
+                output_dir.joinpath(f"pheval_{result_type}_results").mkdir(parents=True, exist_ok=True)
+            for case_id, results in self.case_results.items():
+                generate_result(
+                    results=results[result_type],
+                    sort_order=SortOrder.DESCENDING,
+                    output_dir=single_output_dir,
+                    result_path=Path(f"{case_id}.tsv"),
+                    phenopacket_dir=self.phenopacket_dir,
+                )
+            generate_results_batch(
+                results=pl.concat(
+                    [
+                        results[result_type].with_columns(pl.lit(case_id).alias("case_id"))
+                        for case_id, results in self.case_results.items()
+                    ]
+                ),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=batch_output_dir,
+                phenopacket_dir=self.phenopacket_dir,
+            )
+            for case_id in self.case_results:
+                result_file = f"pheval_{result_type}_results/{case_id}-{result_type}_result.parquet"
+                self.assertTrue(
+                    pl.read_parquet(batch_output_dir.joinpath(result_file)).equals(
+                        pl.read_parquet(single_output_dir.joinpath(result_file))
+                    )
+                )
+
+    def test_generate_results_batch_dataset_output_mode(self):
+        shutil.copy(
+            phenopacket_corpus_dir.joinpath("Al-Dosari-2010-TFAP2A-10-year-old_girl.json"), self.phenopacket_dir
+        )
+        for output_mode in OutputMode:
+            self.temp_dir.joinpath(output_mode.value, "pheval_gene_results").mkdir(parents=True)
+            generate_gene_results_batch(
+                results=pl.concat(
+                    [
+                        results["gene"].with_columns(pl.lit(case_id).alias("case_id"))
+                        for case_id, results in self.case_results.items()
+                    ]
+                ),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=self.temp_dir.joinpath(output_mode.value),
+                phenopacket_dir=self.phenopacket_dir,
+                output_mode=output_mode,
+            )
+        finalise_pheval_results()
+        per_case_dir = self.temp_dir.joinpath("per_case", "pheval_gene_results")
+        dataset_dir = self.temp_dir.joinpath("dataset", "pheval_gene_results")
+        self.assertTrue(all(file.name.startswith(DATASET_PART_PREFIX) for file in dataset_dir.iterdir()))
+        self.assertEqual(len(list(dataset_dir.iterdir())), 2)
+        self.assertEqual(
+            get_result_cases(dataset_dir, ResultType.GENE),
+            {
+                "Abdul_Wahab-2016-GCDH-Patient_5",
+                "Ajmal-2013-BBS1-IV-5_family_A",
+                "Al-Dosari-2010-TFAP2A-10-year-old_girl",
+            },
+        )
+        dataset = pl.read_parquet(dataset_dir)
+        for case_id in get_result_cases(per_case_dir, ResultType.GENE):
+            self.assertTrue(
+                dataset.filter(pl.col("case_id") == case_id)
+                .drop("case_id")
+                .equals(pl.read_parquet(per_case_dir.joinpath(f"{case_id}-gene_result.parquet")))
+            )
+
+    def test_generate_results_batch_dataset_output_mode_rerun(self):
+        dataset_dir = self.temp_dir.joinpath("pheval_gene_results")
+        dataset_dir.mkdir()
+        run_results = []
+        for _ in range(2):
+            generate_gene_results_batch(
+                results=pl.concat(
+                    [
+                        results["gene"].with_columns(pl.lit(case_id).alias("case_id"))
+                        for case_id, results in self.case_results.items()
+                    ]
+                ),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=self.temp_dir,
+                phenopacket_dir=self.phenopacket_dir,
+                output_mode=OutputMode.DATASET,
+            )
+            finalise_pheval_results()
+            run_results.append(
+                scan_dataset_parts(list(dataset_dir.iterdir())).drop("dataset_part").collect().sort(["case_id", "rank"])
+            )
+        self.assertEqual(len(list(dataset_dir.iterdir())), 2)
+        self.assertTrue(run_results[1].equals(run_results[0]))
+
+    def test_generate_results_batch_top_k(self):
+        gene_output_dir = self.temp_dir.joinpath("pheval_gene_results")
+        gene_output_dir.mkdir()
+        generate_gene_results_batch(
+            results=pl.concat(
+                [
+                    results["gene"].with_columns(pl.lit(case_id).alias("case_id"))
+                    for case_id, results in self.case_results.items()
+                ]
+            ),
+            sort_order=SortOrder.DESCENDING,
+            output_dir=self.temp_dir,
+            phenopacket_dir=self.phenopacket_dir,
+            top_k=1,
+        )
+        result_file = gene_output_dir.joinpath("Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet")
+        self.assertEqual(pl.read_parquet(result_file)["gene_symbol"].to_list(), ["PAGE1", "GCDH"])
+        self.assertEqual(pq.read_schema(result_file).metadata[TOP_K_METADATA_KEY], b"1")
+
+    def test_generate_results_batch_invalid_top_k(self):
+        with self.assertRaises(ValueError):
+            generate_gene_results_batch(
+                results=self.case_results["Ajmal-2013-BBS1-IV-5_family_A"]["gene"].with_columns(
+                    pl.lit("Ajmal-2013-BBS1-IV-5_family_A").alias("case_id")
+                ),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=self.temp_dir,
+                phenopacket_dir=self.phenopacket_dir,
+                top_k=0,
+            )
+
+    def test_generate_results_batch_missing_case_id(self):
+        with self.assertRaises(ValueError):
+            generate_gene_results_batch(
+                results=self.case_results["Ajmal-2013-BBS1-IV-5_family_A"]["gene"],
+                sort_order=SortOrder.DESCENDING,
+                output_dir=self.temp_dir,
+                phenopacket_dir=self.phenopacket_dir,
+            )
+
+
+class TestGenerateVariantResultStreaming(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        self.phenopacket_dir.mkdir()
+        shutil.copy(phenopacket_corpus_dir.joinpath("Abdul_Wahab-2016-GCDH-Patient_5.json"), self.phenopacket_dir)
+        for output_dir in ["in_memory", "streaming"]:
+            self.temp_dir.joinpath(output_dir, "pheval_variant_results").mkdir(parents=True)
+        self.result_path = Path("Abdul_Wahab-2016-GCDH-Patient_5.tsv")
+        self.variant_results = pl.DataFrame(
+            {
+                "chrom": ["1", "chr19", "2", "3", "4"],
+                "start": [12345, 13007113, 500, 600, 700],
+                "end": [12345, 13007113, 500, 600, 700],
+                "ref": ["A", "G", "C", "C", "T"],
+                "alt": ["T", "A", "G", "G", "A"],
+                "score": [0.7, 0.2, 0.7, 0.1, 0.2],
+                "grouping_id": ["a", "b", "a", "c", "d"],
+            }
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        registered_results.clear()
+
+    def result_file(self, output_dir: str) -> Path:
+        return self.temp_dir.joinpath(
+            output_dir, "pheval_variant_results/Abdul_Wahab-2016-GCDH-Patient_5-variant_result.parquet"
+        )
+
+    def read_result(self, output_dir: str) -> pl.DataFrame:
+        result = pl.read_parquet(self.result_file(output_dir))
+        return result.sort(result.columns)
+
+    def test_generate_variant_result_streaming_matches_in_memory_result(self):
+        null_score_results = self.variant_results.with_columns(
+            pl.when(pl.col("start").is_in([600, 700])).then(None).otherwise(pl.col("score")).alias("score")
+        )
+        for variant_results, sort_order in itertools.product(
+            [
+                self.variant_results,
+                self.variant_results.drop("grouping_id"),
+                null_score_results,
+                null_score_results.drop("grouping_id"),
+            ],
+            SortOrder,
+        ):
+            variant_results.write_csv(self.temp_dir.joinpath("results.tsv"), separator="\t")
+            variant_results.write_parquet(self.temp_dir.joinpath("results.parquet"))
+            generate_variant_result(
+                results=variant_results,
+                sort_order=sort_order,
+                output_dir=self.temp_dir.joinpath("in_memory"),
+                result_path=self.result_path,
+                phenopacket_dir=self.phenopacket_dir,
+            )
+            for streamed_results in [
+                variant_results.lazy(),
+                self.temp_dir.joinpath("results.tsv"),
+                self.temp_dir.joinpath("results.parquet"),
+            ]:
+                generate_variant_result_streaming(
+                    results=streamed_results,
+                    sort_order=sort_order,
+                    output_dir=self.temp_dir.joinpath("streaming"),
+                    result_path=self.result_path,
+                    phenopacket_dir=self.phenopacket_dir,
+                )
+                self.assertTrue(
+                    self.read_result("streaming").equals(self.read_result("in_memory")),
+                    msg=f"{sort_order}\n{variant_results}",
+                )
+
+    def test_generate_variant_result_streaming_top_k(self):
+        generate_variant_result_streaming(
+            results=self.variant_results.lazy(),
+            sort_order=SortOrder.DESCENDING,
+            output_dir=self.temp_dir.joinpath("streaming"),
+            result_path=self.result_path,
+            phenopacket_dir=self.phenopacket_dir,
+            top_k=1,
+        )
+        self.assertEqual(self.read_result("streaming")["start"].to_list(), [12345, 500, 13007113])
+        self.assertEqual(pq.read_schema(self.result_file("streaming")).metadata[TOP_K_METADATA_KEY], b"1")
+
+    def test_generate_variant_result_streaming_null_grouping_id(self):
+        with self.assertRaises(ValueError):
+            generate_variant_result_streaming(
+                results=self.variant_results.with_columns(pl.lit(None, dtype=pl.String).alias("grouping_id")).lazy(),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=self.temp_dir.joinpath("streaming"),
+                result_path=self.result_path,
+                phenopacket_dir=self.phenopacket_dir,
+            )
+
+
+class TestCreateEmptyPhevalResult(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dirs = []
+        for corpus, phenopacket in [
+            ("corpus_a", "Abdul_Wahab-2016-GCDH-Patient_5.json"),
+            ("corpus_b", "Ajmal-2013-BBS1-IV-5_family_A.json"),
+        ]:
+            phenopacket_dir = self.temp_dir.joinpath(corpus, "phenopackets")
+            phenopacket_dir.mkdir(parents=True)
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), phenopacket_dir)
+            self.phenopacket_dirs.append(phenopacket_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_create_empty_pheval_result_multiple_corpora(self):
+        for phenopacket_dir in self.phenopacket_dirs:
+            output_dir = phenopacket_dir.parent.joinpath("pheval_gene_results")
+            output_dir.mkdir()
+            create_empty_pheval_result(phenopacket_dir, output_dir, ResultType.GENE)
+        self.assertEqual(
+            sorted(file.name for file in self.temp_dir.rglob("*-gene_result.parquet")),
+            [
+                "Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet",
+                "Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet",
+            ],
+        )
+
+    def test_create_empty_pheval_result_only_writes_missing_results(self):
+        phenopacket_dir = self.phenopacket_dirs[0]
+        output_dir = phenopacket_dir.parent.joinpath("pheval_gene_results")
+        output_dir.mkdir()
+        shutil.copy(phenopacket_corpus_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A.json"), phenopacket_dir)
+        existing_result = output_dir.joinpath("Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet")
+        existing_result.write_bytes(b"")
+        create_empty_pheval_result(phenopacket_dir, output_dir, ResultType.GENE)
+        self.assertEqual(existing_result.read_bytes(), b"")
+        self.assertTrue(output_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet").exists())
+
+    def test_create_empty_pheval_result_case_ids(self):
+        phenopacket_dir = self.phenopacket_dirs[0]
+        output_dir = phenopacket_dir.parent.joinpath("pheval_gene_results")
+        output_dir.mkdir()
+        shutil.copy(phenopacket_corpus_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A.json"), phenopacket_dir)
+        create_empty_pheval_result(
+            phenopacket_dir, output_dir, ResultType.GENE, case_ids={"Ajmal-2013-BBS1-IV-5_family_A"}
+        )
+        self.assertEqual(
+            [file.name for file in output_dir.iterdir()], ["Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet"]
+        )
+
+    def test_create_empty_pheval_result_concurrent(self):
+        phenopacket_dir = self.phenopacket_dirs[0]
+        output_dir = phenopacket_dir.parent.joinpath("pheval_gene_results")
+        output_dir.mkdir()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(
+                executor.map(
+                    lambda _: create_empty_pheval_result(phenopacket_dir, output_dir, ResultType.GENE), range(8)
+                )
+            )
+        self.assertEqual(
+            [file.name for file in output_dir.iterdir()], ["Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet"]
+        )
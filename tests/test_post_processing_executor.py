@@ -0,0 +1,165 @@
+import shutil
+import tempfile
+import unittest
+from functools import partial
+from pathlib import Path
+
+import polars as pl
+
+from pheval.post_processing.post_processing import (
+    DATASET_PART_PREFIX,
+    OutputMode,
+    ResultType,
+    SortOrder,
+    defer_empty_pheval_results,
+    finalise_pheval_results,
+    generate_gene_result,
+    get_result_cases,
+    registered_results,
+)
+from pheval.post_processing.post_processing_executor import post_process_result_files
+
+phenopacket_corpus_dir = Path(__file__).parent.parent.joinpath("corpora/lirical/default/phenopackets")
+
+
+def post_process_gene_result(
+    result_path: Path, output_dir: Path, phenopacket_dir: Path, output_mode: OutputMode = OutputMode.PER_CASE
+) -> None:
+    generate_gene_result(
+        results=pl.read_csv(result_path, separator="\t"),
+        sort_order=SortOrder.DESCENDING,
+        output_dir=output_dir,
+        result_path=result_path,
+        phenopacket_dir=phenopacket_dir,
+        output_mode=output_mode,
+    )
+
+
+class TestPostProcessResultFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        self.phenopacket_dir.mkdir()
+        for phenopacket in [
+            "Abdul_Wahab-2016-GCDH-Patient_5.json",
+            "Ajmal-2013-BBS1-IV-5_family_A.json",
+            "Al-Dosari-2010-TFAP2A-10-year-old_girl.json",
+        ]:
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), self.phenopacket_dir)
+        self.raw_results_dir = self.temp_dir.joinpath("raw_results")
+        self.raw_results_dir.mkdir()
+        pl.DataFrame(
+            {
+                "gene_symbol": ["GCDH", "PAGE1"],
+                "gene_identifier": ["ENSG00000105607", "ENSG00000068985"],
+                "score": [0.5, 0.9],
+            }
+        ).write_csv(self.raw_results_dir.joinpath("Abdul_Wahab-2016-GCDH-Patient_5.tsv"), separator="\t")
+        pl.DataFrame({"gene_symbol": ["BBS1"], "gene_identifier": ["ENSG00000174483"], "score": [0.8]}).write_csv(
+            self.raw_results_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A.tsv"), separator="\t"
+        )
+        pl.DataFrame({"gene_symbol": ["TFAP2A"], "score": [0.8]}).write_csv(
+            self.raw_results_dir.joinpath("Al-Dosari-2010-TFAP2A-10-year-old_girl.tsv"), separator="\t"
+        )
+        self.output_dir = self.temp_dir.joinpath("output")
+        self.output_dir.joinpath("pheval_gene_results").mkdir(parents=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        registered_results.clear()
+
+    def _post_process_result_files(self, num_workers: int):
+        errors = post_process_result_files(
+            sorted(self.raw_results_dir.iterdir()),
+            partial(post_process_gene_result, output_dir=self.output_dir, phenopacket_dir=self.phenopacket_dir),
+            self.phenopacket_dir,
+            num_workers=num_workers,
+        )
+        self.assertEqual([error.result_path.name for error in errors], ["Al-Dosari-2010-TFAP2A-10-year-old_girl.tsv"])
+
+    def _post_process(self, num_workers: int):
+        with defer_empty_pheval_results():
+            self._post_process_result_files(num_workers)
+        self.assertEqual(
+            sorted(file.name for file in self.output_dir.joinpath("pheval_gene_results").iterdir()),
+            [
+                "Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet",
+                "Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet",
+            ],
+        )
+        self.assertEqual(
+            pl.read_parquet(
+                self.output_dir.joinpath("pheval_gene_results/Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet")
+            )["true_positive"].to_list(),
+            [False, True],
+        )
+        self.assertEqual(len(registered_results), 1)
+        finalise_pheval_results()
+        self.assertTrue(
+            self.output_dir.joinpath(
+                "pheval_gene_results/Al-Dosari-2010-TFAP2A-10-year-old_girl-gene_result.parquet"
+            ).exists()
+        )
+
+    def test_post_process_result_files_serial(self):
+        self._post_process(num_workers=1)
+
+    def test_post_process_result_files_parallel(self):
+        self._post_process(num_workers=2)
+
+    def _post_process_writes_empty_results(self, num_workers: int):
+        self._post_process_result_files(num_workers)
+        self.assertEqual(
+            pl.read_parquet(
+                self.output_dir.joinpath(
+                    "pheval_gene_results/Al-Dosari-2010-TFAP2A-10-year-old_girl-gene_result.parquet"
+                )
+            )["rank"].to_list(),
+            [0],
+        )
+        self.assertEqual(
+            pl.read_parquet(
+                self.output_dir.joinpath("pheval_gene_results/Ajmal-2013-BBS1-IV-5_family_A-gene_result.parquet")
+            )["rank"].to_list(),
+            [1],
+        )
+
+    def test_post_process_result_files_serial_writes_empty_results(self):
+        self._post_process_writes_empty_results(num_workers=1)
+
+    def test_post_process_result_files_parallel_writes_empty_results(self):
+        self._post_process_writes_empty_results(num_workers=2)
+
+    def test_post_process_result_files_parallel_dataset_output_mode(self):
+        post_process_result_files(
+            sorted(self.raw_results_dir.iterdir()),
+            partial(
+                post_process_gene_result,
+                output_dir=self.output_dir,
+                phenopacket_dir=self.phenopacket_dir,
+                output_mode=OutputMode.DATASET,
+            ),
+            self.phenopacket_dir,
+            num_workers=2,
+        )
+        gene_output_dir = self.output_dir.joinpath("pheval_gene_results")
+        self.assertEqual(
+            get_result_cases(gene_output_dir, ResultType.GENE),
+            {"Abdul_Wahab-2016-GCDH-Patient_5", "Ajmal-2013-BBS1-IV-5_family_A"},
+        )
+        finalise_pheval_results()
+        self.assertTrue(all(file.name.startswith(DATASET_PART_PREFIX) for file in gene_output_dir.iterdir()))
+        self.assertEqual(len(get_result_cases(gene_output_dir, ResultType.GENE)), 3)
+
+    def test_post_process_result_files_parallel_completes_written_output_directories(self):
+        other_output_dir = self.temp_dir.joinpath("other_output")
+        other_output_dir.joinpath("pheval_gene_results").mkdir(parents=True)
+        with defer_empty_pheval_results():
+            post_process_gene_result(
+                self.raw_results_dir.joinpath("Ajmal-2013-BBS1-IV-5_family_A.tsv"),
+                other_output_dir,
+                self.phenopacket_dir,
+            )
+        self._post_process_result_files(num_workers=2)
+        self.assertEqual(len(list(self.output_dir.joinpath("pheval_gene_results").iterdir())), 3)
+        self.assertEqual(len(list(other_output_dir.joinpath("pheval_gene_results").iterdir())), 1)
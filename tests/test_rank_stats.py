@@ -2,8 +2,27 @@ import unittest
 
 import numpy as np
 import polars as pl
+from sklearn.metrics import ndcg_score
 
-from pheval.analyse.rank_stats import Ranks
+from pheval.analyse.rank_stats import Ranks, _group_ranks_by_case, compute_rank_histogram, compute_rank_stats
+
+
+def reference_average_precision_at_k(ranks: list[int], k: int) -> float:
+    """Reference AP@K of a query, from the sorted ranks of its found true positives."""
+    relevant_ranks = np.array([rank for rank in ranks if rank <= k])
+    if not len(relevant_ranks):
+        return 0.0
+    return np.mean(np.arange(1, len(relevant_ranks) + 1) / relevant_ranks)
+
+
+def reference_ndcg_at_k(ranks: list[int], k: int) -> float:
+    """Reference NDCG@K of a query, scoring the ideal ranking against the true positive positions with sklearn."""
+    result_ranks = np.zeros(k, dtype=int)
+    indices = np.array(ranks, dtype=int) - 1
+    result_ranks[indices[(indices >= 0) & (indices < k)]] = 3
+    if np.sum(result_ranks) == 0:
+        return 0.0
+    return ndcg_score(result_ranks.reshape(1, -1), np.sort(result_ranks)[::-1].reshape(1, -1))
 
 
 class TestRanks(unittest.TestCase):
@@ -40,24 +59,6 @@ class TestRanks(unittest.TestCase):
             ]
         )
 
-    def test_top_k_counts(self):
-        result = self.test_df.select(
-            [
-                Ranks.TOP_1,
-                Ranks.TOP_3,
-                Ranks.TOP_5,
-                Ranks.TOP_10,
-                Ranks.FOUND,
-                Ranks.TOTAL,
-                Ranks.NUMBER_OF_SAMPLES,
-            ]
-        ).collect()
-        self.assertTrue(result.equals(self.result))
-
-    def test_mrr(self):
-        """Test Mean Reciprocal Rank (MRR) calculation."""
-        self.assertAlmostEqual(self.test_df.select(Ranks.MRR).collect().item(), 0.366667, places=6)
-
     def test_percentage_at_k(self):
         """Test percentage calculations at K."""
         result = self.result.select(
@@ -134,69 +135,145 @@ class TestRanks(unittest.TestCase):
             )
         )
 
-    def test__average_precision_at_k(self):
-        self.assertTrue(
-            Ranks._average_precision_at_k(self.test_df, 1)
-            .collect()
-            .sort("file_path")
-            .equals(pl.DataFrame([{"file_path": "file1", "ap@1": 1.0}, {"file_path": "file3", "ap@1": 1.0}]))
-        )
-        self.assertTrue(
-            Ranks._average_precision_at_k(self.test_df, 3)
-            .collect()
-            .sort("file_path")
-            .equals(
-                pl.DataFrame(
-                    [
-                        {"file_path": "file1", "ap@3": 0.8333333333333333},
-                        {"file_path": "file3", "ap@3": 1.0},
-                    ]
-                )
+    def test_average_precision_at_k(self):
+        case_ranks = _group_ranks_by_case(self.test_df).sort("file_path")
+        for k, expected in [
+            (1, [1.0, 0.0, 1.0, 0.0, 0.0, 0.0]),
+            (3, [0.8333333333333333, 0.0, 1.0, 0.0, 0.0, 0.0]),
+            (5, [0.8333333333333333, 0.25, 1.0, 0.0, 0.0, 0.0]),
+            (10, [0.8333333333333333, 0.25, 0.6666666666666666, 0.1, 0.0, 0.0]),
+        ]:
+            self.assertEqual(
+                case_ranks.select(Ranks.average_precision_at_k(k)).collect().to_series().to_list(), expected, k
             )
-        )
-        self.assertTrue(
-            Ranks._average_precision_at_k(self.test_df, 5)
-            .collect()
-            .sort("file_path")
-            .equals(
-                pl.DataFrame(
-                    [
-                        {"file_path": "file1", "ap@5": 0.8333333333333333},
-                        {"file_path": "file2", "ap@5": 0.25},
-                        {"file_path": "file3", "ap@5": 1.0},
-                    ]
-                )
+
+    def test_mean_average_precision_at_k(self):
+        case_ranks = _group_ranks_by_case(self.test_df)
+        for k, expected in [(1, 0.333), (3, 0.306), (5, 0.347), (10, 0.308)]:
+            self.assertAlmostEqual(
+                case_ranks.select(Ranks.average_precision_at_k(k).mean()).collect().item(), expected, places=3
             )
+
+    def test_reference_implementations(self):
+        self.assertEqual(reference_average_precision_at_k([1], 1), 1)
+        self.assertEqual(reference_average_precision_at_k([1, 5], 5), 0.7)
+        self.assertEqual(reference_ndcg_at_k([1], 3), 1)
+        self.assertAlmostEqual(reference_ndcg_at_k([1, 2, 4], 5), 0.858, places=3)
+
+    def test_average_precision_at_k_matches_reference(self):
+        rng = np.random.default_rng(0)
+        ranks = [sorted(rng.integers(1, 30, rng.integers(0, 6)).tolist()) for _ in range(200)]
+        df = pl.DataFrame({"ranks": ranks}, schema={"ranks": pl.List(pl.Int64)})
+        for k in [1, 3, 10, 20]:
+            for case_ranks, ap in zip(ranks, df.select(Ranks.average_precision_at_k(k)).to_series(), strict=True):
+                self.assertAlmostEqual(ap, reference_average_precision_at_k(case_ranks, k), 12)
+
+    def test_normalised_discounted_cumulative_gain_at_k_matches_reference(self):
+        rng = np.random.default_rng(0)
+        ranks = [sorted(rng.integers(1, 30, rng.integers(0, 6)).tolist()) for _ in range(200)]
+        df = pl.DataFrame({"ranks": ranks}, schema={"ranks": pl.List(pl.Int64)})
+        for k in [2, 3, 10, 20, 50]:
+            ndcg = df.select(Ranks.normalised_discounted_cumulative_gain_at_k(k)).to_series()
+            for case_ranks, case_ndcg in zip(ranks, ndcg, strict=True):
+                self.assertAlmostEqual(case_ndcg, reference_ndcg_at_k(case_ranks, k), 12)
+
+    def test_normalised_discounted_cumulative_gain_at_1(self):
+        df = pl.DataFrame({"ranks": [[1], [2], []]}, schema={"ranks": pl.List(pl.Int64)})
+        self.assertEqual(
+            df.select(Ranks.normalised_discounted_cumulative_gain_at_k(1)).to_series().to_list(), [1, 0, 0]
         )
-        self.assertTrue(
-            Ranks._average_precision_at_k(self.test_df, 10)
+
+    def test_mean_normalised_discounted_cumulative_gain(self):
+        self.assertAlmostEqual(
+            _group_ranks_by_case(self.test_df)
+            .select(Ranks.normalised_discounted_cumulative_gain_at_k(3).mean())
             .collect()
-            .sort("file_path")
-            .equals(
-                pl.DataFrame(
-                    [
-                        {"file_path": "file1", "ap@10": 0.8333333333333333},
-                        {"file_path": "file2", "ap@10": 0.25},
-                        {"file_path": "file3", "ap@10": 0.6666666666666666},
-                        {"file_path": "file4", "ap@10": 0.1},
-                    ]
-                )
-            )
+            .item(),
+            0.301,
+            places=3,
         )
 
-    def test__compute_ap_k(self):
-        self.assertEqual(Ranks._compute_ap_k(np.array([1])), 1)
-        self.assertEqual(Ranks._compute_ap_k(np.array([1, 5])), 0.7)
 
-    def test_mean_average_precision_at_k(self):
-        self.assertAlmostEqual(Ranks.mean_average_precision_at_k(self.test_df, 1), 0.333, places=3)
-        self.assertAlmostEqual(Ranks.mean_average_precision_at_k(self.test_df, 3), 0.306, places=3)
-        self.assertAlmostEqual(Ranks.mean_average_precision_at_k(self.test_df, 5), 0.347, places=3)
-        self.assertAlmostEqual(Ranks.mean_average_precision_at_k(self.test_df, 10), 0.308, places=3)
+class TestComputeRankStats(unittest.TestCase):
+    def setUp(self):
+        self.result_scan = pl.LazyFrame(
+            {
+                "file_path": ["file1", "file1", "file2", "file3", "file3", "file4", "file5", "file6", "file6"],
+                "rank": [1, 3, 4, 1, 6, 10, 12, 0, 2],
+                "true_positive": [True, True, True, True, True, True, True, True, False],
+            }
+        )
 
-    def test__calculate_ndcg_at_k(self):
-        self.assertEqual(Ranks._calculate_ndcg_at_k([1], 3), 1)
-        self.assertAlmostEqual(Ranks._calculate_ndcg_at_k([1, 2, 4], 5), 0.858, places=3)
+    def test_compute_rank_stats(self):
+        result_scan = self.result_scan
+        stats = compute_rank_stats("run", result_scan).collect().row(0, named=True)
+        self.assertEqual(
+            {key: stats[key] for key in ["run_identifier", "top1", "top3", "top5", "top10", "found", "total"]},
+            {"run_identifier": "run", "top1": 2, "top3": 3, "top5": 4, "top10": 6, "found": 7, "total": 8},
+        )
+        self.assertEqual(stats["number_of_samples"], 6)
+        self.assertAlmostEqual(stats["mrr"], 0.366667, places=6)
+        for metric, expected in [
+            ("MAP@1", 0.333),
+            ("MAP@3", 0.306),
+            ("MAP@5", 0.347),
+            ("MAP@10", 0.308),
+            ("NDCG@3", 0.301),
+            ("NDCG@5", 0.376),
+            ("NDCG@10", 0.372),
+        ]:
+            self.assertAlmostEqual(stats[metric], expected, places=3, msg=metric)
 
-    def test_mean_normalised_discounted_cumulative_gain(self):
-        self.assertAlmostEqual(Ranks.mean_normalised_discounted_cumulative_gain(self.test_df, 3), 0.301, places=3)
+    def test_compute_rank_stats_single_scan(self):
+        plan = compute_rank_stats(
+            "run", pl.LazyFrame({"file_path": ["file1"], "rank": [1], "true_positive": [True]})
+        ).explain()
+        self.assertEqual(plan.count("DF ["), 1)
+
+    def test_compute_rank_stats_k_values(self):
+        stats = compute_rank_stats("run", self.result_scan, k_values=[20, 3, 1]).collect()
+        self.assertEqual(
+            stats.columns,
+            [
+                "run_identifier",
+                "top1",
+                "top3",
+                "top20",
+                "found",
+                "total",
+                "number_of_samples",
+                "mrr",
+                "percentage@1",
+                "percentage@3",
+                "percentage@20",
+                "percentage_found",
+                "precision@1",
+                "precision@3",
+                "precision@20",
+                "f_beta@1",
+                "f_beta@3",
+                "f_beta@20",
+                "MAP@1",
+                "MAP@3",
+                "MAP@20",
+                "NDCG@3",
+                "NDCG@20",
+            ],
+        )
+        self.assertEqual(stats.row(0, named=True)["top20"], 7)
+        self.assertEqual(stats.row(0, named=True)["percentage@20"], 87.5)
+
+    def test_compute_rank_histogram(self):
+        histogram = compute_rank_histogram(self.result_scan.filter(pl.col("true_positive")))
+        self.assertTrue(
+            histogram.collect().equals(
+                pl.DataFrame(
+                    {
+                        "rank": [1, 3, 4, 6, 10, 12],
+                        "count": [2, 1, 1, 1, 1, 1],
+                        "cumulative_count": [2, 3, 4, 5, 6, 7],
+                    },
+                    schema_overrides={"count": pl.UInt32, "cumulative_count": pl.UInt32},
+                )
+            )
+        )
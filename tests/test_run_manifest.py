@@ -0,0 +1,75 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from pheval.runners.manifest import CaseRecord, CaseStatus, RunManifest, hash_case_inputs
+
+
+class TestHashCaseInputs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket = self.temp_dir.joinpath("case_1.json")
+        self.phenopacket.write_text('{"id": "case_1"}')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_hash_case_inputs(self):
+        self.assertEqual(hash_case_inputs(self.phenopacket, b"config"), hash_case_inputs(self.phenopacket, b"config"))
+        self.assertNotEqual(
+            hash_case_inputs(self.phenopacket, b"config"), hash_case_inputs(self.phenopacket, b"changed config")
+        )
+
+    def test_hash_case_inputs_changed_phenopacket(self):
+        input_hash = hash_case_inputs(self.phenopacket, b"config")
+        self.phenopacket.write_text('{"id": "case_1", "subject": {}}')
+        self.assertNotEqual(input_hash, hash_case_inputs(self.phenopacket, b"config"))
+
+
+class TestRunManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manifest_path = self.temp_dir.joinpath("run_manifest.jsonl")
+        self.temp_dir.joinpath("raw_results").mkdir()
+        self.temp_dir.joinpath("raw_results/case_1.tsv").touch()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_update(self):
+        RunManifest(self.manifest_path).update(
+            [
+                CaseRecord("case_1", CaseStatus.FAILED, "hash_1"),
+                CaseRecord("case_2", CaseStatus.COMPLETE, "hash_2", ["raw_results/case_2.tsv"]),
+            ]
+        )
+        RunManifest(self.manifest_path).update([CaseRecord("case_1", CaseStatus.COMPLETE, "hash_1")])
+        self.assertEqual(
+            RunManifest(self.manifest_path).records,
+            {
+                "case_1": CaseRecord("case_1", CaseStatus.COMPLETE, "hash_1"),
+                "case_2": CaseRecord("case_2", CaseStatus.COMPLETE, "hash_2", ["raw_results/case_2.tsv"]),
+            },
+        )
+
+    def test_read_records_interrupted_write(self):
+        RunManifest(self.manifest_path).update([CaseRecord("case_1", CaseStatus.COMPLETE, "hash_1")])
+        with open(self.manifest_path, "a") as manifest_file:
+            manifest_file.write('{"case_id": "case_2", "sta')
+        self.assertEqual(list(RunManifest(self.manifest_path).records), ["case_1"])
+
+    def test_is_complete(self):
+        manifest = RunManifest(self.manifest_path)
+        manifest.update(
+            [
+                CaseRecord("case_1", CaseStatus.COMPLETE, "hash_1", ["raw_results/case_1.tsv"]),
+                CaseRecord("case_2", CaseStatus.COMPLETE, "hash_2", ["raw_results/case_2.tsv"]),
+                CaseRecord("case_3", CaseStatus.FAILED, "hash_3"),
+            ]
+        )
+        self.assertTrue(manifest.is_complete("case_1", "hash_1"))
+        self.assertFalse(manifest.is_complete("case_1", "changed_hash"))
+        self.assertFalse(manifest.is_complete("case_2", "hash_2"))
+        self.assertFalse(manifest.is_complete("case_3", "hash_3"))
+        self.assertFalse(manifest.is_complete("case_4", "hash_4"))
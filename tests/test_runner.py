@@ -1,7 +1,27 @@
+import shutil
+import sys
+import tempfile
 import unittest
 from pathlib import Path
 
+import polars as pl
+
+from pheval.post_processing.post_processing import (
+    OutputMode,
+    SortOrder,
+    defer_empty_pheval_results,
+    finalise_pheval_results,
+    generate_disease_result,
+    generate_gene_result,
+    generate_variant_result,
+)
+from pheval.runners.manifest import CaseStatus, RunManifest
 from pheval.runners.runner import DefaultPhEvalRunner
+from pheval.runners.scheduler import JobStatus, ToolJob
+from pheval.runners.shards import CaseShard
+from pheval.runners.worker_pool import SubprocessToolWorker, WorkerPool
+
+phenopacket_corpus_dir = Path(__file__).parent.parent.joinpath("corpora/lirical/default/phenopackets")
 
 
 class TestDefaultPhEvalRunner(unittest.TestCase):
@@ -57,3 +77,232 @@ class TestDefaultPhEvalRunner(unittest.TestCase):
             self.pheval_runner.pheval_disease_results_dir,
             Path("./defaultrunner-1.0.0/default-corpus1-default/pheval_disease_results"),
         )
+
+
+class TestPhEvalRunnerRunManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("corpus/phenopackets")
+        self.phenopacket_dir.mkdir(parents=True)
+        for phenopacket in ["Abdul_Wahab-2016-GCDH-Patient_5.json", "Ajmal-2013-BBS1-IV-5_family_A.json"]:
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), self.phenopacket_dir)
+        self.output_dir = self.temp_dir.joinpath("output")
+        self.output_dir.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_runner(self) -> DefaultPhEvalRunner:
+        runner = DefaultPhEvalRunner(
+            input_dir="./tests/input_dir/configs/default/",
+            testdata_dir=self.temp_dir.joinpath("corpus"),
+            output_dir=self.output_dir,
+            version="1.0.0",
+            config_file=None,
+            tmp_dir=None,
+        )
+        runner.build_output_directory_structure()
+        return runner
+
+    def write_results(self, runner: DefaultPhEvalRunner, case_id: str) -> None:
+        runner.raw_results_dir.joinpath(f"{case_id}.tsv").touch()
+        for results_dir, result_type in [
+            (runner.pheval_gene_results_dir, "gene"),
+            (runner.pheval_variant_results_dir, "variant"),
+            (runner.pheval_disease_results_dir, "disease"),
+        ]:
+            results_dir.joinpath(f"{case_id}-{result_type}_result.parquet").touch()
+
+    def test_pending_cases(self):
+        self.assertEqual(
+            [phenopacket.name for phenopacket in self.get_runner().pending_cases],
+            ["Abdul_Wahab-2016-GCDH-Patient_5.json", "Ajmal-2013-BBS1-IV-5_family_A.json"],
+        )
+
+    def test_update_run_manifest(self):
+        runner = self.get_runner()
+        runner.load_run_manifest()
+        self.write_results(runner, "Abdul_Wahab-2016-GCDH-Patient_5")
+        runner.update_run_manifest()
+        records = RunManifest(runner.run_manifest_file).records
+        self.assertEqual(records["Abdul_Wahab-2016-GCDH-Patient_5"].status, CaseStatus.COMPLETE)
+        self.assertEqual(
+            records["Abdul_Wahab-2016-GCDH-Patient_5"].output_files,
+            [
+                "pheval_disease_results/Abdul_Wahab-2016-GCDH-Patient_5-disease_result.parquet",
+                "pheval_gene_results/Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet",
+                "pheval_variant_results/Abdul_Wahab-2016-GCDH-Patient_5-variant_result.parquet",
+                "raw_results/Abdul_Wahab-2016-GCDH-Patient_5.tsv",
+            ],
+        )
+        self.assertEqual(records["Ajmal-2013-BBS1-IV-5_family_A"].status, CaseStatus.FAILED)
+
+    def test_load_run_manifest_resume(self):
+        runner = self.get_runner()
+        runner.load_run_manifest()
+        self.write_results(runner, "Abdul_Wahab-2016-GCDH-Patient_5")
+        runner.update_run_manifest()
+        resumed_runner = self.get_runner()
+        resumed_runner.load_run_manifest(resume=True)
+        self.assertEqual(
+            [phenopacket.stem for phenopacket in resumed_runner.pending_cases], ["Ajmal-2013-BBS1-IV-5_family_A"]
+        )
+        resumed_runner = self.get_runner()
+        resumed_runner.load_run_manifest(resume=False)
+        self.assertEqual(len(resumed_runner.pending_cases), 2)
+
+    def test_load_run_manifest_resets_post_processing_state(self):
+        runner = self.get_runner()
+        runner.load_run_manifest()
+        with defer_empty_pheval_results():
+            generate_gene_result(
+                results=pl.DataFrame({"gene_symbol": ["GCDH"], "gene_identifier": ["ENSG00000105607"], "score": [0.5]}),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=self.output_dir,
+                result_path=Path("Abdul_Wahab-2016-GCDH-Patient_5.tsv"),
+                phenopacket_dir=self.phenopacket_dir,
+            )
+        self.get_runner().load_run_manifest()
+        finalise_pheval_results()
+        self.assertEqual(
+            [file.name for file in runner.pheval_gene_results_dir.iterdir()],
+            ["Abdul_Wahab-2016-GCDH-Patient_5-gene_result.parquet"],
+        )
+
+    def test_load_run_manifest_resume_dataset_output_mode(self):
+        runner = self.get_runner()
+        runner.load_run_manifest()
+        case_id = "Abdul_Wahab-2016-GCDH-Patient_5"
+        result_path = runner.raw_results_dir.joinpath(f"{case_id}.tsv")
+        result_path.touch()
+        with defer_empty_pheval_results():
+            generate_gene_result(
+                pl.DataFrame({"gene_symbol": ["GCDH"], "gene_identifier": ["ENSG00000105607"], "score": [0.5]}),
+                SortOrder.DESCENDING,
+                self.output_dir,
+                result_path,
+                self.phenopacket_dir,
+                OutputMode.DATASET,
+            )
+            generate_variant_result(
+                pl.DataFrame(
+                    {
+                        "chrom": ["19"],
+                        "start": [13007113],
+                        "end": [13007113],
+                        "ref": ["G"],
+                        "alt": ["A"],
+                        "score": [0.5],
+                    }
+                ),
+                SortOrder.DESCENDING,
+                self.output_dir,
+                result_path,
+                self.phenopacket_dir,
+                OutputMode.DATASET,
+            )
+            generate_disease_result(
+                pl.DataFrame({"disease_identifier": ["OMIM:231670"], "score": [0.5]}),
+                SortOrder.DESCENDING,
+                self.output_dir,
+                result_path,
+                self.phenopacket_dir,
+                OutputMode.DATASET,
+            )
+            runner.update_run_manifest()
+        finalise_pheval_results()
+        records = RunManifest(runner.run_manifest_file).records
+        self.assertEqual(records[case_id].status, CaseStatus.COMPLETE)
+        self.assertEqual(records["Ajmal-2013-BBS1-IV-5_family_A"].status, CaseStatus.FAILED)
+        resumed_runner = self.get_runner()
+        resumed_runner.load_run_manifest(resume=True)
+        self.assertEqual(
+            [phenopacket.stem for phenopacket in resumed_runner.pending_cases], ["Ajmal-2013-BBS1-IV-5_family_A"]
+        )
+
+    def test_load_run_manifest_resume_changed_inputs(self):
+        runner = self.get_runner()
+        runner.load_run_manifest()
+        self.write_results(runner, "Abdul_Wahab-2016-GCDH-Patient_5")
+        runner.update_run_manifest()
+        with open(self.phenopacket_dir.joinpath("Abdul_Wahab-2016-GCDH-Patient_5.json"), "a") as phenopacket:
+            phenopacket.write("\n")
+        resumed_runner = self.get_runner()
+        resumed_runner.load_run_manifest(resume=True)
+        self.assertEqual(len(resumed_runner.pending_cases), 2)
+
+    def test_load_run_manifest_resume_interrupted_run(self):
+        runner = self.get_runner()
+        self.write_results(runner, "Abdul_Wahab-2016-GCDH-Patient_5")
+        runner.load_run_manifest(resume=True)
+        self.assertEqual([phenopacket.stem for phenopacket in runner.pending_cases], ["Ajmal-2013-BBS1-IV-5_family_A"])
+        self.assertEqual(
+            RunManifest(runner.run_manifest_file).records["Abdul_Wahab-2016-GCDH-Patient_5"].status,
+            CaseStatus.COMPLETE,
+        )
+
+    def test_load_run_manifest_shard(self):
+        runner = self.get_runner()
+        runner.load_run_manifest(shard=CaseShard(case_ids=frozenset(["Ajmal-2013-BBS1-IV-5_family_A"])))
+        self.assertEqual([phenopacket.stem for phenopacket in runner.run_cases], ["Ajmal-2013-BBS1-IV-5_family_A"])
+        self.assertEqual(runner.pending_cases, runner.run_cases)
+
+    def test_meta_data_phase_timings(self):
+        runner = self.get_runner()
+        self.assertIsNone(runner.meta_data.phase_timings)
+        with runner.run_timer.time("run"), runner.time_case("Abdul_Wahab-2016-GCDH-Patient_5"):
+            pass
+        self.assertEqual([phase_timing.phase for phase_timing in runner.meta_data.phase_timings], ["run"])
+        self.assertEqual(
+            runner.run_timer.to_dataframe()["case_id"].to_list(), ["Abdul_Wahab-2016-GCDH-Patient_5", None]
+        )
+
+    def test_run_tool_jobs(self):
+        runner = self.get_runner()
+        [job_result] = runner.run_tool_jobs([ToolJob(case_id="Abdul_Wahab-2016-GCDH-Patient_5", command="echo done")])
+        self.assertEqual(job_result.status, JobStatus.SUCCEEDED)
+        self.assertEqual(
+            runner.raw_results_dir.joinpath("Abdul_Wahab-2016-GCDH-Patient_5.stdout.log").read_text(), "done\n"
+        )
+        self.assertEqual(runner.run_timer.to_dataframe()["case_id"].to_list(), ["Abdul_Wahab-2016-GCDH-Patient_5"])
+
+    def test_worker_pool(self):
+        class WorkerPoolRunner(DefaultPhEvalRunner):
+            def create_worker_pool(self):
+                return WorkerPool(
+                    lambda index: SubprocessToolWorker([sys.executable, "-c", "import sys; sys.stdin.read()"])
+                )
+
+        runner = WorkerPoolRunner(
+            input_dir="./tests/input_dir/configs/default/",
+            testdata_dir=self.temp_dir.joinpath("corpus"),
+            output_dir=self.output_dir,
+            version="1.0.0",
+            config_file=None,
+            tmp_dir=None,
+        )
+        self.assertIsNone(self.get_runner().worker_pool)
+        runner.start_worker_pool()
+        self.assertIsInstance(runner.worker_pool, WorkerPool)
+        runner.stop_worker_pool()
+        self.assertIsNone(runner.worker_pool)
+
+    def test_worker_pool_disabled(self):
+        class DisabledWorkerPoolRunner(DefaultPhEvalRunner):
+            def create_worker_pool(self):
+                return WorkerPool(
+                    lambda index: SubprocessToolWorker([sys.executable, "-c", "import sys; sys.stdin.read()"]),
+                    num_workers=0,
+                )
+
+        runner = DisabledWorkerPoolRunner(
+            input_dir="./tests/input_dir/configs/default/",
+            testdata_dir=self.temp_dir.joinpath("corpus"),
+            output_dir=self.output_dir,
+            version="1.0.0",
+            config_file=None,
+            tmp_dir=None,
+        )
+        runner.start_worker_pool()
+        self.assertIsNone(runner.worker_pool)
+        runner.stop_worker_pool()
@@ -0,0 +1,165 @@
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import polars as pl
+
+from pheval.post_processing.post_processing import (
+    SortOrder,
+    defer_empty_pheval_results,
+    generate_gene_result,
+    registered_results,
+)
+from pheval.runners.scheduler import JobResult, JobStatus, ToolJob, run_jobs
+
+phenopacket_corpus_dir = Path(__file__).parent.parent.joinpath("corpora/lirical/default/phenopackets")
+
+
+class TestRunJobs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def python_job(self, case_id: str, code: str, **kwargs) -> ToolJob:
+        return ToolJob(case_id=case_id, command=[sys.executable, "-c", code], **kwargs)
+
+    def test_run_jobs(self):
+        job_results = run_jobs(
+            [
+                self.python_job("case_1", "import time; time.sleep(0.2); print('case_1')"),
+                self.python_job("case_2", "import sys; sys.exit('case_2 failed')"),
+                ToolJob(case_id="case_3", command="echo case_3"),
+            ],
+            self.temp_dir,
+        )
+        self.assertEqual([job_result.job.case_id for job_result in job_results], ["case_1", "case_2", "case_3"])
+        self.assertEqual(
+            [(job_result.status, job_result.return_code) for job_result in job_results],
+            [(JobStatus.SUCCEEDED, 0), (JobStatus.FAILED, 1), (JobStatus.SUCCEEDED, 0)],
+        )
+        self.assertEqual(self.temp_dir.joinpath("case_1.stdout.log").read_text(), "case_1\n")
+        self.assertEqual(job_results[1].stderr_path.read_text(), "case_2 failed\n")
+
+    def test_run_jobs_retries(self):
+        counter = self.temp_dir.joinpath("counter")
+        [job_result] = run_jobs(
+            [
+                self.python_job(
+                    "case_1",
+                    f"from pathlib import Path; p = Path({str(counter)!r}); p.write_text(p.read_text() + 'x') "
+                    "if p.exists() else p.write_text('x'); assert len(p.read_text()) == 3",
+                )
+            ],
+            self.temp_dir,
+            retries=3,
+        )
+        self.assertEqual((job_result.status, job_result.attempts), (JobStatus.SUCCEEDED, 3))
+
+    def test_run_jobs_timeout(self):
+        [job_result, overridden_job_result] = run_jobs(
+            [
+                self.python_job("case_1", "import time; time.sleep(10)"),
+                self.python_job("case_2", "import time; time.sleep(0.5)", timeout=5),
+            ],
+            self.temp_dir,
+            timeout=0.2,
+            retries=1,
+        )
+        self.assertEqual((job_result.status, job_result.attempts), (JobStatus.TIMED_OUT, 2))
+        self.assertIsNone(job_result.return_code)
+        self.assertLess(job_result.wall_time, 5)
+        self.assertEqual(overridden_job_result.status, JobStatus.SUCCEEDED)
+
+    def test_run_jobs_timeout_without_process_groups(self):
+        with patch("pheval.runners.scheduler.os.name", "nt"), patch("pheval.runners.scheduler.os.killpg") as killpg:
+            [job_result] = run_jobs(
+                [self.python_job("case_1", "import time; time.sleep(10)")], self.temp_dir, timeout=0.2
+            )
+        self.assertEqual(job_result.status, JobStatus.TIMED_OUT)
+        self.assertLess(job_result.wall_time, 5)
+        killpg.assert_not_called()
+
+    @staticmethod
+    def is_running(pid: str) -> bool:
+        try:
+            return "zombie" not in Path(f"/proc/{pid}/status").read_text()
+        except FileNotFoundError:
+            return False
+
+    @unittest.skipUnless(Path("/proc/self/status").exists(), "requires procfs")
+    def test_run_jobs_timeout_kills_child_processes(self):
+        pid_file = self.temp_dir.joinpath("child.pid")
+        [job_result] = run_jobs(
+            [ToolJob(case_id="case_1", command=f"sleep 30 & echo $! > {pid_file}; wait")], self.temp_dir, timeout=0.5
+        )
+        self.assertEqual(job_result.status, JobStatus.TIMED_OUT)
+        child_pid, deadline = pid_file.read_text().strip(), time.perf_counter() + 5
+        while self.is_running(child_pid) and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(self.is_running(child_pid))
+
+    def test_run_jobs_command_not_found(self):
+        [job_result] = run_jobs([ToolJob(case_id="case_1", command=["pheval-missing-tool"])], self.temp_dir)
+        self.assertEqual(job_result.status, JobStatus.FAILED)
+
+    def test_run_jobs_on_complete_overlaps_jobs(self):
+        post_processed = {}
+
+        def on_complete(job_result: JobResult) -> None:
+            if job_result.job.case_id == "case_3":
+                raise ValueError("malformed result")
+            post_processed[job_result.job.case_id] = time.perf_counter()
+
+        start_time = time.perf_counter()
+        job_results = run_jobs(
+            [
+                self.python_job("case_1", "import time; time.sleep(1)"),
+                self.python_job("case_2", "pass"),
+                self.python_job("case_3", "pass"),
+                self.python_job("case_4", "import sys; sys.exit(1)"),
+            ],
+            self.temp_dir,
+            max_concurrency=4,
+            on_complete=on_complete,
+        )
+        self.assertEqual(sorted(post_processed), ["case_1", "case_2"])
+        self.assertLess(post_processed["case_2"] - start_time, job_results[0].wall_time)
+        self.assertEqual(job_results[2].post_processing_error, "ValueError: malformed result")
+
+    def test_run_jobs_completes_written_output_directories(self):
+        phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        phenopacket_dir.mkdir()
+        for phenopacket in ["Abdul_Wahab-2016-GCDH-Patient_5.json", "Ajmal-2013-BBS1-IV-5_family_A.json"]:
+            shutil.copy(phenopacket_corpus_dir.joinpath(phenopacket), phenopacket_dir)
+        output_dirs = {}
+        for name in ["job_output", "other_output"]:
+            output_dirs[name] = self.temp_dir.joinpath(name)
+            output_dirs[name].joinpath("pheval_gene_results").mkdir(parents=True)
+
+        def generate_result(output_dir: Path) -> None:
+            generate_gene_result(
+                results=pl.DataFrame({"gene_symbol": ["GCDH"], "gene_identifier": ["ENSG00000105607"], "score": [0.5]}),
+                sort_order=SortOrder.DESCENDING,
+                output_dir=output_dir,
+                result_path=Path("Abdul_Wahab-2016-GCDH-Patient_5.tsv"),
+                phenopacket_dir=phenopacket_dir,
+            )
+
+        with defer_empty_pheval_results():
+            generate_result(output_dirs["other_output"])
+        try:
+            run_jobs(
+                [self.python_job("Abdul_Wahab-2016-GCDH-Patient_5", "pass")],
+                self.temp_dir.joinpath("logs"),
+                on_complete=lambda job_result: generate_result(output_dirs["job_output"]),
+            )
+        finally:
+            registered_results.clear()
+        self.assertEqual(len(list(output_dirs["job_output"].joinpath("pheval_gene_results").iterdir())), 2)
+        self.assertEqual(len(list(output_dirs["other_output"].joinpath("pheval_gene_results").iterdir())), 1)
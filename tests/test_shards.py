@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from pheval.run_metadata import PhaseTiming
+from pheval.runners.shards import CaseShard, merge_shards, read_case_ids
+from pheval.runners.timings import RunTimer, get_run_wall_time
+
+
+class TestCaseShard(unittest.TestCase):
+    def setUp(self):
+        self.phenopackets = [Path(f"phenopackets/case_{i}.json") for i in range(100)]
+
+    def test_select(self):
+        shards = [CaseShard(shard_index, 4).select(self.phenopackets) for shard_index in range(4)]
+        self.assertEqual(sorted(phenopacket for shard in shards for phenopacket in shard), sorted(self.phenopackets))
+        self.assertTrue(all(shard for shard in shards))
+
+    def test_select_independent_of_corpus(self):
+        self.assertEqual(
+            CaseShard(1, 3).select(self.phenopackets[:10]),
+            [
+                phenopacket
+                for phenopacket in CaseShard(1, 3).select(self.phenopackets)
+                if phenopacket in self.phenopackets[:10]
+            ],
+        )
+
+    def test_select_case_ids(self):
+        self.assertEqual(
+            CaseShard(case_ids=frozenset(["case_1", "case_50"])).select(self.phenopackets),
+            [Path("phenopackets/case_1.json"), Path("phenopackets/case_50.json")],
+        )
+
+    def test_invalid_shard(self):
+        with self.assertRaises(ValueError):
+            CaseShard(shard_index=4, shard_count=4)
+        with self.assertRaises(ValueError):
+            CaseShard(shard_index=0)
+
+
+class TestReadCaseIds(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_read_case_ids(self):
+        cases_from = self.temp_dir.joinpath("cases.txt")
+        cases_from.write_text("# cases to rerun\ncase_1\n\nphenopackets/case_2.json\n")
+        self.assertEqual(read_case_ids(cases_from), frozenset(["case_1", "case_2"]))
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.phenopacket_dir = self.temp_dir.joinpath("phenopackets")
+        self.phenopacket_dir.mkdir()
+        for case_id in ["case_1", "case_2", "case_3"]:
+            self.phenopacket_dir.joinpath(f"{case_id}.json").touch()
+        self.shard_dirs = [self.temp_dir.joinpath("shard_0"), self.temp_dir.joinpath("shard_1")]
+        for shard_dir, case_ids in zip(self.shard_dirs, [["case_1", "case_3"], ["case_2"]], strict=True):
+            shard_dir.joinpath("pheval_gene_results").mkdir(parents=True)
+            for case_id in case_ids:
+                shard_dir.joinpath(f"pheval_gene_results/{case_id}-gene_result.parquet").write_text(case_id)
+        self.shard_dirs[0].joinpath("results.yml").write_text("tool: tool")
+        self.output_dir = self.temp_dir.joinpath("merged")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_merge_shards(self):
+        merge_shards(self.shard_dirs, self.phenopacket_dir, self.output_dir)
+        self.assertEqual(
+            sorted(result_file.name for result_file in self.output_dir.joinpath("pheval_gene_results").iterdir()),
+            ["case_1-gene_result.parquet", "case_2-gene_result.parquet", "case_3-gene_result.parquet"],
+        )
+        self.assertTrue(self.output_dir.joinpath("results.yml").is_file())
+
+    def test_merge_shards_timings(self):
+        for shard_dir, wall_time in zip(self.shard_dirs, [2.0, 3.0], strict=True):
+            run_timer = RunTimer()
+            run_timer.record(PhaseTiming(phase="run", wall_time=wall_time))
+            run_timer.write(shard_dir)
+        merge_shards(self.shard_dirs, self.phenopacket_dir, self.output_dir)
+        self.assertEqual(get_run_wall_time(self.output_dir), 5.0)
+
+    def test_merge_shards_missing_shard(self):
+        with self.assertRaises(ValueError):
+            merge_shards(self.shard_dirs[:1], self.phenopacket_dir, self.output_dir)
+        self.assertFalse(self.output_dir.exists())
+
+    def test_merge_shards_duplicate_case(self):
+        self.shard_dirs[1].joinpath("pheval_gene_results/case_1-gene_result.parquet").write_text("case_1")
+        with self.assertRaises(ValueError):
+            merge_shards(self.shard_dirs, self.phenopacket_dir, self.output_dir)
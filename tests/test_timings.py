@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import polars as pl
+
+from pheval.run_metadata import PhaseTiming
+from pheval.runners.timings import TIMINGS_FILE_NAME, RunTimer, get_run_wall_time
+
+
+class TestRunTimer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_time(self):
+        run_timer = RunTimer()
+        with run_timer.time("run"):
+            sum(range(100_000))
+        [phase_timing] = run_timer.phase_timings()
+        self.assertEqual(phase_timing.phase, "run")
+        self.assertGreater(phase_timing.wall_time, 0)
+        self.assertGreaterEqual(phase_timing.cpu_time, 0)
+        self.assertGreater(phase_timing.peak_rss, 0)
+
+    def test_time_records_on_error(self):
+        run_timer = RunTimer()
+        with self.assertRaises(RuntimeError), run_timer.time("prepare"):
+            raise RuntimeError
+        self.assertEqual([phase_timing.phase for phase_timing in run_timer.phase_timings()], ["prepare"])
+
+    def test_phase_timings_excludes_cases(self):
+        run_timer = RunTimer()
+        with run_timer.time("run"), run_timer.time("run", case_id="case_1"):
+            pass
+        self.assertEqual(len(run_timer.timings), 2)
+        self.assertEqual(len(run_timer.phase_timings()), 1)
+
+    def test_write(self):
+        run_timer = RunTimer()
+        run_timer.record(PhaseTiming(phase="run", wall_time=2.0), case_id="case_1")
+        run_timer.record(PhaseTiming(phase="run", wall_time=3.0))
+        run_timer.write(self.temp_dir)
+        timings = pl.read_parquet(self.temp_dir.joinpath(TIMINGS_FILE_NAME))
+        self.assertEqual(timings["case_id"].to_list(), ["case_1", None])
+        self.assertEqual(timings["wall_time"].to_list(), [2.0, 3.0])
+        self.assertEqual(get_run_wall_time(self.temp_dir), 3.0)
+
+    def test_get_run_wall_time_no_timings(self):
+        self.assertIsNone(get_run_wall_time(self.temp_dir))
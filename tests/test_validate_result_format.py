@@ -1,8 +1,15 @@
 import unittest
 
 import polars as pl
+import pyarrow as pa
 
-from pheval.post_processing.validate_result_format import ResultSchema, validate_dataframe
+from pheval.post_processing.validate_result_format import (
+    ResultSchema,
+    ValidationMode,
+    ValidationReport,
+    to_results_dataframe,
+    validate_dataframe,
+)
 
 
 class TestResultSchema(unittest.TestCase):
@@ -73,6 +80,49 @@ class TestResultSchema(unittest.TestCase):
         """Test validation for a correct disease result schema."""
         self.assertTrue(ResultSchema.DISEASE_RESULT_SCHEMA.validate(self.valid_disease_df))
 
+    def test_coerce_valid_schema(self):
+        """Test that coercing a correct schema leaves the DataFrame untouched."""
+        results, report = ResultSchema.VARIANT_RESULT_SCHEMA.coerce(self.valid_variant_df)
+        self.assertIs(results, self.valid_variant_df)
+        self.assertEqual(report, ValidationReport(num_rows=2))
+
+    def test_coerce_safe_widening(self):
+        """Test that narrower numeric types are widened to the expected type."""
+        narrow_df = self.valid_variant_df.with_columns(
+            pl.col("start").cast(pl.Int32), pl.col("end").cast(pl.UInt32), pl.col("score").cast(pl.Float32)
+        )
+        results, report = ResultSchema.VARIANT_RESULT_SCHEMA.coerce(narrow_df)
+        self.assertTrue(results.equals(self.valid_variant_df.with_columns(pl.col("score").cast(pl.Float32))))
+        self.assertEqual(results.schema, self.valid_variant_df.schema)
+        self.assertEqual(
+            report,
+            ValidationReport(
+                num_rows=2,
+                cast_columns={
+                    "start": (pl.Int32, pl.Int64),
+                    "end": (pl.UInt32, pl.Int64),
+                    "score": (pl.Float32, pl.Float64),
+                },
+            ),
+        )
+
+    def test_coerce_unsafe_type(self):
+        """Test that a column that cannot be safely widened raises TypeError."""
+        for invalid_df in [
+            self.valid_gene_df.with_columns(pl.col("score").cast(pl.Utf8)),
+            self.valid_gene_df.with_columns(pl.col("score").cast(pl.Int64)),
+        ]:
+            with self.assertRaises(TypeError):
+                ResultSchema.GENE_RESULT_SCHEMA.coerce(invalid_df)
+
+    def test_coerce_null_grouping_id(self):
+        """Test that null values in `grouping_id` raise ValueError when coercing."""
+        invalid_df = self.valid_gene_df.with_columns(
+            pl.col("score").cast(pl.Float32), pl.lit(None, dtype=pl.String).alias("grouping_id")
+        )
+        with self.assertRaises(ValueError):
+            ResultSchema.GENE_RESULT_SCHEMA.coerce(invalid_df)
+
 
 class TestValidateDataframeDecorator(unittest.TestCase):
     def setUp(self):
@@ -104,3 +154,60 @@ class TestValidateDataframeDecorator(unittest.TestCase):
         invalid_df = self.valid_gene_df.drop("gene_symbol")
         with self.assertRaises(ValueError):
             self.mock_function(invalid_df)
+
+    def test_decorator_validation_modes(self):
+        """Test that the validation mode passed to the wrapped function is applied."""
+
+        @validate_dataframe(ResultSchema.GENE_RESULT_SCHEMA)
+        def return_results(results: pl.DataFrame, *, validation_mode: ValidationMode = ValidationMode.STRICT):
+            return results
+
+        narrow_df = self.valid_gene_df.with_columns(pl.col("score").cast(pl.Float32))
+        with self.assertRaises(TypeError):
+            return_results(narrow_df)
+        self.assertEqual(
+            return_results(narrow_df, validation_mode=ValidationMode.COERCE).schema, self.valid_gene_df.schema
+        )
+        self.assertIs(return_results(narrow_df, validation_mode=ValidationMode.SKIP), narrow_df)
+
+
+class TestToResultsDataframe(unittest.TestCase):
+    def setUp(self):
+        self.gene_table = pa.table(
+            {
+                "gene_symbol": ["BRCA1", "TP53"],
+                "gene_identifier": ["ENSG00000012048", "ENSG00000141510"],
+                "score": [0.9, 0.8],
+            }
+        )
+
+    def test_to_results_dataframe_table(self):
+        results = to_results_dataframe(self.gene_table, ResultSchema.GENE_RESULT_SCHEMA)
+        self.assertTrue(results.equals(pl.from_arrow(self.gene_table)))
+        self.assertEqual(
+            results["score"].to_arrow().buffers()[1].address, self.gene_table["score"].chunks[0].buffers()[1].address
+        )
+
+    def test_to_results_dataframe_record_batch(self):
+        self.assertTrue(
+            to_results_dataframe(self.gene_table.to_batches()[0], ResultSchema.GENE_RESULT_SCHEMA).equals(
+                pl.from_arrow(self.gene_table)
+            )
+        )
+
+    def test_to_results_dataframe_arrow_c_stream(self):
+        self.assertTrue(
+            to_results_dataframe(self.gene_table.to_reader(), ResultSchema.GENE_RESULT_SCHEMA).equals(
+                pl.from_arrow(self.gene_table)
+            )
+        )
+
+    def test_to_results_dataframe_dictionary_encoded(self):
+        gene_table = self.gene_table.set_column(0, "gene_symbol", self.gene_table["gene_symbol"].dictionary_encode())
+        self.assertTrue(
+            ResultSchema.GENE_RESULT_SCHEMA.validate(to_results_dataframe(gene_table, ResultSchema.GENE_RESULT_SCHEMA))
+        )
+
+    def test_to_results_dataframe_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            to_results_dataframe(self.gene_table.to_pydict(), ResultSchema.GENE_RESULT_SCHEMA)
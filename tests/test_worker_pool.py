@@ -0,0 +1,150 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from pheval.runners.worker_pool import SubprocessToolWorker, WorkerError, WorkerPool
+
+TOOL_SERVER = """
+import os, sys, time
+print("ready", flush=True)
+for line in sys.stdin:
+    request = line.strip()
+    if request == "crash":
+        sys.exit(1)
+    if request == "hang":
+        time.sleep(60)
+    print(f"{os.getpid()} {request}", flush=True)
+"""
+
+
+class TestSubprocessToolWorker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_worker(self, **kwargs) -> SubprocessToolWorker:
+        return SubprocessToolWorker([sys.executable, "-c", TOOL_SERVER], ready_line="ready", **kwargs)
+
+    def test_submit(self):
+        worker = self.get_worker()
+        worker.start()
+        try:
+            first_pid, request = worker.submit("case_1").split()
+            self.assertEqual(request, "case_1")
+            self.assertEqual(worker.submit("case_2").split(), [first_pid, "case_2"])
+            self.assertTrue(worker.is_healthy())
+        finally:
+            worker.stop()
+        self.assertFalse(worker.is_healthy())
+
+    def test_submit_crash(self):
+        worker = self.get_worker()
+        worker.start()
+        try:
+            with self.assertRaises(WorkerError):
+                worker.submit("crash")
+            self.assertFalse(worker.is_healthy())
+        finally:
+            worker.stop()
+
+    def test_submit_timeout(self):
+        worker = self.get_worker(stop_timeout=0.1)
+        worker.start()
+        try:
+            with self.assertRaises(WorkerError):
+                worker.submit("hang", timeout=0.2)
+        finally:
+            worker.stop()
+
+    def test_start_failure(self):
+        with self.assertRaises(WorkerError):
+            SubprocessToolWorker(["pheval-missing-tool"]).start()
+        with self.assertRaises(WorkerError):
+            SubprocessToolWorker(
+                [sys.executable, "-c", "import time; time.sleep(60)"],
+                ready_line="ready",
+                startup_timeout=0.2,
+                stop_timeout=0.1,
+            ).start()
+
+    def test_log_path(self):
+        log_path = self.temp_dir.joinpath("worker.log")
+        worker = SubprocessToolWorker(
+            [sys.executable, "-c", "import sys; print('loading', file=sys.stderr); print('ready', flush=True)"],
+            ready_line="ready",
+            log_path=log_path,
+        )
+        worker.start()
+        worker.stop()
+        self.assertEqual(log_path.read_text(), "loading\n")
+
+
+class TestWorkerPool(unittest.TestCase):
+    def get_pool(self, **kwargs) -> WorkerPool:
+        return WorkerPool(
+            lambda index: SubprocessToolWorker(
+                [sys.executable, "-c", TOOL_SERVER], ready_line="ready", stop_timeout=0.1
+            ),
+            **kwargs,
+        )
+
+    def test_map(self):
+        with self.get_pool(num_workers=2) as pool:
+            worker_results = pool.map({f"case_{i}": f"case_{i}" for i in range(10)})
+        self.assertEqual([result.response.split()[1] for result in worker_results], [f"case_{i}" for i in range(10)])
+        self.assertLessEqual(len({result.response.split()[0] for result in worker_results}), 2)
+        self.assertEqual(pool.restarts, 0)
+
+    def test_submit_restarts_crashed_worker(self):
+        with self.get_pool(retries=0) as pool:
+            with self.assertRaises(WorkerError):
+                pool.submit("crash")
+            self.assertEqual(pool.restarts, 0)
+            self.assertEqual(pool.submit("case_1").split()[1], "case_1")
+        self.assertEqual(pool.restarts, 1)
+
+    def test_submit_restarts_only_before_retries(self):
+        with self.get_pool(retries=1) as pool:
+            with self.assertRaises(WorkerError):
+                pool.submit("crash")
+            self.assertEqual(pool.restarts, 1)
+
+    def test_stop_busy_worker(self):
+        pool = self.get_pool()
+        pool.start()
+        pid = int(pool.submit("case_1").split()[0])
+        errors = []
+
+        def submit_hang() -> None:
+            try:
+                pool.submit("hang")
+            except WorkerError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=submit_hang)
+        thread.start()
+        time.sleep(0.2)
+        pool.stop()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(pool.restarts, 0)
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    def test_map_max_restarts(self):
+        with self.get_pool(request_timeout=0.5, retries=1, max_restarts=1) as pool:
+            worker_results = pool.map({"case_1": "crash", "case_2": "case_2"})
+        self.assertIsNotNone(worker_results[0].error)
+        self.assertIsNone(worker_results[0].response)
+
+    def test_negative_num_workers(self):
+        with self.assertRaises(ValueError):
+            self.get_pool(num_workers=-1)